@@ -3,27 +3,59 @@ import pandas as pd
 
 INFILE  = "jugadores_estadisticas_normalizado.csv"   # ← INPUT REAL
 PLAYERS = "jugadores_laliga_ids.csv"                 # ← catálogo jugadores
+PARTIDOS = "laliga_partidos_with_id.csv"             # ← id, Home, Away de cada partido
 OUT     = "PLAYER_STATS_FINAL.CSV"                   # ← OUTPUT FINAL
 
-print("🟢 Generando PLAYER_STATS_FINAL...")
 
-# 1) Cargar estadísticas normalizadas de jugadores (tu archivo REAL)
-df = pd.read_csv(INFILE)
-
-# 2) Cargar catálogo maestro de jugadores
-players = pd.read_csv(PLAYERS)[["Player", "player_id"]]
-
-# 3) Unir player_id por nombre
-df = df.merge(players, on="Player", how="left")
-
-# 4) Reordenar columnas (id + player_id + resto)
-cols_front = ["id", "player_id"]
-other_cols = [c for c in df.columns if c not in cols_front and c != "Player"]
-
-df = df[cols_front + other_cols]
-
-# 5) Guardar archivo FINAL en mayúsculas
-df.to_csv(OUT, index=False, encoding="utf-8-sig")
-
-print("✔ Archivo generado:", OUT)
-print(df.head())
\ No newline at end of file
+def player_stats_final(df, players, partidos):
+    """
+    Stats normalizadas + player_id, sin la columna Player.
+    player_id por nombre Y equipo: la fila del catálogo (Player, Squad)
+    cuyo Squad es uno de los dos equipos del partido (`partidos`: id,
+    Home, Away). Un jugador traspasado sale una vez por equipo en el
+    catálogo: por nombre solo, cada fila suya se duplicaba.
+    Si el equipo no cuadra (partido sin fixture, jugador que no está en
+    el catálogo con ese equipo) se cae al nombre solo, avisando.
+    """
+    equipos = partidos.dropna(subset=["id"]).melt(id_vars="id", value_vars=["Home", "Away"], value_name="Squad")
+    candidatos = (
+        players[["Player", "Squad", "player_id"]]
+        .merge(equipos[["id", "Squad"]], on="Squad")
+        .drop_duplicates(["id", "Player", "player_id"])[["id", "Player", "player_id"]]
+    )
+    df = df.merge(candidatos, on=["id", "Player"], how="left")
+
+    sin_equipo = df["player_id"].isna() & df["Player"].notna()
+    if sin_equipo.any():
+        por_nombre = players.drop_duplicates("Player").set_index("Player")["player_id"]
+        df.loc[sin_equipo, "player_id"] = df.loc[sin_equipo, "Player"].map(por_nombre)
+        n = int(df.loc[sin_equipo, "player_id"].notna().sum())
+        if n:
+            print(f"⚠ {n} filas sin su equipo en el catálogo: player_id solo por nombre")
+
+    # Reordenar columnas (id + player_id + resto)
+    cols_front = ["id", "player_id"]
+    other_cols = [c for c in df.columns if c not in cols_front and c != "Player"]
+
+    return df[cols_front + other_cols]
+
+
+def main():
+    print("🟢 Generando PLAYER_STATS_FINAL...")
+
+    # 1) Cargar estadísticas normalizadas (tu archivo REAL) y catálogo maestro
+    df = player_stats_final(
+        pd.read_csv(INFILE, dtype_backend="numpy_nullable"),
+        pd.read_csv(PLAYERS),
+        pd.read_csv(PARTIDOS, dtype_backend="numpy_nullable"),
+    )
+
+    # 2) Guardar archivo FINAL en mayúsculas
+    df.to_csv(OUT, index=False, encoding="utf-8-sig")
+
+    print("✔ Archivo generado:", OUT)
+    print(df.head())
+
+
+if __name__ == "__main__":
+    main()
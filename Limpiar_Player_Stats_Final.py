@@ -1,9 +1,19 @@
 import pandas as pd
 
-df = pd.read_csv("PLAYER_STATS_FINAL.CSV")
+FILE = "PLAYER_STATS_FINAL.CSV"
 
-# Eliminar filas TOTAL (las que no tienen player_id)
-df = df[df["player_id"].notna()]
 
-df.to_csv("PLAYER_STATS_FINAL.CSV", index=False)
-print("✔ PLAYER_STATS_FINAL limpiado")
\ No newline at end of file
+def limpiar(df):
+    # Eliminar filas TOTAL (las que no tienen player_id)
+    return df[df["player_id"].notna()]
+
+
+def main():
+    df = limpiar(pd.read_csv(FILE, dtype_backend="numpy_nullable"))
+
+    df.to_csv(FILE, index=False)
+    print("✔ PLAYER_STATS_FINAL limpiado")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,19 @@
 import pandas as pd
 
-df = pd.read_csv("TEAM_STATS_FINAL.CSV")
+FILE = "TEAM_STATS_FINAL.CSV"
 
-# Eliminar filas donde NO hay equipos
-df = df[~(df["home_team_id"].isna() & df["away_team_id"].isna())]
 
-df.to_csv("TEAM_STATS_FINAL.CSV", index=False)
-print("✔ TEAM_STATS_FINAL limpiado")
\ No newline at end of file
+def limpiar(df):
+    # Eliminar filas donde NO hay equipos
+    return df[~(df["home_team_id"].isna() & df["away_team_id"].isna())]
+
+
+def main():
+    df = limpiar(pd.read_csv(FILE, dtype_backend="numpy_nullable"))
+
+    df.to_csv(FILE, index=False)
+    print("✔ TEAM_STATS_FINAL limpiado")
+
+
+if __name__ == "__main__":
+    main()
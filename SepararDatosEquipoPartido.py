@@ -1,56 +1,74 @@
 # -*- coding: utf-8 -*-
 """
 Normaliza estadísticas de equipo por partido:
-Entrada: TEAM_STATS_FINAL.csv
+Entrada: TEAM_STATS_FINAL.CSV
 Salida: TEAM_MATCH_STATS_FINAL.csv (sin campo ID, BD lo generará)
 """
 
 import pandas as pd
 from pathlib import Path
-import math
 
-INPUT_FILE = "TEAM_STATS_FINAL.csv"
+INPUT_FILE = "TEAM_STATS_FINAL.CSV"
 OUTFILE = "TEAM_MATCH_STATS_FINAL.csv"
 
-def is_na(v):
-    try:
-        return v is None or (isinstance(v, float) and math.isnan(v)) or pd.isna(v)
-    except:
-        return False
-
-def safe_text(v):
-    if is_na(v):
-        return ""
-    return str(v).strip()
-
-def clean_match_id(raw):
-    s = safe_text(raw)
-    if "." in s:
-        return s.split(".")[0]
-    return s
-
-def to_int(x):
-    if is_na(x):
-        return None
-    s = safe_text(x)
-    if s == "":
-        return None
-    try:
-        return int(float(s))
-    except:
-        return None
-
-def build_row(match_id, team_id, side, poss, shots_ot, shots_total, saves, cards):
-    return {
-        "match_id": clean_match_id(match_id),
-        "team_id": safe_text(team_id),
-        "side": side,
-        "possession": to_int(poss),
-        "shots_on_target": to_int(shots_ot),
-        "shots_total": to_int(shots_total),
-        "saves": to_int(saves),
-        "cards": to_int(cards)
-    }
+# Lado → sufijo de las columnas anchas (poss_home, home_team_id, ...)
+LADOS = {"HOME": "home", "AWAY": "away"}
+
+# Stat ancha → columna de salida (las que no estén aquí conservan su nombre)
+NOMBRES = {
+    "poss": "possession",
+    "shots_ot": "shots_on_target",
+    "shots_total": "shots_total",
+    "saves": "saves",
+    "cards": "cards",
+}
+
+
+def stats_pareadas(df):
+    """Bases con columna <base>_home y <base>_away (sin contar los team_id)."""
+    return [
+        c[: -len("_home")] for c in df.columns
+        if c.endswith("_home") and c[: -len("_home")] + "_away" in df.columns
+    ]
+
+
+def _texto(serie):
+    return serie.astype("string").fillna("").str.strip()
+
+
+def separar_por_lado(df, stats=None, id_col="id"):
+    """
+    Ancho (una fila por partido) → largo (una fila por partido y lado).
+    `stats` = {base: nombre_salida}; por defecto todas las parejas
+    <base>_home/<base>_away de `df`. Devuelve (largo, {lado: omitidos}):
+    los lados sin team_id se omiten.
+    """
+    if stats is None:
+        stats = {b: NOMBRES.get(b, b) for b in stats_pareadas(df)}
+
+    # "247102277803306.0" → "247102277803306"
+    match_id = _texto(df[id_col]).str.split(".").str[0]
+
+    partes, omitidos = [], {}
+    for lado, suf in LADOS.items():
+        parte = pd.DataFrame({"match_id": match_id, "team_id": _texto(df[f"{suf}_team_id"])})
+        parte["side"] = lado
+        for base, nombre in stats.items():
+            valores = pd.to_numeric(_texto(df[f"{base}_{suf}"]), errors="coerce")
+            parte[nombre] = valores.apply("trunc").astype("Int64")
+        parte["_fila"] = range(len(df))
+
+        con_equipo = parte["team_id"] != ""
+        omitidos[lado] = int((~con_equipo).sum())
+        partes.append(parte[con_equipo])
+
+    largo = pd.concat(partes, ignore_index=True)
+    largo["side"] = pd.Categorical(largo["side"], categories=list(LADOS))
+
+    # Mismo orden que el fichero ancho: partido a partido, HOME y luego AWAY
+    largo = largo.sort_values(["_fila", "side"], kind="stable").drop(columns="_fila")
+    return largo.reset_index(drop=True), omitidos
+
 
 def main():
     script_dir = Path(__file__).parent
@@ -77,46 +95,13 @@ def main():
         print(f"❌ Faltan columnas: {missing}")
         return
 
-    out_rows = []
-    dropped_home = 0
-    dropped_away = 0
-
-    for _, row in df.iterrows():
-        match_id = row["id"]
-
-        home_id = safe_text(row["home_team_id"])
-        if home_id:
-            out_rows.append(build_row(
-                match_id, home_id, "HOME",
-                row["poss_home"],
-                row["shots_ot_home"],
-                row["shots_total_home"],
-                row["saves_home"],
-                row["cards_home"]
-            ))
-        else:
-            dropped_home += 1
-
-        away_id = safe_text(row["away_team_id"])
-        if away_id:
-            out_rows.append(build_row(
-                match_id, away_id, "AWAY",
-                row["poss_away"],
-                row["shots_ot_away"],
-                row["shots_total_away"],
-                row["saves_away"],
-                row["cards_away"]
-            ))
-        else:
-            dropped_away += 1
-
-    out_df = pd.DataFrame(out_rows)
+    out_df, omitidos = separar_por_lado(df, stats=NOMBRES)
     out_df.to_csv(out_path, index=False, encoding="utf-8")
 
     print("✅ Normalización completada.")
     print(f"   Filas entrada: {len(df)}")
     print(f"   Filas generadas: {len(out_df)}")
-    print(f"   HOME omitidos: {dropped_home}, AWAY omitidos: {dropped_away}")
+    print(f"   HOME omitidos: {omitidos['HOME']}, AWAY omitidos: {omitidos['AWAY']}")
     print(f"📦 Archivo generado en: {out_path.resolve()}")
 
 if __name__ == "__main__":
@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+"""
+Almacén crudo en Parquet (una partición por partido)
+Sustituye al CSV con cabecera de dos filas (jugadores_raw.csv):
+- <directorio>/<hash_partido>.parquet, con nombres de columna planos
+  ("Player", "Performance_Gls", ..., "team", "match_url").
+- <directorio>/_manifest.json: esquema canónico (columna → tipo Arrow)
+  y una entrada por partición (URL, filas, columnas, fecha y columnas
+  double con algún valor no entero).
+- El esquema se ENSANCHA: una columna nueva se añade al final y un tipo
+  que no encaja se promociona (null → int64 → double → string). Nunca se
+  pierde una columna porque la primera ejecución no la tuviera.
+- Lectura selectiva: leer(columnas=[...], match_ids=[...]) solo abre las
+  particiones y columnas pedidas; leer_por_lotes() las recorre por tramos.
+Los ficheros (partición y manifiesto) se escriben en .tmp y se renombran.
+
+Requiere: pip install pyarrow
+"""
+
+import os
+import json
+from datetime import datetime, timezone
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from urls_partido import match_id_de_url
+
+# ============================
+# CONFIG
+# ============================
+MANIFEST_FILE = "_manifest.json"
+COMPRESION = "zstd"
+
+# Columnas de contexto que añaden los scrapers (no vienen de FBref)
+METADATOS = ("team", "match_url")
+
+
+# ============================
+# ESQUEMA
+# ============================
+
+def _ahora():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def _ensanchar(viejo: pa.DataType, nuevo: pa.DataType) -> pa.DataType:
+    """Tipo que admite valores de ambos sin perder nada."""
+    if viejo == nuevo or pa.types.is_null(nuevo):
+        return viejo
+    if pa.types.is_null(viejo):
+        return nuevo
+    if pa.types.is_integer(viejo) and pa.types.is_integer(nuevo):
+        return pa.int64()
+    numericos = (pa.types.is_integer, pa.types.is_floating)
+    if any(f(viejo) for f in numericos) and any(f(nuevo) for f in numericos):
+        return pa.float64()
+    return pa.string()
+
+
+def _decimales(tabla: pa.Table):
+    """Columnas double de la tabla con algún valor no entero."""
+    return [
+        c.name for c in tabla.schema
+        if pa.types.is_floating(c.type)
+        and pc.all(pc.equal(pc.floor(tabla[c.name]), tabla[c.name])).as_py() is False
+    ]
+
+
+def aplanar_columnas(df):
+    """Aplana columnas MultiIndex (cabecera doble de FBref) de forma robusta."""
+    if isinstance(df.columns, pd.MultiIndex):
+        new_cols = []
+        for col_tuple in df.columns:
+            parts = [str(x) for x in col_tuple if not (pd.isna(x) or 'Unnamed' in str(x))]
+            if len(parts) == 0:
+                new_cols.append(str(col_tuple[-1]))
+            elif len(parts) == 1:
+                new_cols.append(parts[0])
+            else:
+                new_cols.append('_'.join(parts))
+        df.columns = new_cols
+    else:
+        df.columns = [str(c) for c in df.columns]
+    return df
+
+
+def nombres_cortos(columnas):
+    """
+    "Performance_Gls" → "Gls" (nombres de la cabecera de abajo, como los
+    usaba el CSV antiguo). Los repetidos se desduplican con .1, .2...
+    """
+    cortos, vistos = [], {}
+    for c in columnas:
+        n = c if c in METADATOS else c.rsplit("_", 1)[-1]
+        if n in vistos:
+            vistos[n] += 1
+            n = f"{n}.{vistos[n]}"
+        else:
+            vistos[n] = 0
+        cortos.append(n)
+    return cortos
+
+
+# ============================
+# ALMACÉN
+# ============================
+
+class AlmacenParquet:
+    """Directorio de particiones Parquet + manifiesto JSON."""
+
+    def __init__(self, directorio):
+        self.directorio = directorio
+        self.path_manifest = os.path.join(directorio, MANIFEST_FILE)
+        self.manifest = self._leer_manifest()
+
+    # ---------- manifiesto ----------
+
+    def _leer_manifest(self):
+        if not os.path.exists(self.path_manifest):
+            return {"esquema": {}, "particiones": {}}
+        with open(self.path_manifest, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _guardar_manifest(self):
+        tmp = self.path_manifest + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, self.path_manifest)
+
+    def esquema(self) -> pa.Schema:
+        """Esquema canónico (orden de llegada de las columnas)."""
+        return pa.schema([(c, pa.type_for_alias(t)) for c, t in self.manifest["esquema"].items()])
+
+    def vacio(self) -> bool:
+        return not self.manifest["particiones"]
+
+    def firmas(self) -> dict:
+        """{match_id: "filas:ts"}; cambia si la partición se reescribe."""
+        return {m: f"{p['filas']}:{p['ts']}" for m, p in self.manifest["particiones"].items()}
+
+    def match_urls(self) -> dict:
+        """{match_url: filas} de las particiones escritas."""
+        return {p["match_url"]: p["filas"] for p in self.manifest["particiones"].values()}
+
+    def decimales(self) -> set:
+        """
+        Columnas con algún valor no entero en TODO el almacén, sin leer los
+        datos (del manifiesto). Las particiones de manifiestos anteriores se
+        leen una vez y se apuntan.
+        """
+        particiones = self.manifest["particiones"].values()
+        faltan = [info for info in particiones if "decimales" not in info]
+        for info in faltan:
+            info["decimales"] = _decimales(pq.read_table(os.path.join(self.directorio, info["fichero"])))
+        if faltan:
+            self._guardar_manifest()
+        return set().union(*(info["decimales"] for info in particiones))
+
+    def _ensanchar_esquema(self, tabla: pa.Table):
+        esquema = self.manifest["esquema"]
+        for campo in tabla.schema:
+            viejo = esquema.get(campo.name)
+            tipo = campo.type if viejo is None else _ensanchar(pa.type_for_alias(viejo), campo.type)
+            esquema[campo.name] = str(tipo)
+
+    # ---------- escritura ----------
+
+    def _tabla(self, df):
+        df = df.copy()
+        df.columns = [str(c) for c in df.columns]
+        for c in df.columns:
+            # columnas mixtas (p.ej. "10" y 10.0) → texto, como en el CSV
+            if df[c].dtype == object:
+                tipos = {type(v) for v in df[c].dropna()}
+                if len(tipos) > 1:
+                    df[c] = df[c].map(lambda v: v if pd.isna(v) else str(v))
+        return pa.Table.from_pandas(df, preserve_index=False)
+
+    def escribir_tabla(self, match_url, tabla: pa.Table, guardar_manifest=True):
+        """Escribe (o reescribe) la partición del partido."""
+        os.makedirs(self.directorio, exist_ok=True)
+        match_id = match_id_de_url(match_url)
+        fichero = f"{match_id}.parquet"
+        path = os.path.join(self.directorio, fichero)
+
+        tmp = path + ".tmp"
+        pq.write_table(tabla, tmp, compression=COMPRESION)
+        os.replace(tmp, path)
+
+        self._ensanchar_esquema(tabla)
+        self.manifest["particiones"][match_id] = {
+            "match_url": match_url,
+            "fichero": fichero,
+            "filas": tabla.num_rows,
+            "columnas": tabla.column_names,
+            "decimales": _decimales(tabla),
+            "ts": _ahora(),
+        }
+        if guardar_manifest:
+            self._guardar_manifest()
+
+    def escribir_partido(self, match_url, df, guardar_manifest=True):
+        self.escribir_tabla(match_url, self._tabla(df), guardar_manifest)
+
+    def escribir_lote(self, lote):
+        """[(match_url, df), ...]: una partición por partido, un solo manifiesto."""
+        for match_url, df in lote:
+            self.escribir_partido(match_url, df, guardar_manifest=False)
+        self._guardar_manifest()
+
+    def borrar_partido(self, match_url):
+        info = self.manifest["particiones"].pop(match_id_de_url(match_url), None)
+        if info is None:
+            return
+        path = os.path.join(self.directorio, info["fichero"])
+        if os.path.exists(path):
+            os.remove(path)
+        self._guardar_manifest()
+
+    # ---------- lectura ----------
+
+    def leer(self, columnas=None, match_ids=None) -> pd.DataFrame:
+        """
+        DataFrame con el esquema canónico (o solo `columnas`), de todas las
+        particiones o solo de `match_ids`. Las columnas que una partición
+        no tenía salen como nulos; los tipos se promocionan al canónico.
+        """
+        esquema = self.esquema()
+        if columnas is not None:
+            esquema = pa.schema([esquema.field(c) for c in columnas if c in esquema.names])
+
+        particiones = self.manifest["particiones"]
+        if match_ids is not None:
+            particiones = {m: particiones[m] for m in match_ids if m in particiones}
+
+        tablas = []
+        for info in particiones.values():
+            presentes = [c for c in esquema.names if c in info["columnas"]]
+            t = pq.read_table(os.path.join(self.directorio, info["fichero"]), columns=presentes)
+            for campo in esquema:
+                if campo.name not in presentes:
+                    t = t.append_column(campo.name, pa.nulls(t.num_rows, campo.type))
+            tablas.append(t.select(esquema.names).cast(esquema))
+
+        if not tablas:
+            return pd.DataFrame(columns=esquema.names)
+        return pa.concat_tables(tablas).to_pandas()
+
+    def leer_por_lotes(self, columnas=None, partidos=50, match_ids=None):
+        """
+        Como leer(), pero de `partidos` en `partidos` particiones (generador):
+        la memoria depende del tamaño del lote, no del almacén. Todos los
+        lotes traen las mismas columnas (esquema canónico).
+        """
+        if match_ids is None:
+            match_ids = list(self.manifest["particiones"])
+        match_ids = [m for m in match_ids if m in self.manifest["particiones"]]
+        for i in range(0, len(match_ids), partidos):
+            yield self.leer(columnas, match_ids[i:i + partidos])
+
+
+# ============================
+# MIGRACIÓN DESDE EL CSV
+# ============================
+
+def importar_csv_dos_cabeceras(csv_path, almacen: AlmacenParquet, aplanar=aplanar_columnas):
+    """
+    Pasa un CSV antiguo (cabecera MultiIndex de dos filas) al almacén,
+    un partido por partición. `aplanar(df)` deja los nombres planos.
+    """
+    df = aplanar(pd.read_csv(csv_path, header=[0, 1]))
+    if "match_url" not in df.columns:
+        print(f"⚠️  {csv_path} sin columna match_url: no se migra")
+        return 0
+
+    n = 0
+    for url, grupo in df.groupby("match_url", sort=False):
+        almacen.escribir_partido(url, grupo.reset_index(drop=True), guardar_manifest=False)
+        n += 1
+    almacen._guardar_manifest()
+    return n
+
+
+def abrir(directorio, csv_antiguo=None) -> AlmacenParquet:
+    """
+    Almacén de `directorio`. Si aún no tiene manifiesto y existe el CSV
+    antiguo `csv_antiguo`, lo migra antes (solo la primera vez): así las
+    etapas de después funcionan aunque no se haya lanzado el scraper.
+    """
+    almacen = AlmacenParquet(directorio)
+    if (
+        csv_antiguo
+        and not os.path.exists(almacen.path_manifest)
+        and os.path.exists(csv_antiguo)
+        and os.path.getsize(csv_antiguo) > 0
+    ):
+        print(f"📂 Migrando {csv_antiguo} a {directorio}/ (solo esta vez)...")
+        print(f"✔ {importar_csv_dos_cabeceras(csv_antiguo, almacen)} partidos migrados")
+    return almacen
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+Archivo local de HTML crudo (FBref)
+- Cada página descargada (fixtures y Match Reports) se guarda comprimida
+  con zstd y direccionada por contenido: objetos/<sha[:2]>/<sha>.html.zst
+- indice.jsonl relaciona la clave de la página (hash del partido en la URL,
+  p.ej. 12c8079e, o "fixtures") con el digest de su contenido.
+- Permite re-ejecutar los extractores sin navegador (modo --replay).
+
+Requiere: pip install zstandard
+"""
+
+import os
+import json
+import hashlib
+from datetime import datetime, timezone
+
+import zstandard as zstd
+
+from urls_partido import hash_partido
+
+# ============================
+# CONFIG
+# ============================
+ARCHIVE_DIR = "archivo_html"
+INDEX_FILE = "indice.jsonl"
+NIVEL_ZSTD = 10
+
+
+
+# ============================
+# CLAVES
+# ============================
+
+def clave_de_url(url: str) -> str:
+    """Hash FBref del partido (8 hex) o, si no es un partido, 'fixtures'."""
+    return hash_partido(url) or "fixtures"
+
+
+def _ruta_objeto(digest: str, base=ARCHIVE_DIR) -> str:
+    return os.path.join(base, "objetos", digest[:2], f"{digest}.html.zst")
+
+
+# ============================
+# ESCRITURA
+# ============================
+
+def guardar(url: str, html: str, base=ARCHIVE_DIR) -> str:
+    """Archiva el HTML (si no existía ya) y registra la URL en el índice."""
+    os.makedirs(base, exist_ok=True)
+    data = html.encode("utf-8")
+    digest = hashlib.sha256(data).hexdigest()
+    ruta = _ruta_objeto(digest, base)
+
+    if not os.path.exists(ruta):
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        tmp = ruta + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(zstd.ZstdCompressor(level=NIVEL_ZSTD).compress(data))
+        os.replace(tmp, ruta)
+
+    entrada = {
+        "clave": clave_de_url(url),
+        "url": url,
+        "sha256": digest,
+        "ts": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    with open(os.path.join(base, INDEX_FILE), "a", encoding="utf-8") as f:
+        f.write(json.dumps(entrada, ensure_ascii=False) + "\n")
+
+    return digest
+
+
+# ============================
+# LECTURA
+# ============================
+
+def leer_indice(base=ARCHIVE_DIR) -> dict:
+    """{clave: entrada} quedándose con la última captura de cada página."""
+    path = os.path.join(base, INDEX_FILE)
+    indice = {}
+    if not os.path.exists(path):
+        return indice
+
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entrada = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # línea cortada por un cierre brusco
+            indice[entrada["clave"]] = entrada
+    return indice
+
+
+def cargar_digest(digest: str, base=ARCHIVE_DIR):
+    ruta = _ruta_objeto(digest, base)
+    if not os.path.exists(ruta):
+        return None
+    with open(ruta, "rb") as f:
+        return zstd.ZstdDecompressor().decompress(f.read()).decode("utf-8")
+
+
+def cargar(url_o_clave: str, base=ARCHIVE_DIR):
+    """HTML archivado de una URL (o clave) o None si no está."""
+    clave = url_o_clave if "/" not in url_o_clave else clave_de_url(url_o_clave)
+    entrada = leer_indice(base).get(clave)
+    if entrada is None:
+        return None
+    return cargar_digest(entrada["sha256"], base)
+
+
+def partidos_archivados(base=ARCHIVE_DIR) -> dict:
+    """{url: digest} de los Match Reports archivados (solo el índice, sin descomprimir)."""
+    return {e["url"]: e["sha256"] for clave, e in leer_indice(base).items() if clave != "fixtures"}
+
+
+def iterar_partidos(base=ARCHIVE_DIR):
+    """Genera (url, html) de todos los Match Reports archivados, uno a uno."""
+    for url, digest in partidos_archivados(base).items():
+        html = cargar_digest(digest, base)
+        if html is not None:
+            yield url, html
@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+"""
+Carga de las tablas *_FINAL en una base SQLite (laliga.sqlite)
+Los consumidores dejan de re-parsear los CSV: tipos de verdad (INTEGER /
+REAL / TEXT), claves primarias e índices por match_id, team_id y
+player_id → "stats de un jugador/equipo" es una búsqueda por índice.
+
+- Cada tabla se carga en UNA transacción (executemany), con upsert
+  (INSERT ... ON CONFLICT DO UPDATE): relanzar la carga es idempotente y
+  sirve para cargas incrementales.
+- --reemplazar vacía cada tabla antes, en la misma transacción (refleja
+  también filas borradas de los CSV).
+- Filas sin clave primaria (p.ej. partidos aún sin match_id) se omiten.
+- Filas con la clave repetida ANTES de cargar: si son idénticas se
+  carga una; si difieren no se elige ninguna (el upsert dejaría la
+  última sin avisar): todas van a rechazadas_<tabla>.csv y esa clave no
+  se carga.
+- Se informa de lo que cambió de verdad en la tabla: filas nuevas,
+  actualizadas, omitidas sin clave, repetidas y rechazadas.
+
+    python cargar_bd.py [--reemplazar] [--bd laliga.sqlite]
+"""
+
+import os
+import sqlite3
+import argparse
+
+import pandas as pd
+
+# ============================
+# CONFIG
+# ============================
+DB_FILE = "laliga.sqlite"
+RECHAZADAS = "rechazadas_{tabla}.csv"      # ← claves repetidas con filas distintas
+
+# Columnas de enlace de FBref (texto fijo "Match Report"/"Matches"): no se cargan
+IGNORAR = {"Match Report", "Matches"}
+
+# tabla: (fichero, encoding, [(columna_csv, columna_sql, tipo)], clave primaria, índices)
+TABLAS = {
+    "equipos": (
+        "equipos_final_ids.csv", "utf-8-sig",
+        [
+            ("team_id", "team_id", "TEXT"),
+            ("equipo", "equipo", "TEXT"),
+            ("estadio", "estadio", "TEXT"),
+            ("ciudad", "ciudad", "TEXT"),
+            ("capacidad", "capacidad", "INTEGER"),
+        ],
+        ["team_id"], [],
+    ),
+    # Una fila por jugador y equipo (los traspasos de invierno repiten player_id)
+    "jugadores": (
+        "jugadores_laliga_ids_FINAL.csv", "utf-8-sig",
+        [
+            ("player_id", "player_id", "TEXT"),
+            ("team_id", "team_id", "TEXT"),
+            ("Player", "player", "TEXT"),
+            ("Nation", "nation", "TEXT"),
+            ("Pos", "pos", "TEXT"),
+            ("Squad", "squad", "TEXT"),
+            ("Age", "age", "TEXT"),
+            ("Born", "born", "INTEGER"),
+            ("MP", "mp", "INTEGER"),
+            ("Starts", "starts", "INTEGER"),
+            ("Min", "min", "INTEGER"),
+            ("90s", "n90s", "REAL"),
+            ("Gls", "gls", "INTEGER"),
+            ("Ast", "ast", "INTEGER"),
+            ("G+A", "g_a", "INTEGER"),
+            ("G-PK", "g_pk", "INTEGER"),
+            ("PK", "pk", "INTEGER"),
+            ("PKatt", "pkatt", "INTEGER"),
+            ("CrdY", "crdy", "INTEGER"),
+            ("CrdR", "crdr", "INTEGER"),
+            ("Gls.1", "gls_p90", "REAL"),
+            ("Ast.1", "ast_p90", "REAL"),
+            ("G+A.1", "g_a_p90", "REAL"),
+            ("G-PK.1", "g_pk_p90", "REAL"),
+            ("G+A-PK", "g_a_pk_p90", "REAL"),
+        ],
+        ["player_id", "team_id"], ["team_id"],
+    ),
+    "partidos": (
+        "PARTIDOS_FINAL.CSV", "utf-8-sig",
+        [
+            ("id", "match_id", "INTEGER"),
+            ("home_team_id", "home_team_id", "TEXT"),
+            ("away_team_id", "away_team_id", "TEXT"),
+            ("Wk", "wk", "INTEGER"),
+            ("Day", "day", "TEXT"),
+            ("Date", "date", "TEXT"),
+            ("Time", "time", "TEXT"),
+            ("Score", "score", "TEXT"),
+            ("Attendance", "attendance", "INTEGER"),
+            ("Venue", "venue", "TEXT"),
+            ("Referee", "referee", "TEXT"),
+            ("Notes", "notes", "TEXT"),
+            ("HomeGoals", "home_goals", "INTEGER"),
+            ("AwayGoals", "away_goals", "INTEGER"),
+        ],
+        ["match_id"], ["home_team_id", "away_team_id", "date"],
+    ),
+    "estadisticas_jugador": (
+        "PLAYER_STATS_FINAL.CSV", "utf-8-sig",
+        [
+            ("id", "match_id", "INTEGER"),
+            ("player_id", "player_id", "TEXT"),
+            ("#", "shirt_number", "INTEGER"),
+            ("Nation", "nation", "TEXT"),
+            ("Pos", "pos", "TEXT"),
+            ("Age", "age", "TEXT"),
+            ("Age_dias", "age_dias", "INTEGER"),
+        ] + [(c, c.lower(), "INTEGER") for c in [
+            "Min", "Gls", "Ast", "PK", "PKatt", "Sh", "SoT", "CrdY", "CrdR",
+            "Fls", "Fld", "Off", "Crs", "TklW", "Int", "OG", "PKwon", "PKcon",
+        ]],
+        ["match_id", "player_id"], ["player_id"],
+    ),
+    "estadisticas_equipo": (
+        "TEAM_MATCH_STATS_FINAL.csv", "utf-8-sig",
+        [
+            ("match_id", "match_id", "INTEGER"),
+            ("team_id", "team_id", "TEXT"),
+            ("side", "side", "TEXT"),
+            ("possession", "possession", "INTEGER"),
+            ("shots_on_target", "shots_on_target", "INTEGER"),
+            ("shots_total", "shots_total", "INTEGER"),
+            ("saves", "saves", "INTEGER"),
+            ("cards", "cards", "INTEGER"),
+        ],
+        ["match_id", "team_id"], ["team_id"],
+    ),
+}
+
+
+# ============================
+# ESQUEMA
+# ============================
+
+def esquema(tabla):
+    """CREATE TABLE + CREATE INDEX de una tabla de TABLAS."""
+    _, _, columnas, pk, indices = TABLAS[tabla]
+    defs = [f'"{sql}" {tipo}' + (" NOT NULL" if sql in pk else "") for _, sql, tipo in columnas]
+    defs.append(f"PRIMARY KEY ({', '.join(pk)})")
+    sentencias = [f"CREATE TABLE IF NOT EXISTS {tabla} (\n    " + ",\n    ".join(defs) + "\n)"]
+    sentencias += [
+        f"CREATE INDEX IF NOT EXISTS idx_{tabla}_{col} ON {tabla} ({col})" for col in indices
+    ]
+    return sentencias
+
+
+def conectar(path=DB_FILE):
+    con = sqlite3.connect(path)
+    con.execute("PRAGMA journal_mode = WAL")
+    con.execute("PRAGMA synchronous = NORMAL")
+    for tabla, (_, _, columnas, _, _) in TABLAS.items():
+        for sql in esquema(tabla):
+            con.execute(sql)
+        # Bases creadas con una versión anterior: se añaden las columnas nuevas
+        existentes = {fila[1] for fila in con.execute(f"PRAGMA table_info({tabla})")}
+        for _, col, tipo in columnas:
+            if col not in existentes:
+                con.execute(f'ALTER TABLE {tabla} ADD COLUMN "{col}" {tipo}')
+    con.commit()
+    return con
+
+
+# ============================
+# CSV → filas tipadas
+# ============================
+
+def _tipar(serie, tipo):
+    if tipo == "TEXT":
+        return serie.astype("string").str.strip().replace("", pd.NA)
+    numeros = pd.to_numeric(serie, errors="coerce")
+    if tipo == "INTEGER":
+        # "2006.0" (entero que pasó por float) → 2006
+        return numeros.round().astype("Int64")
+    return numeros.astype("Float64")
+
+
+def filas(tabla, path=None):
+    """
+    (DataFrame con las columnas SQL de la tabla, tipado y sin filas sin
+    clave; nº de filas omitidas por no tener clave).
+    """
+    fichero, encoding, columnas, pk, _ = TABLAS[tabla]
+    df = pd.read_csv(path or fichero, dtype=str, encoding=encoding)
+
+    sobran = [c for c in df.columns if c not in IGNORAR and c not in {csv for csv, _, _ in columnas}]
+    if sobran:
+        print(f"   ⚠ {tabla}: columnas sin sitio en la tabla (se ignoran): {sobran}")
+
+    out = pd.DataFrame({
+        sql: _tipar(df[csv], tipo) if csv in df.columns else pd.Series(pd.NA, index=df.index)
+        for csv, sql, tipo in columnas
+    })
+    sin_clave = out[pk].isna().any(axis=1)
+    if sin_clave.any():
+        print(f"   ⚠ {tabla}: {int(sin_clave.sum())} filas sin {'/'.join(pk)} (omitidas)")
+    return out[~sin_clave], int(sin_clave.sum())
+
+
+# ============================
+# CARGA
+# ============================
+
+def sql_upsert(tabla, cols, clave):
+    """INSERT ... ON CONFLICT (clave) DO UPDATE del resto de columnas."""
+    resto = [c for c in cols if c not in clave]
+    nombres = ", ".join(f'"{c}"' for c in cols)
+    accion = "DO UPDATE SET " + ", ".join(f'"{c}" = excluded."{c}"' for c in resto) if resto else "DO NOTHING"
+    return (
+        f"INSERT INTO {tabla} ({nombres}) VALUES ({', '.join('?' * len(cols))}) "
+        f"ON CONFLICT ({', '.join(clave)}) {accion}"
+    )
+
+
+def tuplas(df):
+    """Filas de `df` como tuplas para executemany (nulos → None)."""
+    return df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+
+
+def _claves(df, pk, mostrar):
+    claves = list(df[pk].astype(str).agg("/".join, axis=1).drop_duplicates())
+    return f"{len(claves)} claves: {claves[:mostrar]}" + (
+        f" y {len(claves) - mostrar} más" if len(claves) > mostrar else "")
+
+
+def sin_repetidas(tabla, df, mostrar=10, rechazadas=None):
+    """
+    `df` con una sola fila por clave primaria, nº de filas repetidas
+    idénticas quitadas y nº de filas rechazadas. Las claves cuyas filas
+    difieren no se cargan: van todas a `rechazadas` (RECHAZADAS).
+    """
+    pk = TABLAS[tabla][3]
+    path = rechazadas or RECHAZADAS.format(tabla=tabla)
+
+    copias = df.duplicated(keep="first")
+    if copias.any():
+        print(f"   ⚠ {tabla}: {int(copias.sum())} filas idénticas repetidas (se carga una) en "
+              + _claves(df[copias], pk, mostrar))
+    df = df[~copias]
+
+    conflicto = df.duplicated(pk, keep=False)
+    if conflicto.any():
+        df[conflicto].sort_values(pk, kind="stable").to_csv(path, index=False, encoding="utf-8-sig")
+        print(f"   ❌ {tabla}: {int(conflicto.sum())} filas con {'/'.join(pk)} repetido y datos "
+              f"distintos (no se cargan, → {path}) en " + _claves(df[conflicto], pk, mostrar))
+    elif os.path.exists(path):
+        os.remove(path)   # de una carga anterior: ya no aplica
+    return df[~conflicto], int(copias.sum()), int(conflicto.sum())
+
+
+def cargar(con, tabla, df, reemplazar=False):
+    """
+    Upsert de `df` en `tabla` en una sola transacción, sin claves
+    repetidas. Devuelve (filas nuevas, actualizadas, repetidas quitadas,
+    rechazadas).
+    """
+    _, _, columnas, pk, _ = TABLAS[tabla]
+    cols = [sql for _, sql, _ in columnas]
+    df, repetidas, rechazadas = sin_repetidas(tabla, df)
+
+    with con:
+        if reemplazar:
+            con.execute(f"DELETE FROM {tabla}")
+        antes = con.execute(f"SELECT COUNT(*) FROM {tabla}").fetchone()[0]
+        con.executemany(sql_upsert(tabla, cols, pk), tuplas(df[cols]))
+        nuevas = con.execute(f"SELECT COUNT(*) FROM {tabla}").fetchone()[0] - antes
+    return nuevas, len(df) - nuevas, repetidas, rechazadas
+
+
+def cargar_todo(path=DB_FILE, reemplazar=False):
+    con = conectar(path)
+    try:
+        for tabla in TABLAS:
+            df, omitidas = filas(tabla)
+            nuevas, actualizadas, repetidas, rechazadas = cargar(con, tabla, df, reemplazar)
+            total = con.execute(f"SELECT COUNT(*) FROM {tabla}").fetchone()[0]
+            print(f"   💾 {tabla}: {nuevas} nuevas, {actualizadas} actualizadas, "
+                  f"{omitidas} omitidas sin clave, {repetidas} repetidas, "
+                  f"{rechazadas} rechazadas ({total} en la tabla)")
+    finally:
+        con.close()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Carga los *_FINAL en SQLite")
+    ap.add_argument("--bd", default=DB_FILE, help="fichero SQLite de destino")
+    ap.add_argument("--reemplazar", action="store_true", help="vacía cada tabla antes de cargarla")
+    args = ap.parse_args()
+
+    print(f"🗄  Cargando {args.bd}...")
+    cargar_todo(args.bd, args.reemplazar)
+    print(f"✔ Base de datos lista → {args.bd}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+Escritura por lotes de la salida de los scrapers
+- EscritorLotes acumula en memoria los DataFrames de cada partido y los
+  vuelca cada MAX_PARTIDOS partidos o MAX_SEG segundos (se comprueba al
+  añadir) y siempre al cerrar.
+- Volcado con "marca de commit": los partidos del lote se marcan
+  'en_curso' en el índice, se escribe (y fsync), y solo entonces se
+  registran como 'ok'. Si el proceso muere se pierde como mucho el lote
+  en memoria, que se vuelve a descargar (o a sacar de archivo_html/).
+- volcar_csv: un único to_csv por lote. Si el lote trae columnas que el
+  CSV no tiene, se reescribe entero a un .tmp y se renombra (nunca se
+  pierden columnas ni se desalinean filas).
+  Con por_nombre=False las filas se añaden por posición, como siempre
+  (team_raw.csv: las columnas de team_stats se llaman como los equipos
+  de cada partido y normalizar_team_stats.py lo lee con header=None).
+"""
+
+import os
+import time
+
+import pandas as pd
+
+import indice_partidos
+
+# ============================
+# CONFIG
+# ============================
+MAX_PARTIDOS = 10
+MAX_SEG = 60
+
+
+# ============================
+# CSV
+# ============================
+
+def _cabecera_csv(path):
+    """Columnas del CSV (solo la 1ª línea) o None si no existe / está vacío."""
+    if not (os.path.exists(path) and os.path.getsize(path) > 0):
+        return None
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def _reemplazar_csv(path, df):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8", newline="") as f:
+        df.to_csv(f, index=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _anadir_por_posicion(path, lote):
+    existe = os.path.exists(path) and os.path.getsize(path) > 0
+    with open(path, "a", encoding="utf-8", newline="") as f:
+        for i, (_, df) in enumerate(lote):
+            df.to_csv(f, index=False, header=(not existe and i == 0))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def volcar_csv(path, lote, por_nombre=True):
+    """Escribe un lote [(url, df), ...] en el CSV (una apertura por lote)."""
+    if not por_nombre:
+        _anadir_por_posicion(path, lote)
+        return
+
+    df = pd.concat([d for _, d in lote], ignore_index=True)
+    cabecera = _cabecera_csv(path)
+
+    if cabecera is None:
+        _reemplazar_csv(path, df)
+        return
+
+    nuevas = [c for c in df.columns if c not in cabecera]
+    if nuevas:
+        # El esquema crece: se reescribe el fichero con las columnas nuevas al final
+        print(f"   ➕ Columnas nuevas en {path}: {nuevas}")
+        previo = pd.read_csv(path, dtype=str, keep_default_na=False)
+        _reemplazar_csv(path, pd.concat([previo, df], ignore_index=True)[cabecera + nuevas])
+        return
+
+    with open(path, "a", encoding="utf-8", newline="") as f:
+        df.reindex(columns=cabecera).to_csv(f, index=False, header=False)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+# ============================
+# ESCRITOR
+# ============================
+
+class EscritorLotes:
+    """
+    Buffer de partidos → `volcar_lote([(url, df), ...])`.
+    `scraper` es la clave en partidos_procesados.sqlite.
+    """
+
+    def __init__(self, scraper, volcar_lote, max_partidos=MAX_PARTIDOS, max_seg=MAX_SEG):
+        self.scraper = scraper
+        self.volcar_lote = volcar_lote
+        self.max_partidos = max_partidos
+        self.max_seg = max_seg
+        self.lote = []
+        self._desde = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.volcar()
+
+    def anadir(self, url, df):
+        if not self.lote:
+            self._desde = time.monotonic()
+        self.lote.append((url, df))
+        if len(self.lote) >= self.max_partidos or time.monotonic() - self._desde >= self.max_seg:
+            self.volcar()
+
+    def volcar(self):
+        """Escribe lo acumulado y lo registra en el índice."""
+        if not self.lote:
+            return
+        lote, self.lote = self.lote, []
+
+        urls = [u for u, _ in lote]
+        indice_partidos.marcar_en_curso_lote(self.scraper, urls)
+        self.volcar_lote(lote)
+        indice_partidos.registrar_lote(self.scraper, {u: len(d) for u, d in lote})
+
+        filas = sum(len(d) for _, d in lote)
+        print(f"   💾 [{self.scraper}] lote de {len(lote)} partidos ({filas} filas) escrito")
@@ -2,88 +2,61 @@
 """
 Scraper incremental de estadísticas de JUGADORES (FBref - LaLiga)
 VERSION FINAL - Maneja MultiIndex headers correctamente
+
+Descarga, parseo y escritura van en etapas separadas (etapas.py):
+la página siguiente se carga mientras un proceso aparte parsea la
+anterior y un único hilo escribe en el almacén.
+
+Salida: jugadores_raw/ (Parquet, un fichero por partido, ver
+almacen_raw.py). Si existe el jugadores_raw.csv antiguo se migra solo
+la primera vez.
 """
 
 import os
-import time
-import re
-from io import StringIO
+import argparse
 import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+
+import almacen_raw
+import archivo_html
+import escritor_lotes
+import etapas
+import indice_partidos
+import obtener_paginas
+import recuperar_raw
+import ritmo
+from extractor_tablas import IDS_JUGADORES, buscar_tablas, tabla_a_df
 
 # ============================
 # CONFIG
 # ============================
-FIXTURES_URL = "https://fbref.com/en/comps/12/schedule/La-Liga-Scores-and-Fixtures"
-RAW_FILE = "jugadores_raw.csv"
+RAW_DIR = "jugadores_raw"          # almacén Parquet (un fichero por partido)
+RAW_CSV_ANTIGUO = "jugadores_raw.csv"
+NOMBRE = "jugadores"   # clave en partidos_procesados.sqlite
 
-WAIT_FIXTURES_SEC = 25
 WAIT_PARTIDO_SEC = 20
-RETRIES_POR_PARTIDO = 3
-SLEEP_ENTRE_REINTENTOS = 0.8
-SLEEP_ENTRE_PARTIDOS = 0.4
+
+# Regex de la tabla que necesita este extractor (espera en el navegador)
+MARCADOR = r'id="stats_[0-9a-f]{8}_summary"'
 
 # ==============================================
 # FUNCIONES AUXILIARES
 # ==============================================
 
-def _flatten_columns(df):
-    """Aplana columnas MultiIndex de forma robusta."""
-    if isinstance(df.columns, pd.MultiIndex):
-        new_cols = []
-        for col_tuple in df.columns:
-            parts = [str(x) for x in col_tuple if not (pd.isna(x) or 'Unnamed' in str(x))]
-            if len(parts) == 0:
-                new_cols.append(str(col_tuple[-1]))
-            elif len(parts) == 1:
-                new_cols.append(parts[0])
-            else:
-                new_cols.append('_'.join(parts))
-        df.columns = new_cols
-    else:
-        df.columns = [str(c) for c in df.columns]
-    return df
-
-
-def uncomment_fbref_tables(html):
-    """FBref comenta las tablas. Esta función las descomenta."""
-    pattern = r'<!--(.*?<table.*?</table>.*?)-->'
-    def replace_comment(match):
-        return match.group(1)
-    return re.sub(pattern, replace_comment, html, flags=re.DOTALL)
-
-
 # ============================
 #  EXTRACCIÓN DE TABLAS
 # ============================
 
-def read_player_tables(driver):
+def read_player_tables(html):
     """
-    Lee TODAS las tablas de jugadores (standard, shooting, passing, misc...)
-    tanto visibles como comentadas, devolviendo un DF combinado.
+    Lee las tablas resumen de jugadores (stats_<hash>_summary), tanto
+    visibles como comentadas, devolviendo un DF combinado.
+    Recibe el HTML de la página (driver.page_source).
     """
-    html = driver.page_source
-
-    # 1. quitar comentarios FBref
-    html = re.sub(r"<!--|-->", "", html)
-
-    # 2. leer todas las tablas en la página
-    try:
-        dfs = pd.read_html(html)
-    except Exception:
-        return None
-
     tablas_validas = []
 
-    for df in dfs:
-        df = df.copy()
-        df = _flatten_columns(df)
+    for table_id, tabla in buscar_tablas(html, IDS_JUGADORES).items():
+        df = tabla_a_df(tabla)
 
-        # descartamos las que obvio NO son de jugadores
         if "Player" not in df.columns:
             continue
 
@@ -95,218 +68,76 @@ def read_player_tables(driver):
         if df.empty:
             continue
 
+        df["team"] = table_id.removeprefix("stats_")   # <hash>_summary
         tablas_validas.append(df)
 
     if not tablas_validas:
         return None
 
     # unir todas las tablas
-    final = pd.concat(tablas_validas, ignore_index=True)
-
-    return final
-    """Extrae TODAS las tablas de jugadores."""
-    all_tables = []
-    stat_divs = driver.find_elements(By.CSS_SELECTOR, "div[id^='div_stats_']")
-    
-    print(f"   🔍 Encontrados {len(stat_divs)} divs con id div_stats_*")
-
-    for div in stat_divs:
-        try:
-            div_id = div.get_attribute("id")
-            stat_type = div_id.replace("div_stats_", "")
-            
-            # Saltar tablas que no son de jugadores
-            if any(x in stat_type for x in ['keeper_', 'team_']):
-                continue
-
-            html = div.get_attribute("outerHTML")
-            html_uncommented = uncomment_fbref_tables(html)
-            dfs = pd.read_html(StringIO(html_uncommented))
-            
-            if not dfs:
-                continue
-                
-            df = dfs[0]
-            df = _flatten_columns(df)
-            
-            if "Player" not in df.columns:
-                continue
-
-            # Limpiar
-            df = df[df["Player"].notna()]
-            df = df[df["Player"] != "Player"]
-            df = df[~df["Player"].isin(["Starting XI", "Bench", ""])]
-            
-            if df.empty:
-                continue
-            
-            # Verificar datos reales
-            non_null_cols = df.notna().sum(axis=1)
-            if non_null_cols.max() <= 1:
-                continue
-
-            # Extraer team hash
-            match = re.search(r"stats_(.*?)_", stat_type)
-            team_hash = match.group(1) if match else None
-
-            df["team"] = team_hash
-            df["stat_type"] = stat_type
-            
-            print(f"   ✅ {stat_type}: {len(df)} jugadores")
-            all_tables.append(df)
-
-        except Exception as e:
-            print(f"   ⚠️  Error en {div_id}: {e}")
-            continue
-
-    if not all_tables:
-        return None
-
-    result = pd.concat(all_tables, ignore_index=True)
-    print(f"   📦 Total: {len(result)} filas")
-    return result
+    return pd.concat(tablas_validas, ignore_index=True)
 
 
 # ============================
-# ALINEACIÓN AL ESQUEMA
+# 1) ALMACÉN Y URLs PROCESADAS
 # ============================
 
-def alinear_a_esquema(df, schema_cols):
-    """Alinea columnas al esquema existente."""
-    for c in schema_cols:
-        if c not in df.columns:
-            df[c] = pd.NA
-    return df[schema_cols]
+def _migrar_csv_antiguo(almacen):
+    """La primera vez, pasa jugadores_raw.csv (cabecera doble) al almacén."""
+    if not almacen.vacio():
+        return
+    if not (os.path.exists(RAW_CSV_ANTIGUO) and os.path.getsize(RAW_CSV_ANTIGUO) > 0):
+        print(f"ℹ️  Primera ejecución: creando {RAW_DIR}/ nuevo")
+        return
 
+    # Quita la cola rota si el CSV quedó a medias (y re-encola esos partidos)
+    recuperar_raw.recuperar_csv(RAW_CSV_ANTIGUO, NOMBRE, filas_cabecera=2)
 
-def append_al_csv(df, path, schema_cols):
-    """Añade el DF al CSV respetando el esquema."""
-    exists = os.path.exists(path) and os.path.getsize(path) > 0
-
-    if exists:
-        df2 = alinear_a_esquema(df.copy(), schema_cols)
-        df2.to_csv(path, mode="a", index=False, header=False, encoding="utf-8")
-        return schema_cols
-    else:
-        df.to_csv(path, mode="w", index=False, header=True, encoding="utf-8")
-        return list(df.columns)
-
-
-# ============================
-# 1) CARGAR ESQUEMA Y URLs PROCESADAS
-# ============================
-processed_urls = set()
-schema_cols = None
-
-if os.path.exists(RAW_FILE) and os.path.getsize(RAW_FILE) > 0:
     try:
-        # CRÍTICO: Leer con header MultiIndex [0,1] y luego aplanarlo
-        print("📂 Leyendo CSV existente...")
-        df_existing = pd.read_csv(RAW_FILE, header=[0, 1], nrows=5)
-        
-        # Aplanar el MultiIndex del header existente
-        df_existing = _flatten_columns(df_existing)
-        schema_cols = list(df_existing.columns)
-        
-        print(f"✔ Esquema detectado: {len(schema_cols)} columnas")
-        print(f"  Primeras 10: {schema_cols[:10]}")
-        
-        # Obtener URLs procesadas (leer con MultiIndex y aplanar)
-        df_urls = pd.read_csv(RAW_FILE, header=[0, 1])
-        df_urls = _flatten_columns(df_urls)
-        
-        if "match_url" in df_urls.columns:
-            processed_urls = set(df_urls["match_url"].dropna().unique().tolist())
-            print(f"✔ Partidos ya procesados: {len(processed_urls)}")
-        else:
-            print("⚠️  No se encontró columna match_url")
-            
+        print(f"📂 Migrando {RAW_CSV_ANTIGUO} a {RAW_DIR}/ (solo esta vez)...")
+        n = almacen_raw.importar_csv_dos_cabeceras(RAW_CSV_ANTIGUO, almacen)
+        print(f"✔ {n} partidos migrados")
     except Exception as e:
         print(f"❌ Error leyendo CSV: {e}")
-        print("💡 Tip: Si el CSV está corrupto, bórralo y empieza limpio")
+        print("💡 Tip: python recuperar_raw.py revisa la cola del CSV sin borrarlo")
         raise
-else:
-    print("ℹ️  Primera ejecución: creando jugadores_raw.csv nuevo")
 
-# ============================
-# 2) Conectar Selenium
-# ============================
-options = Options()
-options.add_experimental_option("debuggerAddress", "127.0.0.1:9222")
-driver = webdriver.Chrome(options=options)
 
-# ============================
-# 3) Cargar Fixtures
-# ============================
-driver.get(FIXTURES_URL)
+def _leer_match_urls(_):
+    """match_url por fila del almacén (para poblar el índice la 1ª vez)."""
+    return almacen.leer(columnas=["match_url"])["match_url"]
 
-try:
-    fixtures_table = WebDriverWait(driver, WAIT_FIXTURES_SEC).until(
-        EC.presence_of_element_located((By.CSS_SELECTOR, "table[id^='sched_']"))
-    )
-except:
-    print("❌ No apareció la tabla de Fixtures.")
-    raise
 
-rows = fixtures_table.find_elements(By.CSS_SELECTOR, "tbody tr")
-match_urls = []
-
-for r in rows:
-    try:
-        a = r.find_element(By.CSS_SELECTOR, 'td[data-stat="match_report"] a[href*="/matches/"]')
-        match_urls.append(a.get_attribute("href"))
-    except:
-        pass
+# Almacén de salida y su escritor por lotes (se abren en cargar_procesados)
+almacen = None
+escritor = None
 
-match_urls = list(dict.fromkeys(match_urls))
-new_matches = [u for u in match_urls if u not in processed_urls]
-
-print(f"➡️  Partidos con Match Report: {len(match_urls)}")
-print(f"🆕 Partidos NUEVOS: {len(new_matches)}")
-print("------------------------------------------------------------")
-
-# ============================
-# 4) SCRAPING PRINCIPAL
-# ============================
 
-total_filas = 0
+def cargar_procesados():
+    """Abre el almacén (migrando el CSV antiguo) y devuelve las URLs ya procesadas."""
+    global almacen, escritor
+    almacen = almacen_raw.AlmacenParquet(RAW_DIR)
+    escritor = escritor_lotes.EscritorLotes(NOMBRE, almacen.escribir_lote)
+    recuperar_raw.recuperar_almacen(almacen, NOMBRE)
+    _migrar_csv_antiguo(almacen)
 
-for i, url in enumerate(new_matches, 1):
-    print(f"\n({i}/{len(new_matches)}) {url}")
+    esquema = almacen.esquema()
+    if len(esquema):
+        print(f"✔ Esquema: {len(esquema)} columnas")
+        print(f"  Primeras 10: {esquema.names[:10]}")
 
-    try:
-        driver.get(url)
-    except:
-        print("   ❌ Error cargando URL")
-        continue
+    # URLs procesadas: índice SQLite (el almacén solo se lee la 1ª vez)
+    processed_urls = indice_partidos.procesados_o_migrar(NOMBRE, RAW_DIR, _leer_match_urls)
+    print(f"✔ Partidos ya procesados: {len(processed_urls)}")
+    return processed_urls
 
-    # Esperar contenido
-    try:
-        WebDriverWait(driver, WAIT_PARTIDO_SEC).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR,
-                "div[id^='div_stats_'], .scorebox"
-            ))
-        )
-    except:
-        pass
-
-    time.sleep(2)  # Espera para JS
-
-    # Reintentos
-    df_players = None
-    for retry in range(RETRIES_POR_PARTIDO):
-        if retry > 0:
-            print(f"   🔄 Reintento {retry}/{RETRIES_POR_PARTIDO}")
-        df_players = read_player_tables(driver)
-        if df_players is not None and not df_players.empty:
-            break
-        time.sleep(SLEEP_ENTRE_REINTENTOS)
 
-    if df_players is None or df_players.empty:
-        print("   ❌ No hay datos")
-        continue
+# ============================
+# 2) PROCESAR UN PARTIDO
+# ============================
 
-    # Añadir match_url
+def preparar_df_jugadores(df_players, url):
+    """Añade match_url/team y deja ambas columnas al final."""
     df_players["match_url"] = url
 
     # Asegurar columna team
@@ -319,21 +150,98 @@ for i, url in enumerate(new_matches, 1):
     # Reordenar
     cols = [c for c in df_players.columns if c not in ("team", "match_url")]
     cols += ["team", "match_url"]
-    df_players = df_players[cols]
+    return df_players[cols]
 
-    print(f"   📝 {len(df_players)} filas × {len(df_players.columns)} cols")
 
-    # Alinear al esquema si existe
-    if schema_cols is not None:
-        df_players = alinear_a_esquema(df_players, schema_cols)
+def parsear_partido(html, url):
+    """DF de jugadores listo para escribir, o None (corre en el pool de procesos)."""
+    df_players = read_player_tables(html)
+    if df_players is None or df_players.empty:
+        return None
+    return preparar_df_jugadores(df_players, url)
+
+
+def escribir_partido(df_players, url):
+    """
+    Pasa al escritor por lotes el DF de parsear_partido (solo desde el
+    proceso principal). Devuelve el número de filas, o None si no había datos.
+    """
+    if df_players is None:
+        return None
+
+    print(f"   📝 {len(df_players)} filas × {len(df_players.columns)} cols")
 
-    # Append
-    schema_cols = append_al_csv(df_players, RAW_FILE, schema_cols)
-    total_filas += len(df_players)
+    # Se escribe (y se registra en el índice) al volcar el lote
+    escritor.anadir(url, df_players)
 
     print(f"   ✅ {len(df_players)} jugadores añadidos")
+    return len(df_players)
+
+
+def procesar_partido(html, url):
+    """
+    Extrae los jugadores del HTML de un Match Report y los añade al CSV.
+    Devuelve el número de filas añadidas, o None si no había datos.
+    """
+    return escribir_partido(parsear_partido(html, url), url)
+
+
+def volcar_pendientes():
+    """Escribe el lote que quede en memoria (llamar al terminar)."""
+    if escritor is not None:
+        escritor.volcar()
+
+
+# ============================
+# 3) SCRAPING PRINCIPAL
+# ============================
+
+def main():
+    parser = argparse.ArgumentParser(description="Scraper de jugadores FBref (incremental)")
+    parser.add_argument("--backend", choices=obtener_paginas.BACKENDS, default="selenium",
+                        help="selenium (Chrome 9222) o http (cookies_fbref.txt, con fallback a Selenium)")
+    parser.add_argument("--procesos", type=int, default=etapas.N_PROCESOS,
+                        help="procesos parseando en paralelo (0 = todo en serie)")
+    args = parser.parse_args()
+
+    processed_urls = cargar_procesados()
+
+    obtenedor = obtener_paginas.crear(args.backend, ritmo.LimitadorAdaptativo())
+    match_urls = obtenedor.match_urls()
+    new_matches = [u for u in match_urls if u not in processed_urls]
+
+    print(f"➡️  Partidos con Match Report: {len(match_urls)}")
+    print(f"🆕 Partidos NUEVOS: {len(new_matches)}")
+    print("------------------------------------------------------------")
+
+    def descargas():
+        for i, url in enumerate(new_matches, 1):
+            print(f"\n({i}/{len(new_matches)}) {url}")
+            html = obtenedor.pagina(url, [MARCADOR], WAIT_PARTIDO_SEC)
+            if html is not None:
+                archivo_html.guardar(url, html)
+            yield url, html
+
+    total_filas = 0
+
+    def escribir(url, df_players):
+        nonlocal total_filas
+        n = escribir_partido(df_players, url)
+        if not n:
+            print(f"   ❌ No hay datos ({url})")
+            return
+        total_filas += n
+        processed_urls.add(url)
+
+    try:
+        errores = etapas.ejecutar(descargas(), parsear_partido, escribir, args.procesos)
+    finally:
+        volcar_pendientes()
+    if errores:
+        print(f"⚠️  {len(errores)} partidos fallaron al escribir (se reintentarán la próxima vez)")
+
+    print(f"\n🎉 Terminado. Total añadido: {total_filas} filas")
 
-    processed_urls.add(url)
-    time.sleep(SLEEP_ENTRE_PARTIDOS)
 
-print(f"\n🎉 Terminado. Total añadido: {total_filas} filas")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
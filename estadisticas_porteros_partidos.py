@@ -3,122 +3,70 @@
 Scraper SOLO de PORTEROS (FBref — LaLiga)
 - Extrae keeper_stats_<hash>
 - Extrae keeper_adv_stats_<hash>
-- Descomenta HTML
+- Lee las tablas (visibles o comentadas) con extractor_tablas (lxml)
 - Hace merge por Player + team + match_url
-- Guarda incrementalmente en goalkeeper_raw.csv
+- Guarda por lotes en goalkeeper_raw.csv (escritor_lotes)
+- Incremental: salta los partidos ya registrados en el índice y marca
+  cada partido al terminarlo (se puede cortar y relanzar)
+- --desde YYYY-MM-DD para refrescar solo las últimas jornadas:
+    python estadisticas_porteros_partidos.py --desde 2025-11-01
 """
 
-import os
-import time
-import re
+import argparse
 import pandas as pd
-from io import StringIO
 
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+import archivo_html
+import escritor_lotes
+import indice_partidos
+import obtener_paginas
+import recuperar_raw
+import ritmo
+from extractor_tablas import IDS_PORTEROS, IDS_PORTEROS_ADV, buscar_tablas, tabla_a_df
+from fbref_comun import fecha_arg, filtrar_desde
 
 
 # =========================
 # CONFIG
 # =========================
-FIXTURES_URL = "https://fbref.com/en/comps/12/schedule/La-Liga-Scores-and-Fixtures"
 GK_FILE = "goalkeeper_raw.csv"
+NOMBRE = "porteros"   # clave en partidos_procesados.sqlite
 
-WAIT_FIXTURES_SEC = 25
 WAIT_PARTIDO_SEC = 20
 
-
-# =========================
-# UTILIDADES
-# =========================
-
-def flatten(df):
-    """Aplana MultiIndex en columnas simples."""
-    if isinstance(df.columns, pd.MultiIndex):
-        cols = []
-        for col in df.columns:
-            parts = [str(x) for x in col if not (pd.isna(x) or "Unnamed" in str(x))]
-            cols.append("_".join(parts) if parts else col[-1])
-        df.columns = cols
-    else:
-        df.columns = [str(c) for c in df.columns]
-    return df
-
-
-def uncomment(html: str) -> str:
-    """Elimina comentarios HTML para dejar las tablas visibles a read_html."""
-    return re.sub(r"<!--|-->", "", html)
-
-
-def save_gk(df):
-    """Guardar incremental en goalkeeper_raw.csv"""
-    exists = os.path.exists(GK_FILE) and os.path.getsize(GK_FILE) > 0
-
-    df.to_csv(
-        GK_FILE,
-        mode="a" if exists else "w",
-        index=False,
-        header=not exists,
-        encoding="utf-8"
-    )
-    print(f"   💾 Guardadas {len(df)} filas en {GK_FILE}")
+# Regex de la tabla que necesita este extractor (espera en el navegador)
+MARCADOR = r'id="keeper_stats_[0-9a-f]{8}"'
 
 
 # =========================
-# EXTRACCIÓN DE PORTEROS
+# UTILIDADES
 # =========================
 
-def extract_gk_tables(page_source: str):
-    """
-    Devuelve dict:
-      - basic → keeper_stats_<hash>
-      - adv   → keeper_adv_stats_<hash>
-    """
-    html = uncomment(page_source)
-
-    # ---- TABLAS BÁSICAS (keeper_stats_<hash>) ----
-    basic = []
-    for m in re.finditer(r'(<table[^>]+id="keeper_stats_([^"]+)"[^>]*>.*?</table>)',
-                         html, re.DOTALL):
+def save_gk(lote):
+    """Vuelca un lote [(url, df), ...] en goalkeeper_raw.csv"""
+    escritor_lotes.volcar_csv(GK_FILE, lote)
 
-        table_html = m.group(1)
-        team_hash = m.group(2)
 
-        try:
-            df = pd.read_html(StringIO(table_html))[0]
-            df = flatten(df)
+# Escritor por lotes (se crea en cargar_procesados)
+escritor = None
 
-            if "Player" not in df.columns:
-                continue
 
-            df = df[df["Player"].notna()]
-            df = df[~df["Player"].isin(["", "Player", "Starting XI", "Bench"])]
+def volcar_pendientes():
+    """Escribe el lote que quede en memoria (llamar al terminar)."""
+    if escritor is not None:
+        escritor.volcar()
 
-            if df.empty:
-                continue
 
-            df["team"] = team_hash
-            basic.append(df)
-
-        except Exception as e:
-            print(f"   ⚠️ Error tabla básica {team_hash}: {e}")
-
-    df_basic = pd.concat(basic, ignore_index=True) if basic else None
-
-    # ---- TABLAS AVANZADAS (keeper_adv_stats_<hash>) ----
-    adv = []
-    for m in re.finditer(r'(<table[^>]+id="keeper_adv_stats_([^"]+)"[^>]*>.*?</table>)',
-                         html, re.DOTALL):
+# =========================
+# EXTRACCIÓN DE PORTEROS
+# =========================
 
-        table_html = m.group(1)
-        team_hash = m.group(2)
+def _tablas_gk(page_source, patron, prefijo, etiqueta):
+    tablas = []
+    for table_id, tabla in buscar_tablas(page_source, patron).items():
+        team_hash = table_id[len(prefijo):]
 
         try:
-            df = pd.read_html(StringIO(table_html))[0]
-            df = flatten(df)
+            df = tabla_a_df(tabla)
 
             if "Player" not in df.columns:
                 continue
@@ -130,14 +78,24 @@ def extract_gk_tables(page_source: str):
                 continue
 
             df["team"] = team_hash
-            adv.append(df)
+            tablas.append(df)
 
         except Exception as e:
-            print(f"   ⚠️ Error tabla avanzada {team_hash}: {e}")
+            print(f"   ⚠️ Error tabla {etiqueta} {team_hash}: {e}")
 
-    df_adv = pd.concat(adv, ignore_index=True) if adv else None
+    return pd.concat(tablas, ignore_index=True) if tablas else None
 
-    return {"basic": df_basic, "adv": df_adv}
+
+def extract_gk_tables(page_source: str):
+    """
+    Devuelve dict:
+      - basic → keeper_stats_<hash>
+      - adv   → keeper_adv_stats_<hash>
+    """
+    return {
+        "basic": _tablas_gk(page_source, IDS_PORTEROS, "keeper_stats_", "básica"),
+        "adv": _tablas_gk(page_source, IDS_PORTEROS_ADV, "keeper_adv_stats_", "avanzada"),
+    }
 
 
 def merge_gk(df_basic, df_adv, match_url):
@@ -169,75 +127,86 @@ def merge_gk(df_basic, df_adv, match_url):
     return merged
 
 
-# =========================
-# PROCESO PRINCIPAL
-# =========================
+def cargar_procesados():
+    """URLs que ya tienen filas en goalkeeper_raw.csv (según el índice)."""
+    global escritor
+    # Un partido por lote: cada partido queda escrito y marcado al terminarlo
+    escritor = escritor_lotes.EscritorLotes(NOMBRE, save_gk, max_partidos=1)
+    recuperar_raw.recuperar_csv(GK_FILE, NOMBRE)
+    return indice_partidos.procesados_o_migrar(
+        NOMBRE, GK_FILE, lambda p: pd.read_csv(p, usecols=["match_url"])["match_url"]
+    )
 
-def main():
 
-    print("🚀 Scraper SOLO porteros iniciado...")
+def procesar_partido(html, url):
+    """Extrae y guarda los porteros de un partido. None si no hay tabla."""
+    gk = extract_gk_tables(html)
+    df_basic = gk["basic"]
+    df_adv = gk["adv"]
 
-    # Chrome debugger mode (9222)
-    options = Options()
-    options.add_experimental_option("debuggerAddress", "127.0.0.1:9222")
-    from selenium.webdriver.chrome.service import Service
+    if df_basic is None:
+        print("   ❌ No se encontró tabla keeper_stats_*")
+        return None
 
-    service = Service()
-    driver = webdriver.Chrome(service=service, options=options)
+    df = merge_gk(df_basic, df_adv, url)
 
-    driver.get(FIXTURES_URL)
+    escritor.anadir(url, df)
+    return len(df)
 
-    WebDriverWait(driver, WAIT_FIXTURES_SEC).until(
-        EC.presence_of_element_located((By.CSS_SELECTOR, "table[id^='sched_']"))
-    )
 
-    rows = driver.find_elements(By.CSS_SELECTOR, "table[id^='sched_'] tbody tr")
+# =========================
+# PROCESO PRINCIPAL
+# =========================
 
-    match_urls = []
-    for r in rows:
-        try:
-            a = r.find_element(By.CSS_SELECTOR, 'td[data-stat="match_report"] a')
-            match_urls.append(a.get_attribute("href"))
-        except:
-            pass
+def main():
+    parser = argparse.ArgumentParser(description="Scraper de porteros FBref (incremental)")
+    parser.add_argument("--desde", "--since", type=fecha_arg, default=None,
+                        help="solo partidos con fecha >= YYYY-MM-DD")
+    parser.add_argument("--backend", choices=obtener_paginas.BACKENDS, default="selenium",
+                        help="selenium (Chrome 9222) o http (cookies_fbref.txt, con fallback a Selenium)")
+    args = parser.parse_args()
 
-    match_urls = list(dict.fromkeys(match_urls))
-    print(f"📌 Partidos detectados: {len(match_urls)}")
+    print("🚀 Scraper SOLO porteros iniciado...")
 
-    total = 0
+    processed_urls = cargar_procesados()
+    print(f"✔ Partidos ya procesados: {len(processed_urls)}")
 
-    for i, url in enumerate(match_urls, 1):
-        print(f"\n({i}/{len(match_urls)}) {url}")
+    # Chrome debugger mode (9222) o HTTP con cookies
+    obtenedor = obtener_paginas.crear(args.backend, ritmo.LimitadorAdaptativo())
 
-        driver.get(url)
-        time.sleep(1.2)
+    match_urls = obtenedor.match_urls()
+    print(f"📌 Partidos detectados: {len(match_urls)}")
 
-        # asegurar carga mínima
-        try:
-            WebDriverWait(driver, WAIT_PARTIDO_SEC).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, ".scorebox"))
-            )
-        except:
-            print("   ⚠️ Scorebox no cargó; continuar...")
-            continue
+    match_urls = filtrar_desde(match_urls, args.desde)
+    if args.desde is not None:
+        print(f"📅 Desde {args.desde}: {len(match_urls)}")
 
-        html = driver.page_source
+    match_urls = [u for u in match_urls if u not in processed_urls]
+    print(f"🆕 Partidos NUEVOS: {len(match_urls)}")
 
-        gk = extract_gk_tables(html)
-        df_basic = gk["basic"]
-        df_adv = gk["adv"]
+    total = 0
 
-        if df_basic is None:
-            print("   ❌ No se encontró tabla keeper_stats_*")
-            continue
+    try:
+        for i, url in enumerate(match_urls, 1):
+            print(f"\n({i}/{len(match_urls)}) {url}")
 
-        df = merge_gk(df_basic, df_adv, url)
+            html = obtenedor.pagina(url, [MARCADOR], WAIT_PARTIDO_SEC)
+            if html is None:
+                continue
+            archivo_html.guardar(url, html)
+
+            # procesar_partido lo deja en el lote; al volcarlo queda registrado (checkpoint)
+            n = procesar_partido(html, url)
+            if n is None:
+                continue
 
-        save_gk(df)
-        total += len(df)
+            total += n
+            processed_urls.add(url)
+    finally:
+        volcar_pendientes()
 
     print(f"\n🎉 Finalizado. Total porteros extraídos: {total}")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Pipeline por etapas para los scrapers de partidos
+  descarga (hilo)  →  cola acotada  →  parseo (pool de procesos)  →  escritura (hilo único)
+
+- La descarga no espera a pandas ni al disco: mientras se parsea un
+  partido ya se está cargando el siguiente.
+- Las colas están acotadas (MAX_COLA páginas esperando y MAX_EN_VUELO
+  partidos entre parseo y escritura): si el parseo o el disco se quedan
+  atrás, la descarga se frena sola (backpressure) y la memoria no crece.
+- Un solo escritor: el CSV, el esquema y el índice SQLite solo se tocan
+  desde un hilo, en el orden en que terminan los parseos.
+
+`parsear(html, url)` debe ser una función de nivel de módulo (se envía a
+otro proceso) y devolver algo serializable (p.ej. un DataFrame) o None.
+`escribir(url, resultado)` se ejecuta en el proceso principal.
+"""
+
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# ============================
+# CONFIG
+# ============================
+N_PROCESOS = 2
+MAX_COLA = 4        # páginas descargadas esperando a ser parseadas
+MAX_EN_VUELO = 8    # partidos parseándose o esperando al escritor
+
+_FIN = None
+
+
+# ============================
+# ETAPAS
+# ============================
+
+def _productor(descargas, paginas):
+    """Mete (url, html) en la cola; se bloquea si el parseo va atrasado."""
+    try:
+        for url, html in descargas:
+            if html is not None:
+                paginas.put((url, html))
+    except Exception as e:
+        print(f"   ❌ Descarga interrumpida: {e}")
+    finally:
+        paginas.put(_FIN)
+
+
+def _escritor(resultados, escribir, cupos, errores):
+    """Único hilo que escribe; libera un cupo por partido terminado."""
+    while True:
+        item = resultados.get()
+        if item is _FIN:
+            return
+        url, futuro = item
+        try:
+            escribir(url, futuro.result())
+        except Exception as e:
+            print(f"   ❌ {url}: {e}")
+            errores.append((url, e))
+        finally:
+            cupos.release()
+
+
+# ============================
+# API
+# ============================
+
+def ejecutar(descargas, parsear, escribir, n_procesos=N_PROCESOS,
+             max_cola=MAX_COLA, max_en_vuelo=MAX_EN_VUELO):
+    """
+    Consume `descargas` (iterable de (url, html)) pasando cada página por
+    `parsear` en un pool de procesos y por `escribir` en un único hilo.
+    Con n_procesos=0 todo va en este proceso, partido a partido.
+    Devuelve la lista de (url, excepción) que fallaron al escribir.
+    """
+    errores = []
+
+    if n_procesos <= 0:
+        for url, html in descargas:
+            if html is None:
+                continue
+            try:
+                escribir(url, parsear(html, url))
+            except Exception as e:
+                print(f"   ❌ {url}: {e}")
+                errores.append((url, e))
+        return errores
+
+    paginas = queue.Queue(maxsize=max_cola)
+    resultados = queue.Queue()          # acotada por `cupos`
+    cupos = threading.BoundedSemaphore(max_en_vuelo)
+
+    productor = threading.Thread(target=_productor, args=(descargas, paginas), daemon=True)
+    escritor = threading.Thread(target=_escritor, args=(resultados, escribir, cupos, errores), daemon=True)
+    productor.start()
+    escritor.start()
+
+    with ProcessPoolExecutor(max_workers=n_procesos) as pool:
+        while True:
+            item = paginas.get()
+            if item is _FIN:
+                break
+            url, html = item
+
+            cupos.acquire()
+            futuro = pool.submit(parsear, html, url)
+            futuro.add_done_callback(lambda f, url=url: resultados.put((url, f)))
+    # al salir del with ya han terminado todos los parseos (y sus callbacks)
+
+    resultados.put(_FIN)
+    escritor.join()
+    productor.join()
+    return errores
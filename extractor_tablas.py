@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+Extractor de tablas FBref con lxml
+- Parsea la página UNA vez (caché por HTML: los tres extractores que
+  reciben el mismo page_source comparten el árbol).
+- Solo mira las tablas que usamos, visibles o dentro de <!-- -->:
+    stats_<hash>_summary, keeper_stats_<hash>, keeper_adv_stats_<hash>, team_stats
+- Construye los DataFrames directamente desde las celdas, con los mismos
+  nombres de columna que daba pd.read_html + aplanado ("Performance_Gls").
+"""
+
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import lxml.html
+from lxml import etree
+
+# ============================
+# IDS DE INTERÉS
+# ============================
+IDS_JUGADORES = re.compile(r"^stats_[0-9a-f]{8}_summary$")
+IDS_PORTEROS = re.compile(r"^keeper_stats_[0-9a-f]{8}$")
+IDS_PORTEROS_ADV = re.compile(r"^keeper_adv_stats_[0-9a-f]{8}$")
+IDS_EQUIPO = re.compile(r"^team_stats(_extra)?$")
+
+_IDS_INTERES = (IDS_JUGADORES, IDS_PORTEROS, IDS_PORTEROS_ADV)
+_CONTENEDORES = ("team_stats", "team_stats_extra")   # div#id > table (sin id)
+
+# Para decidir rápido si merece la pena parsear un comentario
+_RE_INTERES_TXT = re.compile(r'id="(?:stats_[0-9a-f]{8}_summary|keeper_(?:adv_)?stats_|team_stats)')
+
+_WS = re.compile(r"\s+")
+_NUM = re.compile(r"^-?[\d,]*\.?\d+$")
+
+
+# ============================
+# PARSEO (una vez por página)
+# ============================
+
+def _recoger(root, tablas):
+    for t in root.iter("table"):
+        tid = t.get("id")
+        if tid and any(p.match(tid) for p in _IDS_INTERES):
+            tablas.setdefault(tid, t)
+
+    for cid in _CONTENEDORES:
+        for div in root.xpath(f'.//*[@id="{cid}"]'):
+            t = next(div.iter("table"), None)
+            if t is not None:
+                tablas.setdefault(cid, t)
+
+
+@lru_cache(maxsize=8)
+def arbol_de_pagina(html: str):
+    """Árbol lxml de la página (compartido por tablas, scorebox y fixtures)."""
+    return lxml.html.fromstring(html)
+
+
+@lru_cache(maxsize=8)
+def tablas_de_pagina(html: str) -> dict:
+    """{id: <table>} con todas las tablas de interés de la página."""
+    root = arbol_de_pagina(html)
+    tablas = {}
+    _recoger(root, tablas)
+
+    # FBref esconde la mayoría de tablas en comentarios
+    for c in root.iter(etree.Comment):
+        txt = c.text or ""
+        if "<table" in txt and _RE_INTERES_TXT.search(txt):
+            frag = lxml.html.fragment_fromstring(txt, create_parent="div")
+            _recoger(frag, tablas)
+
+    return tablas
+
+
+def buscar_tablas(html: str, patron) -> dict:
+    """{id: <table>} de las tablas cuyo id casa con `patron`."""
+    return {tid: t for tid, t in tablas_de_pagina(html).items() if patron.match(tid)}
+
+
+# ============================
+# <table> → DataFrame
+# ============================
+
+def _texto(celda) -> str:
+    return _WS.sub(" ", celda.text_content().strip())
+
+
+def _expandir(tr):
+    """Celdas de una fila repitiendo el texto según colspan (como read_html)."""
+    out = []
+    for celda in tr:
+        if not isinstance(celda.tag, str) or celda.tag not in ("th", "td"):
+            continue
+        try:
+            span = int(celda.get("colspan", 1))
+        except ValueError:
+            span = 1
+        out.extend([_texto(celda)] * max(span, 1))
+    return out
+
+
+def _es_todo_th(tr) -> bool:
+    celdas = [c for c in tr if isinstance(c.tag, str) and c.tag in ("th", "td")]
+    return bool(celdas) and all(c.tag == "th" for c in celdas)
+
+
+def _nombres_columnas(cabeceras, n_cols):
+    """Une los niveles de cabecera con '_' (sin vacíos) y desduplica."""
+    nombres = []
+    for j in range(n_cols):
+        partes = []
+        for fila in cabeceras:
+            v = fila[j] if j < len(fila) else ""
+            if v and v not in partes:
+                partes.append(v)
+        nombres.append("_".join(partes) if partes else f"Unnamed: {j}")
+
+    vistos = {}
+    for j, n in enumerate(nombres):
+        if n in vistos:
+            vistos[n] += 1
+            nombres[j] = f"{n}.{vistos[n]}"
+        else:
+            vistos[n] = 0
+    return nombres
+
+
+def _tipar(df):
+    """Vacíos → NaN y columnas numéricas a número (miles con coma)."""
+    df = df.where(df != "", np.nan)
+    for c in df.columns:
+        col = df[c]
+        no_nulos = col.dropna()
+        if no_nulos.empty or not no_nulos.str.match(_NUM).all():
+            continue
+        df[c] = pd.to_numeric(col.str.replace(",", "", regex=False))
+    return df
+
+
+def tabla_a_df(tabla):
+    """DataFrame de una <table> FBref (thead/tbody/tfoot)."""
+    thead = tabla.find("thead")
+    filas_cuerpo = []
+    for sec in tabla:
+        if sec.tag in ("tbody", "tfoot"):
+            filas_cuerpo.extend(tr for tr in sec if tr.tag == "tr")
+        elif sec.tag == "tr":
+            filas_cuerpo.append(sec)
+
+    if thead is not None:
+        filas_cab = [tr for tr in thead if tr.tag == "tr"]
+    else:
+        filas_cab = []
+        while filas_cuerpo and _es_todo_th(filas_cuerpo[0]):
+            filas_cab.append(filas_cuerpo.pop(0))
+
+    # Filas separadoras / cabeceras repetidas dentro del tbody
+    filas_cuerpo = [
+        tr for tr in filas_cuerpo
+        if not {"thead", "spacer"} & set((tr.get("class") or "").split())
+    ]
+
+    cabeceras = [_expandir(tr) for tr in filas_cab]
+    datos = [_expandir(tr) for tr in filas_cuerpo]
+
+    n_cols = max([len(f) for f in cabeceras + datos] or [0])
+    datos = [f + [""] * (n_cols - len(f)) for f in datos]
+
+    df = pd.DataFrame(datos, columns=_nombres_columnas(cabeceras, n_cols), dtype=object)
+    return _tipar(df)
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+Utilidades compartidas por los scrapers de partidos (FBref - LaLiga)
+- Conexión al Chrome abierto en modo depurador (127.0.0.1:9222)
+- Fixtures y scorebox leídos de UN page_source con lxml (sin un
+  find_element por fila): registros con hash, URL, fecha, equipos,
+  marcador y estado
+- Filtro --desde por la fecha del slug (urls_partido.py)
+"""
+
+from datetime import date
+from urllib.parse import urljoin
+
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+from extractor_tablas import arbol_de_pagina
+from urls_partido import fecha_de_url, match_id_de_url
+
+# ============================
+# CONFIG
+# ============================
+FIXTURES_URL = "https://fbref.com/en/comps/12/schedule/La-Liga-Scores-and-Fixtures"
+DEBUGGER_ADDRESS = "127.0.0.1:9222"
+
+WAIT_FIXTURES_SEC = 25
+
+
+# ============================
+# SELENIUM
+# ============================
+
+def conectar_chrome():
+    """Se engancha al Chrome REAL ya abierto (CAPTCHA pasado a mano)."""
+    options = Options()
+    options.add_experimental_option("debuggerAddress", DEBUGGER_ADDRESS)
+    return webdriver.Chrome(options=options)
+
+
+def cargar_partidos(driver, wait_sec=WAIT_FIXTURES_SEC):
+    """
+    Abre la página de fixtures, espera a la tabla y la lee de una sola
+    vez desde driver.page_source (ver partidos_de_html).
+    """
+    driver.get(FIXTURES_URL)
+
+    try:
+        WebDriverWait(driver, wait_sec).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "table[id^='sched_']"))
+        )
+    except Exception:
+        print("❌ No apareció la tabla de Fixtures.")
+        print("URL actual:", driver.current_url)
+        print("Título:", driver.title)
+        raise
+
+    return partidos_de_html(driver.page_source)
+
+
+def cargar_match_urls(driver, wait_sec=WAIT_FIXTURES_SEC):
+    """
+    Abre la página de fixtures y devuelve las URLs de Match Report
+    (sin duplicados y en el orden de la tabla).
+    """
+    return urls_de_partidos(cargar_partidos(driver, wait_sec))
+
+
+# ============================
+# FIXTURES / SCOREBOX (lxml)
+# ============================
+
+_XP_FILAS_FIXTURES = "//table[starts-with(@id, 'sched_')]/tbody/tr"
+
+
+def _celda(tr, stat):
+    td = tr.xpath(f"./*[@data-stat='{stat}']")
+    return td[0].text_content().strip() if td else ""
+
+
+def _estado(score, match_url, notas):
+    if "postponed" in notas.lower() or "cancel" in notas.lower():
+        return "aplazado"
+    if score and match_url:
+        return "jugado"
+    return "pendiente"
+
+
+def partidos_de_html(html, base_url=FIXTURES_URL):
+    """
+    Registros de la tabla de fixtures, en su orden:
+      {match_id, match_url, date, home_team, away_team, score, status}
+    match_url/match_id son None si aún no hay Match Report.
+    """
+    partidos = []
+    for tr in arbol_de_pagina(html).xpath(_XP_FILAS_FIXTURES):
+        if "thead" in (tr.get("class") or "").split():
+            continue
+        home = _celda(tr, "home_team")
+        away = _celda(tr, "away_team")
+        if not home and not away:
+            continue   # filas separadoras
+
+        hrefs = tr.xpath("./td[@data-stat='match_report']//a[contains(@href, '/matches/')]/@href")
+        match_url = urljoin(base_url, hrefs[0]) if hrefs else None
+        score = _celda(tr, "score")
+
+        partidos.append({
+            "match_id": match_id_de_url(match_url) if match_url else None,
+            "match_url": match_url,
+            "date": _celda(tr, "date") or None,
+            "home_team": home,
+            "away_team": away,
+            "score": score or None,
+            "status": _estado(score, match_url, _celda(tr, "notes")),
+        })
+    return partidos
+
+
+def urls_de_partidos(partidos):
+    """URLs de Match Report sin duplicados, en el orden de la tabla."""
+    return list(dict.fromkeys(p["match_url"] for p in partidos if p["match_url"]))
+
+
+def match_urls_de_html(html, base_url=FIXTURES_URL):
+    """Igual que cargar_match_urls pero desde el HTML ya descargado."""
+    return urls_de_partidos(partidos_de_html(html, base_url))
+
+
+_XP_SCOREBOX = '//div[contains(concat(" ", @class, " "), " scorebox ")]'
+_XP_CLASE = './/div[contains(concat(" ", @class, " "), " {} ")]'
+
+
+def scorebox_de_html(html):
+    """
+    {home_team, away_team, score, date} de la .scorebox de un partido
+    (mismo árbol lxml que usan los extractores de tablas), o None.
+    """
+    try:
+        box = arbol_de_pagina(html).xpath(_XP_SCOREBOX)[0]
+        return {
+            "home_team": box.xpath("./div[1]//strong/a")[0].text_content().strip(),
+            "away_team": box.xpath("./div[2]//strong/a")[0].text_content().strip(),
+            "score": box.xpath(_XP_CLASE.format("scores"))[0].text_content().strip(),
+            "date": box.xpath(_XP_CLASE.format("scorebox_meta") + "/div")[0].text_content().strip(),
+        }
+    except Exception:
+        return None
+
+
+# ============================
+# FILTRO POR FECHA
+# ============================
+
+def fecha_arg(texto):
+    """Tipo argparse para --desde YYYY-MM-DD."""
+    return date.fromisoformat(texto)
+
+
+def filtrar_desde(urls, desde):
+    """Deja solo los partidos con fecha >= desde (date); None = sin filtro."""
+    if desde is None:
+        return list(urls)
+    fechas = ((u, fecha_de_url(u)) for u in urls)
+    return [u for u, f in fechas if f is not None and f >= desde]
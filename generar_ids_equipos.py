@@ -1,18 +1,25 @@
 # -*- coding: utf-8 -*-
 import pandas as pd
-import hashlib
+
+from servicio_ids import ids_equipos
 
 INPUT = "equipos_final.csv"
 OUTPUT = "equipos_final_ids.csv"
 
-def make_id(name):
-    h = hashlib.md5(name.encode("utf-8")).hexdigest()[:8].upper()
-    return f"TEAM-{h}"
 
-df = pd.read_csv(INPUT)
+def equipos_con_id(df):
+    df = df.copy()
+    df["team_id"] = ids_equipos(df["equipo"])
+    return df
+
+
+def main():
+    df = equipos_con_id(pd.read_csv(INPUT))
+
+    df.to_csv(OUTPUT, index=False, encoding="utf-8-sig")
 
-df["team_id"] = df["equipo"].apply(make_id)
+    print("✔ Generado:", OUTPUT)
 
-df.to_csv(OUTPUT, index=False, encoding="utf-8-sig")
 
-print("✔ Generado:", OUTPUT)
\ No newline at end of file
+if __name__ == "__main__":
+    main()
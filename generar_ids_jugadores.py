@@ -1,18 +1,25 @@
 # -*- coding: utf-8 -*-
 import pandas as pd
-import hashlib
+
+from servicio_ids import ids_jugadores
 
 INPUT = "jugadores_laliga.csv"
 OUTPUT = "jugadores_laliga_ids.csv"
 
-def make_id(name):
-    h = hashlib.md5(name.encode("utf-8")).hexdigest()[:10].upper()
-    return f"PLY-{h}"
 
-df = pd.read_csv(INPUT)
+def jugadores_con_id(df):
+    df = df.copy()
+    df["player_id"] = ids_jugadores(df["Player"])
+    return df
+
+
+def main():
+    df = jugadores_con_id(pd.read_csv(INPUT))
+
+    df.to_csv(OUTPUT, index=False, encoding="utf-8-sig")
 
-df["player_id"] = df["Player"].apply(make_id)
+    print("✔ Generado:", OUTPUT)
 
-df.to_csv(OUTPUT, index=False, encoding="utf-8-sig")
 
-print("✔ Generado:", OUTPUT)
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,13 @@
 # -*- coding: utf-8 -*-
 import pandas as pd
-import re
-import hashlib
-import unicodedata
 from csv import reader as csv_reader
 
+from servicio_ids import ids_partidos
+
 # =========================
 # Helpers
 # =========================
 
-def strip_accents(s: str) -> str:
-    return unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii")
-
-def normalize_text(s: str) -> str:
-    if not isinstance(s, str):
-        return ""
-    s = strip_accents(s).lower()
-    s = s.replace("-", " ")
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
-
-def generar_id(home_norm: str, away_norm: str, date_str: str):
-    if not isinstance(date_str, str) or not re.match(r"^\d{4}-\d{2}-\d{2}$", date_str):
-        return None
-    base = f"{home_norm}_{away_norm}_{date_str}"
-    h = hashlib.md5(base.encode()).hexdigest()
-    return int(h[:12], 16)  # 48 bits
-
-MONTHS = {
-    "January","February","March","April","May","June",
-    "July","August","September","October","November","December"
-}
-
 EQUIPOS_TEAM_ID = {
     "Athletic Club":    "TEAM-0587F59E",
     "Mallorca":         "TEAM-0E077100",
@@ -55,97 +31,113 @@ EQUIPOS_TEAM_ID = {
     "Atlético Madrid":  "TEAM-F53424F0",
 }
 
-# =========================
-# 1) Fixtures
-# =========================
-fixtures = pd.read_csv("laliga_partidos.csv")
+FIXTURES_FILE = "laliga_partidos.csv"
+STATS_FILE = "normalized_fbref.csv"
+JUGADORES_FILE = "jugadores_laliga_ids.csv"
+
+OUT_JUGADORES = "jugadores_laliga_ids_FINAL.csv"
+OUT_PARTIDOS = "laliga_partidos_with_id.csv"
+OUT_STATS = "normalized_estadisticas_equipos_with_id.csv"
+
+COLS_STATS = [
+    "id",
+    "home_team", "away_team",
+    "poss_home", "poss_away",
+    "shots_ot_home", "shots_total_home",
+    "shots_ot_away", "shots_total_away",
+    "saves_home", "saves_away",
+    "cards_home", "cards_away",
+]
 
-fixtures = fixtures[fixtures["Date"].astype(str).str.match(r"^\d{4}-\d{2}-\d{2}$", na=False)]
-fixtures = fixtures.dropna(subset=["Home", "Away"])
 
-fixtures["home_norm"] = fixtures["Home"].apply(normalize_text)
-fixtures["away_norm"] = fixtures["Away"].apply(normalize_text)
-fixtures["month_txt"] = pd.to_datetime(fixtures["Date"]).dt.strftime("%B")
+def _exigir_match_id(df, nombre, script):
+    if "match_id" not in df.columns:
+        raise RuntimeError(f"{nombre} sin columna match_id: vuelve a ejecutar {script}")
+
 
 # =========================
-# 2) Stats
+# 1) Fixtures (match_id de FBref desde laliga_partidos.py)
 # =========================
-stats = pd.read_csv("normalized_fbref.csv")
+def leer_fixtures(path=FIXTURES_FILE):
+    """Fixtures con match_id (solo lectura: ver migrar_match_id.py)."""
+    fixtures = pd.read_csv(path, dtype={"match_id": str}, dtype_backend="numpy_nullable")
+    _exigir_match_id(fixtures, path, "laliga_partidos.py (o una vez migrar_match_id.py)")
+    return fixtures
+
+
+def partidos_con_id(fixtures):
+    """Fixtures jugables + id (entero del match_id, sin cruzar por nombres ni mes)."""
+    _exigir_match_id(fixtures, FIXTURES_FILE, "laliga_partidos.py")
+
+    fixtures = fixtures[fixtures["Date"].astype(str).str.match(r"^\d{4}-\d{2}-\d{2}$", na=False)]
+    fixtures = fixtures.dropna(subset=["Home", "Away"]).copy()
+    fixtures["id"] = ids_partidos(fixtures["match_id"])
 
-stats = stats.dropna(subset=["home_team", "away_team"])
-stats["home_norm"] = stats["home_team"].apply(normalize_text)
-stats["away_norm"] = stats["away_team"].apply(normalize_text)
+    sin_id = fixtures["id"].isna()
+    if sin_id.any():
+        # Sin enlace /matches/ (normalmente aún sin jugar): se quedan sin id y
+        # no entran en tablas con clave (cargar_bd.py)
+        jugados = sin_id & fixtures["Score"].notna() if "Score" in fixtures.columns else sin_id
+        print(f"⚠ Partidos sin match_id en {FIXTURES_FILE}: {int(sin_id.sum())} "
+              f"({int(jugados.sum())} ya jugados)")
 
-fixtures["month_txt"] = fixtures["month_txt"].astype(str)
-stats["month_txt"] = stats["month_txt"].astype(str)
+    return fixtures.drop(columns=["match_id", "match_url"], errors="ignore")
 
-stats_merged = stats.merge(
-    fixtures[["home_norm", "away_norm", "month_txt", "Date"]],
-    on=["home_norm", "away_norm", "month_txt"],
-    how="left",
-    validate="m:1"
-)
 
 # =========================
-# 3) IDs
+# 2) Stats (match_id desde la URL, normalizar_team_stats.py)
 # =========================
-fixtures["id"] = fixtures.apply(
-    lambda r: generar_id(r["home_norm"], r["away_norm"], r["Date"]),
-    axis=1
-)
+def stats_con_id(stats):
+    _exigir_match_id(stats, STATS_FILE, "normalizar_team_stats.py")
+
+    stats = stats.dropna(subset=["home_team", "away_team"]).copy()
+    stats["id"] = ids_partidos(stats["match_id"])
+    return stats[[c for c in COLS_STATS if c in stats.columns]]
 
-stats_merged["id"] = stats_merged.apply(
-    lambda r: generar_id(r["home_norm"], r["away_norm"], r["Date"]),
-    axis=1
-)
 
 # =========================
-# 4) Jugadores con team_id
+# 3) Jugadores con team_id
 # =========================
-# Leer con csv_reader para manejar correctamente campos con comas entre comillas
-# (ej: "MF,FW" debe tratarse como un solo campo de posición)
-jugadores_rows = []
-with open("jugadores_laliga_ids.csv", encoding="utf-8-sig", newline="") as f:
-    r = csv_reader(f)
-    header = next(r)
-    for row in r:
-        jugadores_rows.append(row)
+def leer_jugadores(path=JUGADORES_FILE):
+    """
+    Leer con csv_reader para manejar correctamente campos con comas entre comillas
+    (ej: "MF,FW" debe tratarse como un solo campo de posición)
+    """
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        r = csv_reader(f)
+        header = next(r)
+        return pd.DataFrame(list(r), columns=header)
+
 
-jug = pd.DataFrame(jugadores_rows, columns=header)
+def jugadores_con_team_id(jug):
+    jug = jug.copy()
 
-# Añadir team_id mapeando desde la columna Squad
-jug["team_id"] = jug["Squad"].map(EQUIPOS_TEAM_ID)
+    # Añadir team_id mapeando desde la columna Squad
+    jug["team_id"] = jug["Squad"].map(EQUIPOS_TEAM_ID)
 
-sin_mapear = jug[jug["team_id"].isna()]["Squad"].unique()
-if len(sin_mapear):
-    print(f"⚠ Squads sin mapear a team_id: {sin_mapear}")
+    sin_mapear = jug[jug["team_id"].isna()]["Squad"].unique()
+    if len(sin_mapear):
+        print(f"⚠ Squads sin mapear a team_id: {sin_mapear}")
 
-# Reordenar columnas: player_id y team_id al principio para mayor claridad
-cols = ["player_id", "team_id"] + [c for c in jug.columns if c not in ("player_id", "team_id")]
-jug = jug[cols]
+    # Reordenar columnas: player_id y team_id al principio para mayor claridad
+    cols = ["player_id", "team_id"] + [c for c in jug.columns if c not in ("player_id", "team_id")]
+    return jug[cols]
 
-jug.to_csv("jugadores_laliga_ids_FINAL.csv", index=False)
-print(f"✔ Generado: jugadores_laliga_ids_FINAL.csv ({len(jug)} jugadores)")
 
 # =========================
-# 5) Guardar partidos y stats
+# 4) Guardar
 # =========================
-fixtures_out = fixtures.drop(columns=["home_norm", "away_norm", "month_txt"])
-fixtures_out.to_csv("laliga_partidos_with_id.csv", index=False)
+def main():
+    jug = jugadores_con_team_id(leer_jugadores())
+    jug.to_csv(OUT_JUGADORES, index=False)
+    print(f"✔ Generado: {OUT_JUGADORES} ({len(jug)} jugadores)")
 
-cols_stats = [
-    "id",
-    "home_team", "away_team",
-    "poss_home", "poss_away",
-    "shots_ot_home", "shots_total_home",
-    "shots_ot_away", "shots_total_away",
-    "saves_home", "saves_away",
-    "cards_home", "cards_away",
-]
-cols_stats = [c for c in cols_stats if c in stats_merged.columns]
+    partidos_con_id(leer_fixtures()).to_csv(OUT_PARTIDOS, index=False)
+    stats_con_id(pd.read_csv(STATS_FILE, dtype={"match_id": str})).to_csv(OUT_STATS, index=False)
+
+    print(f"✔ Generado: {OUT_PARTIDOS}")
+    print(f"✔ Generado: {OUT_STATS}")
 
-stats_out = stats_merged[cols_stats]
-stats_out.to_csv("normalized_estadisticas_equipos_with_id.csv", index=False)
 
-print("✔ Generado: laliga_partidos_with_id.csv")
-print("✔ Generado: normalized_estadisticas_equipos_with_id.csv")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
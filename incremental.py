@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+Checkpoints por partido para las etapas de después del scraping
+Cada cadena (jugadores, equipos, partidos) guarda qué match_id procesó y
+con qué "firma" (filas+fecha de la partición, hash de la fila...). En la
+siguiente pasada solo se recalculan los partidos nuevos o cambiados y se
+fusionan en los CSV de salida:
+- solo nuevos → append al final del CSV (no se reescribe nada)
+- cambiados / borrados / columnas nuevas → reescritura (.tmp + rename)
+  quitando las filas viejas de esos ids
+Las dependencias globales (catálogos, offset de team_raw.csv) van con
+claves que empiezan por "_"; si cambia un catálogo la cadena se rehace
+entera.
+
+SQLite pequeño, mismo estilo que indice_partidos.py.
+"""
+
+import os
+import sqlite3
+from datetime import datetime, timezone
+
+import pandas as pd
+
+# ============================
+# CONFIG
+# ============================
+CHECKPOINT_FILE = "checkpoints_etapas.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    etapa TEXT NOT NULL,
+    clave TEXT NOT NULL,
+    firma TEXT NOT NULL,
+    ts    TEXT NOT NULL,
+    PRIMARY KEY (etapa, clave)
+)
+"""
+
+_conexiones = {}
+
+
+def _conexion(path=CHECKPOINT_FILE):
+    con = _conexiones.get(path)
+    if con is None:
+        con = sqlite3.connect(path)
+        con.execute(_SCHEMA)
+        con.commit()
+        _conexiones[path] = con
+    return con
+
+
+def _ahora():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+# ============================
+# CHECKPOINTS
+# ============================
+
+def firmas(etapa: str, path=CHECKPOINT_FILE) -> dict:
+    """{clave: firma} guardadas para esa etapa."""
+    rows = _conexion(path).execute("SELECT clave, firma FROM checkpoints WHERE etapa = ?", (etapa,))
+    return dict(rows)
+
+
+def cambios(etapa: str, actuales: dict, path=CHECKPOINT_FILE):
+    """
+    (nuevos, cambiados, borrados) comparando las firmas `actuales`
+    {match_id: firma} con el último checkpoint (sin las claves "_...").
+    """
+    previas = {k: v for k, v in firmas(etapa, path).items() if not k.startswith("_")}
+    nuevos = [k for k in actuales if k not in previas]
+    cambiados = [k for k in actuales if k in previas and previas[k] != actuales[k]]
+    borrados = [k for k in previas if k not in actuales]
+    return nuevos, cambiados, borrados
+
+
+def confirmar(etapa: str, hechas: dict, borrados=(), path=CHECKPOINT_FILE):
+    """Guarda las firmas procesadas y quita las de los partidos borrados."""
+    con = _conexion(path)
+    ts = _ahora()
+    with con:
+        con.executemany(
+            "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?)",
+            [(etapa, str(k), str(v), ts) for k, v in hechas.items()],
+        )
+        con.executemany(
+            "DELETE FROM checkpoints WHERE etapa = ? AND clave = ?",
+            [(etapa, str(k)) for k in borrados],
+        )
+
+
+def olvidar_etapa(etapa: str, path=CHECKPOINT_FILE):
+    """Borra el checkpoint (la próxima pasada la rehace entera)."""
+    con = _conexion(path)
+    with con:
+        con.execute("DELETE FROM checkpoints WHERE etapa = ?", (etapa,))
+
+
+def preparar(etapa: str, deps: dict, salidas, path=CHECKPOINT_FILE) -> bool:
+    """
+    True si la etapa hay que rehacerla ENTERA: cambió alguna dependencia
+    global (`deps`, claves "_...") o falta algún fichero de `salidas`.
+    En ese caso se borra su checkpoint.
+    """
+    previas = firmas(etapa, path)
+    completo = (
+        any(previas.get(k) != str(v) for k, v in deps.items())
+        or not all(os.path.exists(s) for s in salidas)
+    )
+    if completo:
+        olvidar_etapa(etapa, path)
+    return completo
+
+
+def hash_filas(df: pd.DataFrame, clave: str) -> dict:
+    """
+    {clave: hash del contenido de sus filas} (tablas pequeñas, p.ej.
+    fixtures). Las filas sin clave van juntas bajo "".
+    """
+    hashes = pd.util.hash_pandas_object(df.astype("string"), index=False).astype(str)
+    claves = df[clave].astype("string").fillna("")
+    return hashes.groupby(claves.values, sort=False).agg(",".join).to_dict()
+
+
+# ============================
+# FUSIÓN EN EL CSV DE SALIDA
+# ============================
+
+def _ids_texto(serie):
+    # "315099038.0" (id que pasó por float) → "315099038"
+    return serie.astype("string").fillna("").str.replace(r"\.0$", "", regex=True)
+
+
+def _reemplazar(path, df, encoding):
+    tmp = path + ".tmp"
+    df.to_csv(tmp, index=False, encoding=encoding)
+    os.replace(tmp, path)
+
+
+def fusionar_csv(path, delta, col_id, quitar=(), completo=False, encoding="utf-8"):
+    """
+    Mete `delta` en el CSV `path`. Se quitan antes las filas cuyo `col_id`
+    esté en `quitar` ("" = filas sin id). Con completo=True `delta` es la
+    tabla entera. Devuelve "append", "reescrito" o "nuevo".
+    """
+    if completo or not (os.path.exists(path) and os.path.getsize(path) > 0):
+        _reemplazar(path, delta, encoding)
+        return "nuevo"
+
+    cabecera = list(pd.read_csv(path, nrows=0, encoding="utf-8-sig").columns)
+    nuevas = [c for c in delta.columns if c not in cabecera]
+    quitar = {str(q) for q in quitar}
+
+    if not quitar and not nuevas:
+        # Solo partidos nuevos: se añaden al final, sin tocar lo que hay
+        with open(path, "a", encoding="utf-8", newline="") as f:
+            delta.reindex(columns=cabecera).to_csv(f, index=False, header=False)
+        return "append"
+
+    previo = pd.read_csv(path, dtype=str, keep_default_na=False, encoding="utf-8-sig")
+    previo = previo[~_ids_texto(previo[col_id]).isin(quitar)]
+    _reemplazar(path, pd.concat([previo, delta], ignore_index=True)[cabecera + nuevas], encoding)
+    return "reescrito"
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+Índice de partidos procesados (compartido por todos los scrapers)
+SQLite pequeño al lado de los CSV crudos: una fila por (scraper, partido)
+con estado, nº de filas y fecha. Arrancar un scraper ya no exige releer
+jugadores_raw.csv / team_raw.csv enteros para saber qué falta.
+
+Estados:
+  en_curso → se va a escribir en el CSV (si se queda así, el append
+             pudo quedar a medias)
+  ok       → filas escritas
+"""
+
+import os
+import sqlite3
+from datetime import datetime, timezone
+
+from urls_partido import match_id_de_url
+
+# ============================
+# CONFIG
+# ============================
+INDEX_FILE = "partidos_procesados.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS procesados (
+    scraper   TEXT NOT NULL,
+    match_id  TEXT NOT NULL,
+    match_url TEXT NOT NULL,
+    estado    TEXT NOT NULL,
+    filas     INTEGER,
+    ts        TEXT NOT NULL,
+    PRIMARY KEY (scraper, match_id)
+)
+"""
+
+_conexiones = {}
+
+
+def _conexion(path=INDEX_FILE):
+    con = _conexiones.get(path)
+    if con is None:
+        con = sqlite3.connect(path, check_same_thread=False)
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute(_SCHEMA)
+        con.commit()
+        _conexiones[path] = con
+    return con
+
+
+def _ahora():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+# ============================
+# LECTURA
+# ============================
+
+def procesados(scraper: str, path=INDEX_FILE) -> set:
+    """URLs marcadas como 'ok' para ese scraper."""
+    rows = _conexion(path).execute(
+        "SELECT match_url FROM procesados WHERE scraper = ? AND estado = 'ok'",
+        (scraper,),
+    )
+    return {r[0] for r in rows}
+
+
+def filas_procesadas(scraper: str, path=INDEX_FILE) -> dict:
+    """{url: filas} de los partidos 'ok' (para revisar el CSV crudo)."""
+    rows = _conexion(path).execute(
+        "SELECT match_url, filas FROM procesados WHERE scraper = ? AND estado = 'ok'",
+        (scraper,),
+    )
+    return {r[0]: r[1] or 0 for r in rows}
+
+
+def en_curso(scraper: str, path=INDEX_FILE) -> list:
+    """URLs cuyo append pudo quedar a medias (estado 'en_curso')."""
+    rows = _conexion(path).execute(
+        "SELECT match_url FROM procesados WHERE scraper = ? AND estado = 'en_curso'",
+        (scraper,),
+    )
+    return [r[0] for r in rows]
+
+
+def vacio(scraper: str, path=INDEX_FILE) -> bool:
+    row = _conexion(path).execute(
+        "SELECT 1 FROM procesados WHERE scraper = ? LIMIT 1", (scraper,)
+    ).fetchone()
+    return row is None
+
+
+# ============================
+# ESCRITURA
+# ============================
+
+def marcar_en_curso(scraper: str, url: str, path=INDEX_FILE):
+    con = _conexion(path)
+    with con:
+        con.execute(
+            "INSERT OR REPLACE INTO procesados VALUES (?, ?, ?, 'en_curso', NULL, ?)",
+            (scraper, match_id_de_url(url), url, _ahora()),
+        )
+
+
+def registrar(scraper: str, url: str, filas: int, estado="ok", path=INDEX_FILE):
+    con = _conexion(path)
+    with con:
+        con.execute(
+            "INSERT OR REPLACE INTO procesados VALUES (?, ?, ?, ?, ?, ?)",
+            (scraper, match_id_de_url(url), url, estado, filas, _ahora()),
+        )
+
+
+def marcar_en_curso_lote(scraper: str, urls, path=INDEX_FILE):
+    """marcar_en_curso para un lote entero (una sola transacción)."""
+    con = _conexion(path)
+    ts = _ahora()
+    with con:
+        con.executemany(
+            "INSERT OR REPLACE INTO procesados VALUES (?, ?, ?, 'en_curso', NULL, ?)",
+            [(scraper, match_id_de_url(u), u, ts) for u in urls],
+        )
+
+
+def registrar_lote(scraper: str, urls_filas: dict, path=INDEX_FILE):
+    """registrar ('ok') para un lote {url: filas} ya escrito en disco."""
+    con = _conexion(path)
+    ts = _ahora()
+    with con:
+        con.executemany(
+            "INSERT OR REPLACE INTO procesados VALUES (?, ?, ?, 'ok', ?, ?)",
+            [(scraper, match_id_de_url(u), u, int(n), ts) for u, n in urls_filas.items()],
+        )
+
+
+def olvidar(scraper: str, url: str, path=INDEX_FILE):
+    con = _conexion(path)
+    with con:
+        con.execute(
+            "DELETE FROM procesados WHERE scraper = ? AND match_id = ?",
+            (scraper, match_id_de_url(url)),
+        )
+
+
+def importar(scraper: str, urls_filas: dict, path=INDEX_FILE):
+    """Alta masiva {url: filas} (migración desde un CSV crudo existente)."""
+    con = _conexion(path)
+    ts = _ahora()
+    with con:
+        con.executemany(
+            "INSERT OR REPLACE INTO procesados VALUES (?, ?, ?, 'ok', ?, ?)",
+            [(scraper, match_id_de_url(u), u, int(n), ts) for u, n in urls_filas.items()],
+        )
+
+
+def procesados_o_migrar(scraper: str, raw_file: str, leer_urls, path=INDEX_FILE) -> set:
+    """
+    URLs procesadas según el índice. La primera vez (índice vacío para ese
+    scraper pero CSV crudo / directorio del almacén existente) se migra con
+    `leer_urls(raw_file) -> Serie de match_url`, una sola vez.
+    """
+    existe = os.path.isdir(raw_file) or (os.path.exists(raw_file) and os.path.getsize(raw_file) > 0)
+    if vacio(scraper, path) and existe:
+        print(f"🗂  Migrando {raw_file} al índice {path} (solo esta vez)...")
+        urls = leer_urls(raw_file).dropna()
+        importar(scraper, urls.value_counts().to_dict(), path)
+    return procesados(scraper, path)
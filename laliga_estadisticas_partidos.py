@@ -1,103 +1,65 @@
 # -*- coding: utf-8 -*-
 import os
-import time
-from io import StringIO
+import argparse
 import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 
-FIXTURES_URL = "https://fbref.com/en/comps/12/schedule/La-Liga-Scores-and-Fixtures"
+import archivo_html
+import escritor_lotes
+import indice_partidos
+import obtener_paginas
+import recuperar_raw
+import ritmo
+from extractor_tablas import IDS_EQUIPO, buscar_tablas, tabla_a_df
+from fbref_comun import scorebox_de_html
+
 RAW_FILE = "team_raw.csv"
+NOMBRE = "equipos"   # clave en partidos_procesados.sqlite
+WAIT_PARTIDO_SEC = 20
+
+# Regex de la tabla que necesita este extractor (espera en el navegador)
+MARCADOR = r'id="team_stats"'
 
 # ============================
 # 1) Cargar partidos ya procesados
 # ============================
-processed_urls = set()
-try:
-    prev = pd.read_csv(RAW_FILE)
-    if "match_url" in prev.columns:
-        processed_urls = set(prev["match_url"].unique())
-        print(f"✔ Partidos ya procesados: {len(processed_urls)}")
-    else:
+def _leer_match_urls(path):
+    prev = pd.read_csv(path)
+    if "match_url" not in prev.columns:
         print("⚠ team_raw.csv existe pero sin columna 'match_url'. Ignorando filtrado.")
-except FileNotFoundError:
-    print("ℹ Primera ejecución: no existe team_raw.csv")
+        return pd.Series(dtype=object)
+    return prev["match_url"]
 
-# ============================
-# 2) Conectar a Chrome
-# ============================
-options = Options()
-options.add_experimental_option("debuggerAddress", "127.0.0.1:9222")
-driver = webdriver.Chrome(options=options)
+# Escritor por lotes de team_raw.csv (se crea en cargar_procesados)
+escritor = None
 
-# ============================
-# 3) Cargar fixtures
-# ============================
-driver.get(FIXTURES_URL)
 
-try:
-    fixtures_table = WebDriverWait(driver, 30).until(
-        EC.presence_of_element_located((By.CSS_SELECTOR, 'table[id^="sched_"]'))
+def cargar_procesados():
+    global escritor
+    escritor = escritor_lotes.EscritorLotes(
+        NOMBRE, lambda lote: escritor_lotes.volcar_csv(RAW_FILE, lote, por_nombre=False)
     )
-except:
-    print("❌ No apareció la tabla de fixtures.")
-    print("URL actual:", driver.current_url)
-    print("Título:", driver.title)
-    raise
-
-# ============================
-# 4) Extraer URLs de Match Report
-# ============================
-rows = fixtures_table.find_elements(By.CSS_SELECTOR, "tbody tr")
-match_urls = []
-for row in rows:
-    try:
-        a = row.find_element(By.CSS_SELECTOR, 'td[data-stat="match_report"] a[href*="/matches/"]')
-        href = a.get_attribute("href")
-        if href:
-            match_urls.append(href)
-    except:
-        pass
-
-match_urls = list(dict.fromkeys(match_urls))
-print(f"➡ Partidos con Match Report: {len(match_urls)}")
-
-new_matches = [u for u in match_urls if u not in processed_urls]
-print(f"🟦 Partidos nuevos: {len(new_matches)}")
-print("-" * 60)
+    if not os.path.isfile(RAW_FILE):
+        print("ℹ Primera ejecución: no existe team_raw.csv")
+    recuperar_raw.recuperar_csv(RAW_FILE, NOMBRE)
+    processed_urls = indice_partidos.procesados_o_migrar(NOMBRE, RAW_FILE, _leer_match_urls)
+    print(f"✔ Partidos ya procesados: {len(processed_urls)}")
+    return processed_urls
 
 # ============================
-# 5) Lector de team_stats + team_stats_extra
+# 2) Lector de team_stats + team_stats_extra
 # ============================
-def extract_table_from_block(block_html: str):
-    """Extrae tabla visible o comentada."""
-    if "<!--" in block_html:
-        block_html = block_html.replace("<!--", "").replace("-->", "")
-    try:
-        return pd.read_html(StringIO(block_html))[0]
-    except:
-        return None
-
-def read_combined_team_stats(driver):
+def read_combined_team_stats(html):
     """
-    Devuelve un DF combinando:
+    Devuelve un DF combinando (a partir del HTML de la página):
     - div#team_stats
     - div#team_stats_extra
     """
     df_list = []
-    block_ids = ["team_stats", "team_stats_extra"]
 
-    for block in block_ids:
+    for _, tabla in sorted(buscar_tablas(html, IDS_EQUIPO).items()):
         try:
-            container = driver.find_element(By.CSS_SELECTOR, f"div#{block}")
-            inner = container.get_attribute("innerHTML")
-            df = extract_table_from_block(inner)
-            if df is not None:
-                df_list.append(df)
-        except:
+            df_list.append(tabla_a_df(tabla))
+        except Exception:
             continue
 
     if not df_list:
@@ -105,48 +67,32 @@ def read_combined_team_stats(driver):
 
     return pd.concat(df_list, ignore_index=True)
 
+def read_scorebox_meta(html):
+    """Devuelve (home_team, away_team, score, date) de la .scorebox."""
+    meta = scorebox_de_html(html)
+    if meta is None:
+        return None, None, None, None
+    return meta["home_team"], meta["away_team"], meta["score"], meta["date"]
+
 # ============================
-# 6) Guardado incremental (append)
+# 3) Guardado por lotes (escritor_lotes)
 # ============================
-def append_to_csv(df):
-    exists = os.path.isfile(RAW_FILE)
-    df.to_csv(
-        RAW_FILE,
-        mode="a",
-        index=False,
-        header=not exists,
-        encoding="utf-8"
-    )
+def volcar_pendientes():
+    """Escribe el lote que quede en memoria (llamar al terminar)."""
+    if escritor is not None:
+        escritor.volcar()
 
 # ============================
-# 7) Scraper principal (GUARDADO POR PARTIDO)
+# 4) Procesar un partido (HTML ya cargado)
 # ============================
-for idx, url in enumerate(new_matches, 1):
-    print(f"({idx}/{len(new_matches)}) {url}")
-
-    # 1) cargar partido
-    try:
-        driver.get(url)
-    except Exception as e:
-        print(f"   ❌ Error cargando: {e}")
-        continue
-
-    time.sleep(1.5)
-
-    # 2) extraer stats
-    df = read_combined_team_stats(driver)
+def procesar_partido(html, url):
+    """Devuelve las filas añadidas a team_raw.csv, o None si no había tablas."""
+    df = read_combined_team_stats(html)
     if df is None or df.empty:
         print("   ❌ No se pudo leer 'team_stats' ni 'team_stats_extra'. Se salta.")
-        continue
+        return None
 
-    # 3) metadata
-    try:
-        home_team = driver.find_element(By.CSS_SELECTOR, ".scorebox .team:nth-child(1) strong a").text
-        away_team = driver.find_element(By.CSS_SELECTOR, ".scorebox .team:nth-child(2) strong a").text
-        score_text = driver.find_element(By.CSS_SELECTOR, ".scorebox .scores").text
-        date_text  = driver.find_element(By.CSS_SELECTOR, ".scorebox_meta div").text
-    except:
-        home_team = away_team = score_text = date_text = None
+    home_team, away_team, score_text, date_text = read_scorebox_meta(html)
 
     df["match_url"] = url
     df["home_team"] = home_team
@@ -154,11 +100,51 @@ for idx, url in enumerate(new_matches, 1):
     df["score"] = score_text
     df["date"] = date_text
 
-    # 4) GUARDAR YA MISMO
-    append_to_csv(df)
-    print("   ✔ Guardado en CSV (append)")
+    # Se escribe en team_raw.csv al volcar el lote
+    escritor.anadir(url, df)
+    print("   ✔ Añadido al lote")
+    return len(df)
+
+# ============================
+# 5) Scraper principal (GUARDADO POR PARTIDO)
+# ============================
+def main():
+    parser = argparse.ArgumentParser(description="Scraper de estadísticas de equipo FBref")
+    parser.add_argument("--backend", choices=obtener_paginas.BACKENDS, default="selenium",
+                        help="selenium (Chrome 9222) o http (cookies_fbref.txt, con fallback a Selenium)")
+    args = parser.parse_args()
+
+    processed_urls = cargar_procesados()
+
+    obtenedor = obtener_paginas.crear(args.backend, ritmo.LimitadorAdaptativo())
+    match_urls = obtenedor.match_urls()
+    print(f"➡ Partidos con Match Report: {len(match_urls)}")
+
+    new_matches = [u for u in match_urls if u not in processed_urls]
+    print(f"🟦 Partidos nuevos: {len(new_matches)}")
+    print("-" * 60)
+
+    try:
+        for idx, url in enumerate(new_matches, 1):
+            print(f"({idx}/{len(new_matches)}) {url}")
+
+            # 1) cargar partido (ritmo adaptativo + espera a team_stats)
+            html = obtenedor.pagina(url, [MARCADOR], WAIT_PARTIDO_SEC)
+            if html is None:
+                continue
+
+            # 2) archivar HTML, extraer stats + metadata y guardar
+            archivo_html.guardar(url, html)
+            if procesar_partido(html, url) is None:
+                continue
+
+            # 3) marcar como procesado
+            processed_urls.add(url)
+    finally:
+        volcar_pendientes()
+
+    print("\n✅ Terminado.")
 
-    # 5) marcar como procesado
-    processed_urls.add(url)
 
-print("\n✅ Terminado.")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
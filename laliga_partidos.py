@@ -4,6 +4,8 @@ from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from bs4 import BeautifulSoup
 
+from fbref_comun import partidos_de_html
+
 options = Options()
 options.debugger_address = "127.0.0.1:9222"
 driver = webdriver.Chrome(options=options)
@@ -42,6 +44,26 @@ else:
 
     df["HomeGoals"], df["AwayGoals"] = zip(*df["Score"].apply(parse_score))
 
+    # =====================================================
+    #     match_id DE FBREF (clave de unión en todo el pipeline)
+    # =====================================================
+    # Hash de 8 hex del enlace Match Report de CADA fila de la misma tabla
+    # (partidos_de_html), asignado por posición: sin cruzar por fecha ni
+    # equipos en texto. partidos_de_html se salta las filas de cabecera
+    # repetida y las separadoras; aquí se quitan las mismas.
+    enlaces = pd.DataFrame(
+        partidos_de_html(str(table)), columns=["home_team", "away_team", "match_id", "match_url"]
+    )
+    filas = df.index[(df["Home"].notna() | df["Away"].notna()) & (df["Home"] != "Home")]
+    if len(filas) != len(enlaces) or (
+        df.loc[filas, ["Home", "Away"]].fillna("").values != enlaces[["home_team", "away_team"]].values
+    ).any():
+        raise RuntimeError("Las filas de la tabla no cuadran con partidos_de_html: revisa el HTML")
+    df["match_id"] = df["match_url"] = None
+    df.loc[filas, "match_id"] = enlaces["match_id"].values
+    df.loc[filas, "match_url"] = enlaces["match_url"].values
+    print(f"✔ Partidos con match_id: {df['match_id'].notna().sum()}")
+
     df.to_csv("laliga_partidos.csv", index=False, encoding="utf-8-sig")
     print("✔ Archivo guardado: laliga_partidos.csv")
     print(df.head())
\ No newline at end of file
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Migración (una sola vez) de un laliga_partidos.csv de antes de que
+laliga_partidos.py guardara match_id/match_url
+- Sin scrapear: las URLs salen de los crudos ya descargados
+  (team_raw.csv, jugadores_raw/) y su slug da fecha y equipos
+  (urls_partido.resolver).
+- Es el ÚNICO sitio donde se cruza por (Date, Home, Away) en texto: el
+  CSV antiguo no tiene otra clave. Los fixtures nuevos traen el hash de
+  su propia fila (laliga_partidos.py).
+- No es una etapa de pipeline.py: reescribe la salida del scraper de
+  fixtures. Si el fichero ya tiene match_id no hace nada.
+
+    python migrar_match_id.py
+"""
+
+import os
+
+import pandas as pd
+
+import almacen_raw
+import urls_partido
+from generar_ids_para_todos import FIXTURES_FILE
+
+# ============================
+# CONFIG
+# ============================
+TEAM_RAW_FILE = "team_raw.csv"
+JUGADORES_RAW_DIR = "jugadores_raw"
+JUGADORES_RAW_CSV = "jugadores_raw.csv"
+
+
+def urls_descargadas():
+    """URLs de partido que ya están en los crudos (team_raw.csv, jugadores_raw/)."""
+    urls = [pd.Series(list(almacen_raw.abrir(JUGADORES_RAW_DIR, JUGADORES_RAW_CSV).match_urls()), dtype=str)]
+    if os.path.exists(TEAM_RAW_FILE):
+        urls.append(pd.read_csv(TEAM_RAW_FILE, header=None, dtype=str, usecols=[2])[2])
+    urls = pd.concat(urls, ignore_index=True).dropna().drop_duplicates()
+    return urls[urls.str.contains("/matches/", regex=False)].reset_index(drop=True)
+
+
+def completar_match_id(fixtures, urls):
+    """
+    Rellena match_id/match_url de los fixtures que no lo tengan cruzando
+    (Date, Home, Away) con fecha y equipos del slug de `urls`.
+    """
+    fixtures = fixtures.copy()
+    for col in ("match_id", "match_url"):
+        if col not in fixtures.columns:
+            fixtures[col] = pd.NA
+
+    urls_partido.anadir_equipos(pd.concat([fixtures["Home"], fixtures["Away"]]).dropna().unique())
+    partes = urls_partido.resolver(urls)
+    enlaces = pd.DataFrame({
+        "Date": partes["date"], "Home": partes["home_team"], "Away": partes["away_team"],
+        "_match_id": partes["match_id"], "_match_url": urls,
+    }).dropna().drop_duplicates(["Date", "Home", "Away"])
+
+    fixtures = fixtures.merge(enlaces, on=["Date", "Home", "Away"], how="left", validate="m:1")
+    falta = fixtures["match_id"].isna()
+    fixtures.loc[falta, "match_id"] = fixtures.loc[falta, "_match_id"]
+    fixtures.loc[falta, "match_url"] = fixtures.loc[falta, "_match_url"]
+    return fixtures.drop(columns=["_match_id", "_match_url"])
+
+
+def main(path=FIXTURES_FILE):
+    fixtures = pd.read_csv(path, dtype={"match_id": str}, dtype_backend="numpy_nullable")
+    if "match_id" in fixtures.columns:
+        print(f"✔ {path} ya tiene match_id: nada que migrar")
+        return
+
+    print(f"📂 {path} sin match_id: se rellena con las URLs de los crudos...")
+    fixtures = completar_match_id(fixtures, urls_descargadas())
+    partidos = fixtures[fixtures["Date"].astype(str).str.match(r"^\d{4}-\d{2}-\d{2}$", na=False)]
+    print(f"✔ match_id en {partidos['match_id'].notna().sum()} de {len(partidos)} partidos")
+
+    tmp = path + ".tmp"
+    fixtures.to_csv(tmp, index=False, encoding="utf-8-sig")
+    os.replace(tmp, path)
+    print(f"✔ Archivo guardado: {path}")
+
+
+if __name__ == "__main__":
+    main()
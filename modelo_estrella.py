@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+"""
+Modelo en estrella sobre laliga.sqlite (después de cargar_bd.py)
+Las tablas planas arrastran claves de texto largas (TEAM-51EA86E0,
+PLY-C568741D13) y repiten Venue/Referee/Nation/Pos en cada fila. Aquí:
+
+  dim_equipo, dim_jugador, dim_nacion, dim_posicion, dim_estadio,
+  dim_arbitro → clave sustituta INTEGER (la clave natural, UNIQUE)
+  dim_fecha   → fecha_sk = AAAAMMDD
+  fact_partido, fact_jugador_partido, fact_equipo_partido → solo
+  enteros (claves + stats); el partido va por match_id (ya entero,
+  servicio_ids.py)
+
+- Las claves sustitutas son ESTABLES: una clave natural ya vista
+  conserva su *_sk (upsert sobre la UNIQUE); las dimensiones no se
+  vacían nunca.
+- Las tablas de hechos se rehacen enteras desde las planas, en la misma
+  transacción que las dimensiones.
+
+    python modelo_estrella.py [--bd laliga.sqlite]
+"""
+
+import argparse
+
+import pandas as pd
+
+import cargar_bd
+
+# ============================
+# ESQUEMA
+# ============================
+# Stats enteras de jugador tal cual están en estadisticas_jugador
+STATS_JUGADOR = [
+    sql for _, sql, tipo in cargar_bd.TABLAS["estadisticas_jugador"][2]
+    if tipo == "INTEGER" and sql not in ("match_id", "shirt_number", "age_dias")
+]
+STATS_EQUIPO = ["possession", "shots_on_target", "shots_total", "saves", "cards"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dim_equipo (
+    equipo_sk INTEGER PRIMARY KEY,
+    team_id   TEXT NOT NULL UNIQUE,
+    equipo    TEXT,
+    estadio   TEXT,
+    ciudad    TEXT,
+    capacidad INTEGER
+);
+CREATE TABLE IF NOT EXISTS dim_nacion (
+    nacion_sk INTEGER PRIMARY KEY,
+    nation    TEXT NOT NULL UNIQUE,
+    codigo    TEXT
+);
+CREATE TABLE IF NOT EXISTS dim_jugador (
+    jugador_sk INTEGER PRIMARY KEY,
+    player_id  TEXT NOT NULL UNIQUE,
+    player     TEXT,
+    born       INTEGER,
+    nacion_sk  INTEGER REFERENCES dim_nacion
+);
+CREATE TABLE IF NOT EXISTS dim_posicion (
+    posicion_sk INTEGER PRIMARY KEY,
+    pos         TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS dim_estadio (
+    estadio_sk INTEGER PRIMARY KEY,
+    venue      TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS dim_arbitro (
+    arbitro_sk INTEGER PRIMARY KEY,
+    referee    TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS dim_fecha (
+    fecha_sk   INTEGER PRIMARY KEY,
+    fecha      TEXT NOT NULL,
+    anio       INTEGER,
+    mes        INTEGER,
+    dia        INTEGER,
+    dia_semana INTEGER
+);
+CREATE TABLE IF NOT EXISTS fact_partido (
+    match_id        INTEGER PRIMARY KEY,
+    fecha_sk        INTEGER REFERENCES dim_fecha,
+    local_sk        INTEGER REFERENCES dim_equipo,
+    visitante_sk    INTEGER REFERENCES dim_equipo,
+    estadio_sk      INTEGER REFERENCES dim_estadio,
+    arbitro_sk      INTEGER REFERENCES dim_arbitro,
+    jornada         INTEGER,
+    hora_min        INTEGER,
+    asistencia      INTEGER,
+    goles_local     INTEGER,
+    goles_visitante INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_fact_partido_local ON fact_partido (local_sk);
+CREATE INDEX IF NOT EXISTS idx_fact_partido_visitante ON fact_partido (visitante_sk);
+CREATE INDEX IF NOT EXISTS idx_fact_partido_fecha ON fact_partido (fecha_sk);
+CREATE TABLE IF NOT EXISTS fact_jugador_partido (
+    match_id    INTEGER NOT NULL,
+    jugador_sk  INTEGER NOT NULL REFERENCES dim_jugador,
+    posicion_sk INTEGER REFERENCES dim_posicion,
+    dorsal      INTEGER,
+    edad_dias   INTEGER,
+    %s,
+    PRIMARY KEY (match_id, jugador_sk)
+);
+CREATE INDEX IF NOT EXISTS idx_fact_jugador_partido_jugador ON fact_jugador_partido (jugador_sk);
+CREATE TABLE IF NOT EXISTS fact_equipo_partido (
+    match_id  INTEGER NOT NULL,
+    equipo_sk INTEGER NOT NULL REFERENCES dim_equipo,
+    es_local  INTEGER NOT NULL,
+    %s,
+    PRIMARY KEY (match_id, equipo_sk)
+);
+CREATE INDEX IF NOT EXISTS idx_fact_equipo_partido_equipo ON fact_equipo_partido (equipo_sk);
+""" % (
+    ",\n    ".join(f'"{c}" INTEGER' for c in STATS_JUGADOR),
+    ",\n    ".join(f"{c} INTEGER" for c in STATS_EQUIPO),
+)
+
+
+# ============================
+# DIMENSIONES
+# ============================
+
+def _dimension(con, tabla, clave, df):
+    """
+    Upsert de `df` (clave natural + atributos) en `tabla` y devuelve
+    {clave natural: *_sk}. Las claves ya existentes conservan su sk.
+    """
+    df = df.dropna(subset=[clave]).drop_duplicates(clave, keep="last")
+    con.executemany(cargar_bd.sql_upsert(tabla, list(df.columns), [clave]), cargar_bd.tuplas(df))
+    sk = tabla.replace("dim_", "") + "_sk"
+    return dict(con.execute(f"SELECT {clave}, {sk} FROM {tabla}"))
+
+
+def _unicos(*series):
+    return pd.concat(series, ignore_index=True).dropna().drop_duplicates()
+
+
+def _mapear(serie, claves):
+    return serie.map(claves).astype("Int64")
+
+
+# ============================
+# CONSTRUCCIÓN
+# ============================
+
+def construir(con):
+    """Dimensiones (upsert) + hechos (rehechos) en una sola transacción."""
+    planas = {t: pd.read_sql(f"SELECT * FROM {t}", con) for t in cargar_bd.TABLAS}
+    equipos, jugadores = planas["equipos"], planas["jugadores"]
+    partidos, stats_j, stats_e = planas["partidos"], planas["estadisticas_jugador"], planas["estadisticas_equipo"]
+
+    with con:
+        # ---------- dimensiones ----------
+        naciones = _unicos(jugadores["nation"], stats_j["nation"])
+        nacion_sk = _dimension(con, "dim_nacion", "nation", pd.DataFrame({
+            "nation": naciones, "codigo": naciones.str.split().str[-1],
+        }))
+
+        team_ids = _unicos(equipos["team_id"], jugadores["team_id"], partidos["home_team_id"],
+                           partidos["away_team_id"], stats_e["team_id"])
+        equipo_sk = _dimension(con, "dim_equipo", "team_id", pd.DataFrame({"team_id": team_ids}).merge(
+            equipos, on="team_id", how="left"
+        ))
+
+        # Catálogo primero; jugadores que solo salen en las stats, con su Nation de ahí
+        dim_j = pd.concat([
+            stats_j[["player_id", "nation"]].drop_duplicates("player_id"),
+            jugadores[["player_id", "player", "born", "nation"]],
+        ], ignore_index=True).drop_duplicates("player_id", keep="last")
+        dim_j["nacion_sk"] = _mapear(dim_j.pop("nation"), nacion_sk)
+        jugador_sk = _dimension(con, "dim_jugador", "player_id", dim_j)
+
+        posicion_sk = _dimension(con, "dim_posicion", "pos", pd.DataFrame({"pos": _unicos(stats_j["pos"])}))
+        estadio_sk = _dimension(con, "dim_estadio", "venue", pd.DataFrame({"venue": _unicos(partidos["venue"])}))
+        arbitro_sk = _dimension(con, "dim_arbitro", "referee", pd.DataFrame({"referee": _unicos(partidos["referee"])}))
+
+        fechas = pd.to_datetime(_unicos(partidos["date"]), format="%Y-%m-%d", errors="coerce").dropna()
+        _dimension(con, "dim_fecha", "fecha_sk", pd.DataFrame({
+            "fecha_sk": fechas.dt.strftime("%Y%m%d").astype(int),
+            "fecha": fechas.dt.strftime("%Y-%m-%d"),
+            "anio": fechas.dt.year,
+            "mes": fechas.dt.month,
+            "dia": fechas.dt.day,
+            "dia_semana": fechas.dt.dayofweek + 1,   # 1 = lunes
+        }))
+
+        # ---------- hechos ----------
+        hora = partidos["time"].str.extract(r"^(\d{1,2}):(\d{2})").astype(float)
+        hechos = {
+            "fact_partido": pd.DataFrame({
+                "match_id": partidos["match_id"],
+                "fecha_sk": pd.to_numeric(partidos["date"].str.replace("-", ""), errors="coerce").astype("Int64"),
+                "local_sk": _mapear(partidos["home_team_id"], equipo_sk),
+                "visitante_sk": _mapear(partidos["away_team_id"], equipo_sk),
+                "estadio_sk": _mapear(partidos["venue"], estadio_sk),
+                "arbitro_sk": _mapear(partidos["referee"], arbitro_sk),
+                "jornada": partidos["wk"],
+                "hora_min": (hora[0] * 60 + hora[1]).astype("Int64"),
+                "asistencia": partidos["attendance"],
+                "goles_local": partidos["home_goals"],
+                "goles_visitante": partidos["away_goals"],
+            }),
+            "fact_jugador_partido": pd.concat([pd.DataFrame({
+                "match_id": stats_j["match_id"],
+                "jugador_sk": _mapear(stats_j["player_id"], jugador_sk),
+                "posicion_sk": _mapear(stats_j["pos"], posicion_sk),
+                "dorsal": stats_j["shirt_number"],
+                "edad_dias": stats_j["age_dias"],
+            }), stats_j[STATS_JUGADOR]], axis=1),
+            "fact_equipo_partido": pd.concat([pd.DataFrame({
+                "match_id": stats_e["match_id"],
+                "equipo_sk": _mapear(stats_e["team_id"], equipo_sk),
+                "es_local": (stats_e["side"] == "HOME").astype(int),
+            }), stats_e[STATS_EQUIPO]], axis=1),
+        }
+        for tabla, df in hechos.items():
+            con.execute(f"DELETE FROM {tabla}")
+            cols = [f'"{c}"' for c in df.columns]
+            con.executemany(
+                f"INSERT INTO {tabla} ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})",
+                cargar_bd.tuplas(df),
+            )
+
+    return {t: len(df) for t, df in hechos.items()}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Modelo en estrella (claves enteras) sobre laliga.sqlite")
+    ap.add_argument("--bd", default=cargar_bd.DB_FILE, help="fichero SQLite (ya cargado con cargar_bd.py)")
+    args = ap.parse_args()
+
+    con = cargar_bd.conectar(args.bd)
+    try:
+        con.executescript(_SCHEMA)
+        for tabla, n in construir(con).items():
+            print(f"   💾 {tabla}: {n} filas")
+        for (tabla,) in con.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'dim_%'"):
+            print(f"   📚 {tabla}: {con.execute(f'SELECT COUNT(*) FROM {tabla}').fetchone()[0]} filas")
+    finally:
+        con.close()
+    print(f"✔ Modelo en estrella listo → {args.bd}")
+
+
+if __name__ == "__main__":
+    main()
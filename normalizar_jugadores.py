@@ -8,70 +8,195 @@ Elimina:
 - columnas *_summary
 - columnas vacías
 - filas vacías
+Y tipa las columnas:
+- stats → Int16 (enteras) / Float32 (con decimales)
+- Nation / Pos → category
+- Age "21-269" (años-días) se mantiene y se añade a su lado Age_dias
+  (Int16, días de edad)
+- id → Int64
+Qué columnas están vacías y cómo se tipa cada stat sale del "perfil"
+de los datos (perfilar); el modo incremental le pasa el de TODOS los
+partidos para que un lote salga igual que en una pasada completa.
+Se guarda en CSV (para los scripts *_Final) y en Parquet con los tipos.
 """
 
 import pandas as pd
 
 INPUT = "jugadores_raw_with_id.csv"
 OUTPUT = "jugadores_estadisticas_normalizado.csv"
+OUTPUT_PARQUET = "jugadores_estadisticas_normalizado.parquet"
 
-print("📂 Leyendo jugadores_raw_with_id.csv ...")
-df = pd.read_csv(INPUT, dtype=str)
-
-# Aplanar MultiIndex si lo hubiera
-df.columns = [str(c) for c in df.columns]
-
-print(f"✔ Columnas detectadas: {len(df.columns)}")
-
-# -------------------------------
-# 1) ELIMINAR URL
-# -------------------------------
-if "match_url" in df.columns:
-    df = df.drop(columns=["match_url"])
-    print("🗑 Eliminada columna match_url")
-
-# -------------------------------
-# 2) ELIMINAR stat_type
-# -------------------------------
-if "stat_type" in df.columns:
-    df = df.drop(columns=["stat_type"])
-    print("🗑 Eliminada columna stat_type")
-
-# -------------------------------
-# 3) ELIMINAR columna team (hash)
-# -------------------------------
-if "team" in df.columns:
-    df = df.drop(columns=["team"])
-    print("🗑 Eliminada columna team (hash)")
-
-# -------------------------------
-# 4) ELIMINAR columnas *_summary
-# -------------------------------
-summary_cols = [c for c in df.columns if c.endswith("_summary")]
-if summary_cols:
-    df = df.drop(columns=summary_cols)
-    print(f"🗑 Eliminadas columnas resumen: {summary_cols}")
-
-# -------------------------------
-# 5) ELIMINAR columnas completamente vacías
-# -------------------------------
-empty_cols = [c for c in df.columns if df[c].isna().all() or (df[c] == "").all()]
-if empty_cols:
-    df = df.drop(columns=empty_cols)
-    print(f"🗑 Eliminadas columnas vacías: {empty_cols}")
-
-# -------------------------------
-# 6) LIMPIEZA DE FILAS
-# -------------------------------
-df = df.dropna(how="all")
-df = df[df.apply(lambda row: row.str.strip().astype(bool).any(), axis=1)]
-df = df.reset_index(drop=True)
-
-print(f"📦 Filas finales: {len(df)}")
-print(f"📦 Columnas finales: {len(df.columns)}")
-
-# -------------------------------
-# 7) GUARDAR
-# -------------------------------
-df.to_csv(OUTPUT, index=False, encoding="utf-8")
-print(f"\n🎉 Archivo normalizado generado: {OUTPUT}")
\ No newline at end of file
+TEXTO = ["Player", "Age"]
+CATEGORIAS = ["Nation", "Pos"]
+FIJAS = ["match_url", "stat_type", "team"]   # + columnas *_summary
+
+# Tipo de una stat, de menos a más general
+TIPOS = ["entero", "decimal", "texto"]
+
+
+def _celdas_vacias(df):
+    """NaN o texto en blanco; vale para columnas de texto y ya tipadas."""
+    vacias = df.isna()
+    # Solo las columnas de texto pueden tener blancos (las tipadas: isna basta)
+    for c in df.columns[[t == object or isinstance(t, pd.StringDtype) for t in df.dtypes]]:
+        vacias[c] |= df[c].str.strip().eq("").fillna(False).astype(bool)
+    return vacias
+
+
+def perfilar(df, por=None):
+    """
+    {"con_datos": columnas con algún dato (ordenadas), "tipos": {stat:
+    "entero" | "decimal" | "texto"}} de `df` (sin contar las columnas que
+    se quitan siempre). Con `por` (Serie alineada con `df`): {valor: perfil}.
+    """
+    df = df.copy()
+    df.columns = [str(c) for c in df.columns]
+    df = df.drop(columns=[c for c in df.columns if c in FIJAS or c.endswith("_summary")])
+    claves = pd.Series("", index=df.index) if por is None else por
+
+    # Las filas vacías se quitan en normalizar(): no cuentan
+    vacias = _celdas_vacias(df)
+    llenas = ~vacias.all(axis=1)
+    df, vacias, claves = df[llenas], vacias[llenas], claves[llenas]
+
+    stats = [c for c in df.columns if c not in TEXTO + CATEGORIAS + ["id"]]
+    valores = df[stats].apply(pd.to_numeric, errors="coerce").astype("float64")
+    marcas = {
+        "dato": ~vacias,
+        "texto": valores.isna() & df[stats].notna(),
+        "decimal": valores.notna() & ((valores % 1 != 0) | (valores.abs() > 32767)),
+    }
+    marcas = {k: m.groupby(claves.values, sort=False).any() for k, m in marcas.items()}
+
+    perfiles = {}
+    for clave in marcas["dato"].index:
+        tipos = dict.fromkeys(stats, "entero")
+        for tipo in ("decimal", "texto"):
+            fila = marcas[tipo].loc[clave]
+            tipos.update(dict.fromkeys(fila.index[fila], tipo))
+        fila = marcas["dato"].loc[clave]
+        perfiles[clave] = {"con_datos": sorted(fila.index[fila]), "tipos": tipos}
+
+    if por is None:
+        return perfiles.get("", {"con_datos": [], "tipos": dict.fromkeys(stats, "entero")})
+    return perfiles
+
+
+def combinar(perfiles):
+    """Perfil de la unión de varios (p.ej. uno por partido); no depende del orden."""
+    con_datos, tipos = set(), {}
+    for p in perfiles:
+        con_datos.update(p["con_datos"])
+        for c, t in p["tipos"].items():
+            tipos[c] = max(tipos.get(c, t), t, key=TIPOS.index)
+    return {"con_datos": sorted(con_datos), "tipos": tipos}
+
+
+def normalizar(df, perfil=None):
+    """
+    jugadores_raw_with_id (CSV leído como str o DataFrame en memoria) →
+    estadísticas limpias y tipadas. `perfil` (perfilar/combinar) decide
+    columnas vacías y tipos; por defecto, el de `df`.
+    """
+    # Aplanar MultiIndex si lo hubiera
+    df = df.copy()
+    df.columns = [str(c) for c in df.columns]
+
+    print(f"✔ Columnas detectadas: {len(df.columns)}")
+
+    # -------------------------------
+    # 1) ELIMINAR URL
+    # -------------------------------
+    if "match_url" in df.columns:
+        df = df.drop(columns=["match_url"])
+        print("🗑 Eliminada columna match_url")
+
+    # -------------------------------
+    # 2) ELIMINAR stat_type
+    # -------------------------------
+    if "stat_type" in df.columns:
+        df = df.drop(columns=["stat_type"])
+        print("🗑 Eliminada columna stat_type")
+
+    # -------------------------------
+    # 3) ELIMINAR columna team (hash)
+    # -------------------------------
+    if "team" in df.columns:
+        df = df.drop(columns=["team"])
+        print("🗑 Eliminada columna team (hash)")
+
+    # -------------------------------
+    # 4) ELIMINAR columnas *_summary
+    # -------------------------------
+    summary_cols = [c for c in df.columns if c.endswith("_summary")]
+    if summary_cols:
+        df = df.drop(columns=summary_cols)
+        print(f"🗑 Eliminadas columnas resumen: {summary_cols}")
+
+    # -------------------------------
+    # 5) ELIMINAR columnas completamente vacías
+    # -------------------------------
+    # Máscara de celdas vacías (NaN o solo espacios), columna a columna
+    vacias = _celdas_vacias(df)
+    perfil = perfilar(df) if perfil is None else perfil
+
+    empty_cols = [c for c in df.columns if c not in perfil["con_datos"]]
+    if empty_cols:
+        df = df.drop(columns=empty_cols)
+        vacias = vacias.drop(columns=empty_cols)
+        print(f"🗑 Eliminadas columnas vacías: {empty_cols}")
+
+    # -------------------------------
+    # 6) LIMPIEZA DE FILAS
+    # -------------------------------
+    df = df[~vacias.all(axis=1)].reset_index(drop=True)
+
+    print(f"📦 Filas finales: {len(df)}")
+    print(f"📦 Columnas finales: {len(df.columns)}")
+
+    # -------------------------------
+    # 7) TIPOS
+    # -------------------------------
+    memoria_antes = df.memory_usage(deep=True).sum()
+
+    if "Age" in df.columns:
+        # "21-269" → 21 años y 269 días (años con 365.2425 días de media)
+        partes = df["Age"].str.extract(r"^\s*(\d+)-(\d+)\s*$").astype("Int32")
+        dias = (partes[0] * 3652425 // 10000 + partes[1]).astype("Int16")
+        df.insert(df.columns.get_loc("Age") + 1, "Age_dias", dias)
+
+    if "id" in df.columns:
+        df["id"] = pd.to_numeric(df["id"], errors="coerce").astype("Int64")
+
+    for c in CATEGORIAS:
+        if c in df.columns:
+            df[c] = df[c].astype("category")
+
+    stats = [c for c in df.columns if c not in TEXTO + CATEGORIAS + ["Age_dias", "id"]]
+    for c in stats:
+        tipo = perfil["tipos"][c]
+        if tipo == "texto":
+            continue   # columna con texto: se deja como está
+        valores = pd.to_numeric(df[c], errors="coerce")
+        df[c] = valores.astype("Int16" if tipo == "entero" else "Float32")
+
+    memoria_despues = df.memory_usage(deep=True).sum()
+    print(f"📉 Memoria: {memoria_antes / 1e6:.1f} MB → {memoria_despues / 1e6:.1f} MB")
+
+    return df
+
+
+def main():
+    print(f"📂 Leyendo {INPUT} ...")
+    df = normalizar(pd.read_csv(INPUT, dtype=str))
+
+    # -------------------------------
+    # 8) GUARDAR
+    # -------------------------------
+    df.to_csv(OUTPUT, index=False, encoding="utf-8")
+    df.to_parquet(OUTPUT_PARQUET, index=False, compression="zstd")
+    print(f"\n🎉 Archivo normalizado generado: {OUTPUT} (+ {OUTPUT_PARQUET})")
+
+
+if __name__ == "__main__":
+    main()
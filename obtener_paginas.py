@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+Backends para descargar páginas de FBref
+- "selenium": el Chrome con depurador (127.0.0.1:9222), como siempre.
+- "http": cliente HTTP con huella TLS de Chrome (wrapper-tls-requests,
+  ya dependencia de soccerdata) y las cookies exportadas en
+  cookies_fbref.txt. Las tablas de FBref vienen en el HTML estático
+  (dentro de comentarios), así que no hace falta renderizar nada.
+  Si FBref devuelve un desafío / 429, o faltan las tablas, esa página se
+  pide con Selenium (el driver solo se abre si hace falta).
+
+Uso desde los scrapers:
+    obtenedor = obtener_paginas.crear(args.backend, ritmo.LimitadorAdaptativo())
+    match_urls = obtenedor.match_urls()
+    html = obtenedor.pagina(url, [MARCADOR], WAIT_PARTIDO_SEC)
+"""
+
+import re
+
+import tls_requests
+
+import archivo_html
+import ritmo
+from fbref_comun import FIXTURES_URL, conectar_chrome, cargar_partidos, partidos_de_html, urls_de_partidos
+
+# ============================
+# CONFIG
+# ============================
+BACKENDS = ("selenium", "http")
+
+COOKIES_FILE = "cookies_fbref.txt"
+# cf_clearance va ligada al navegador que la obtuvo: mismo User-Agent
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/133.0.0.0 Safari/537.36"
+)
+CLIENT_IDENTIFIER = "chrome_133"
+TIMEOUT_HTTP_SEC = 30
+
+# Tras tantos desafíos seguidos se deja de intentar HTTP en esta ejecución
+MAX_DESAFIOS_SEGUIDOS = 3
+
+MARCADOR_FIXTURES = r'id="sched_'
+
+
+# ============================
+# COOKIES
+# ============================
+
+def leer_cookies(path=COOKIES_FILE) -> dict:
+    """Cabecera Cookie exportada del navegador ('a=1; b=2') → dict."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            texto = f.read().strip()
+    except FileNotFoundError:
+        print(f"⚠ No existe {path}; se pedirá sin cookies")
+        return {}
+
+    cookies = {}
+    for trozo in texto.split(";"):
+        if "=" in trozo:
+            k, v = trozo.split("=", 1)
+            cookies[k.strip()] = v.strip()
+    return cookies
+
+
+# ============================
+# BACKEND SELENIUM
+# ============================
+
+class ObtenedorSelenium:
+    """Chrome con depurador; el driver se conecta la primera vez que se usa."""
+
+    def __init__(self, limitador):
+        self.limitador = limitador
+        self._driver = None
+
+    @property
+    def driver(self):
+        if self._driver is None:
+            self._driver = conectar_chrome()
+        return self._driver
+
+    def partidos(self):
+        """Registros de la tabla de fixtures (fbref_comun.partidos_de_html)."""
+        partidos = cargar_partidos(self.driver)
+        archivo_html.guardar(FIXTURES_URL, self.driver.page_source)
+        return partidos
+
+    def match_urls(self):
+        return urls_de_partidos(self.partidos())
+
+    def pagina(self, url, patrones, timeout):
+        return ritmo.navegar(self.driver, url, self.limitador, patrones, timeout)
+
+
+# ============================
+# BACKEND HTTP (+ fallback)
+# ============================
+
+class ObtenedorHTTP(ObtenedorSelenium):
+    """HTTP con cookies; cae a Selenium página a página si hay desafío."""
+
+    def __init__(self, limitador, cookies_file=COOKIES_FILE):
+        super().__init__(limitador)
+        self.cliente = tls_requests.Client(
+            headers={"User-Agent": USER_AGENT, "Accept-Language": "en-US,en;q=0.9"},
+            cookies=leer_cookies(cookies_file),
+            client_identifier=CLIENT_IDENTIFIER,
+            timeout=TIMEOUT_HTTP_SEC,
+        )
+        self.desafios_seguidos = 0
+
+    def _http(self, url, patrones):
+        """HTML por HTTP, o None si hay que pasar a Selenium."""
+        if self.desafios_seguidos >= MAX_DESAFIOS_SEGUIDOS:
+            return None
+
+        self.limitador.esperar()
+        try:
+            r = self.cliente.get(url)
+        except Exception as e:
+            print(f"   ⚠ HTTP falló ({e}); se usa Selenium")
+            return None
+
+        html = r.text or ""
+        if r.status_code == 429:
+            self.limitador.penalizar()
+            return None
+        if r.status_code == 403 or ritmo.es_bloqueo_html(html):
+            self.desafios_seguidos += 1
+            print(f"   🧩 Desafío por HTTP ({self.desafios_seguidos}/{MAX_DESAFIOS_SEGUIDOS}); se usa Selenium")
+            if self.desafios_seguidos == MAX_DESAFIOS_SEGUIDOS:
+                print("   ↪ Demasiados desafíos: resto de la ejecución con Selenium (¿cookies caducadas?)")
+            return None
+        if r.status_code != 200 or not all(re.search(p, html) for p in patrones):
+            print(f"   ⚠ HTTP {r.status_code} sin las tablas esperadas; se usa Selenium")
+            return None
+
+        self.desafios_seguidos = 0
+        self.limitador.exito()
+        return html
+
+    def partidos(self):
+        html = self._http(FIXTURES_URL, [MARCADOR_FIXTURES])
+        if html is None:
+            return super().partidos()
+        archivo_html.guardar(FIXTURES_URL, html)
+        return partidos_de_html(html)
+
+    def pagina(self, url, patrones, timeout):
+        html = self._http(url, patrones)
+        if html is None:
+            return super().pagina(url, patrones, timeout)
+        return html
+
+
+def crear(backend, limitador):
+    if backend == "http":
+        return ObtenedorHTTP(limitador)
+    return ObtenedorSelenium(limitador)
@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+"""
+Ejecutor del pipeline (sustituye a la secuencia fija de run_pipeline.bat)
+- ETAPAS declara cada script con sus ficheros de entrada y de salida; las
+  dependencias salen de ahí (quién escribe lo que otro lee), no del orden.
+- Salto por contenido: se guarda (.pipeline_estado.json) el hash del
+  script, de los módulos del repo que importa (servicio_ids.py,
+  urls_partido.py...) y de sus entradas tras cada ejecución correcta. Si
+  no ha cambiado nada y las salidas existen, la etapa no se vuelve a lanzar.
+- Ramas independientes en paralelo (p.ej. Equipo_/Jugador_/Partidos_Final).
+- Si una etapa falla no se lanzan más; al repetir se retoma desde ella
+  (las que ya terminaron bien se saltan por hash).
+- Las etapas de scraping (Chrome + CAPTCHA) solo con --scraping, en serie
+  y con la consola a la vista; sin él sus salidas se toman como fuentes.
+
+Uso:
+    python pipeline.py                 # normalización, IDs y finales
+    python pipeline.py --scraping      # todo, scraping incluido
+    python pipeline.py --forzar        # ignora los hashes guardados
+    python pipeline.py --lista         # qué se ejecutaría, sin ejecutar
+    python pipeline.py --en-memoria    # sin scraping, en un solo proceso
+                                       # (pipeline_memoria.py)
+    python pipeline.py --en-memoria --incremental
+                                       # solo partidos nuevos/cambiados
+                                       # (solo en memoria: los scripts
+                                       # sueltos rehacen la etapa entera)
+"""
+
+import os
+import sys
+import ast
+import json
+import time
+import hashlib
+import argparse
+import subprocess
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# ============================
+# CONFIG
+# ============================
+DIR = os.path.dirname(os.path.abspath(__file__))
+ESTADO_FILE = os.path.join(DIR, ".pipeline_estado.json")
+N_PARALELO = 3
+
+# (script, entradas, salidas, scraping)
+# Una etapa puede reescribir su propia entrada (Limpiar_*): depende de la
+# etapa ANTERIOR (en esta lista) que escribió ese fichero.
+# El memo de IDs (ids_memo.sqlite, servicio_ids.py) NO es entrada: lo
+# escriben las mismas etapas de IDs (varias a la vez) y su efecto ya está
+# en los *_ids.csv que producen; como entrada, cada pasada invalidaría la
+# siguiente.
+ETAPAS = [
+    # ---------- scraping ----------
+    ("laliga_partidos.py", [], ["laliga_partidos.csv"], True),
+    ("scraper_partidos.py", [],
+     ["jugadores_raw/_manifest.json", "team_raw.csv", "goalkeeper_raw.csv"], True),
+    ("create_jugadores.py", [], ["jugadores_laliga.csv"], True),
+
+    # ---------- normalización ----------
+    ("generar_jugadores_raw_with_id.py", ["jugadores_raw/_manifest.json", "jugadores_raw.csv"], ["jugadores_raw_with_id.csv"], False),
+    ("normalizar_team_stats.py", ["laliga_fixtures.csv", "team_raw.csv"], ["normalized_fbref.csv"], False),
+    ("normalizar_jugadores.py", ["jugadores_raw_with_id.csv"],
+     ["jugadores_estadisticas_normalizado.csv", "jugadores_estadisticas_normalizado.parquet"], False),
+
+    # ---------- IDs ----------
+    ("generar_ids_equipos.py", ["equipos_final.csv"], ["equipos_final_ids.csv"], False),
+    ("generar_ids_jugadores.py", ["jugadores_laliga.csv"], ["jugadores_laliga_ids.csv"], False),
+    ("generar_ids_para_todos.py",
+     ["laliga_partidos.csv", "normalized_fbref.csv", "jugadores_laliga_ids.csv"],
+     ["laliga_partidos_with_id.csv", "normalized_estadisticas_equipos_with_id.csv",
+      "jugadores_laliga_ids_FINAL.csv"], False),
+
+    # ---------- finales ----------
+    ("Equipo_Estadisticas_Final.py",
+     ["normalized_estadisticas_equipos_with_id.csv", "equipos_final_ids.csv"], ["TEAM_STATS_FINAL.CSV"], False),
+    ("Jugador_Estadisticas_Final.py",
+     ["jugadores_estadisticas_normalizado.csv", "jugadores_laliga_ids.csv", "laliga_partidos_with_id.csv"],
+     ["PLAYER_STATS_FINAL.CSV"], False),
+    ("Partidos_Final.py", ["laliga_partidos_with_id.csv", "equipos_final_ids.csv"], ["PARTIDOS_FINAL.CSV"], False),
+
+    # ---------- limpieza ----------
+    ("Limpiar_Team_Stats_Final.py", ["TEAM_STATS_FINAL.CSV"], ["TEAM_STATS_FINAL.CSV"], False),
+    ("Limpiar_Player_Stats_Final.py", ["PLAYER_STATS_FINAL.CSV"], ["PLAYER_STATS_FINAL.CSV"], False),
+    ("SepararDatosEquipoPartido.py", ["TEAM_STATS_FINAL.CSV"], ["TEAM_MATCH_STATS_FINAL.csv"], False),
+
+    # ---------- base de datos ----------
+    ("cargar_bd.py",
+     ["PARTIDOS_FINAL.CSV", "PLAYER_STATS_FINAL.CSV", "TEAM_MATCH_STATS_FINAL.csv",
+      "equipos_final_ids.csv", "jugadores_laliga_ids_FINAL.csv"], ["laliga.sqlite"], False),
+    ("modelo_estrella.py", ["laliga.sqlite"], ["laliga.sqlite"], False),
+]
+
+
+# ============================
+# GRAFO
+# ============================
+
+def dependencias(etapas):
+    """{script: {scripts de los que depende}} según entradas/salidas."""
+    deps, escritor = {}, {}
+    for script, entradas, salidas, _ in etapas:
+        deps[script] = {escritor[f] for f in entradas if f in escritor}
+        for f in salidas:
+            escritor[f] = script
+    return deps
+
+
+# ============================
+# HASHES / ESTADO
+# ============================
+
+def hash_fichero(path):
+    """blake2b del contenido, o None si no existe."""
+    if not os.path.exists(path):
+        return None
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for trozo in iter(lambda: f.read(1 << 20), b""):
+            h.update(trozo)
+    return h.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def modulos_locales(script):
+    """Módulos .py del repo que importa `script`, directa o indirectamente."""
+    pendientes, vistos = [script], set()
+    while pendientes:
+        path = os.path.join(DIR, pendientes.pop())
+        with open(path, encoding="utf-8") as f:
+            arbol = ast.parse(f.read(), path)
+        for nodo in ast.walk(arbol):
+            if isinstance(nodo, ast.Import):
+                nombres = [a.name for a in nodo.names]
+            elif isinstance(nodo, ast.ImportFrom) and nodo.module and not nodo.level:
+                nombres = [nodo.module]
+            else:
+                continue
+            for nombre in nombres:
+                modulo = nombre.split(".")[0] + ".py"
+                if modulo != script and modulo not in vistos and os.path.exists(os.path.join(DIR, modulo)):
+                    vistos.add(modulo)
+                    pendientes.append(modulo)
+    return sorted(vistos)
+
+
+def huella(script, entradas):
+    """
+    Hashes del script, de los módulos locales que importa y de sus
+    entradas (lo que decide si hay que relanzar).
+    """
+    ficheros = [script] + modulos_locales(script) + list(entradas)
+    return {f: hash_fichero(os.path.join(DIR, f)) for f in ficheros}
+
+
+def leer_estado():
+    if not os.path.exists(ESTADO_FILE):
+        return {}
+    with open(ESTADO_FILE, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def guardar_estado(estado):
+    tmp = ESTADO_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(estado, f, indent=1, sort_keys=True)
+    os.replace(tmp, ESTADO_FILE)
+
+
+def al_dia(script, entradas, salidas, estado):
+    if not all(os.path.exists(os.path.join(DIR, f)) for f in salidas):
+        return False
+    return estado.get(script) == huella(script, entradas)
+
+
+# ============================
+# EJECUCIÓN
+# ============================
+
+def lanzar(script, capturar=True):
+    """(código de salida, salida del script, segundos)."""
+    t0 = time.monotonic()
+    r = subprocess.run(
+        [sys.executable, os.path.join(DIR, script)],
+        cwd=DIR,
+        capture_output=capturar,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        env={**os.environ, "PYTHONIOENCODING": "utf-8"},
+    )
+    salida = (r.stdout or "") + (r.stderr or "") if capturar else ""
+    return r.returncode, salida, time.monotonic() - t0
+
+
+def ejecutar(scraping=False, forzar=False, solo_lista=False, n_paralelo=N_PARALELO):
+    """Devuelve el script que falló, o None si todo fue bien."""
+    estado = {} if forzar else leer_estado()
+    deps = dependencias(ETAPAS)
+    etapas = {e[0]: e for e in ETAPAS if scraping or not e[3]}
+    orden = [e[0] for e in ETAPAS if e[0] in etapas]
+    deps = {s: deps[s] & set(etapas) for s in orden}
+
+    # Una etapa se relanza si cambió su huella o si se relanza algo de lo que depende
+    relanzar = set()
+    for s in orden:
+        _, entradas, salidas, es_scraping = etapas[s]
+        if es_scraping or deps[s] & relanzar or not al_dia(s, entradas, salidas, estado):
+            relanzar.add(s)
+
+    for s in orden:
+        print(f"   {'▶' if s in relanzar else '✔'} {s}")
+    if not relanzar:
+        print("✔ Nada que ejecutar: todo al día")
+    if solo_lista or not relanzar:
+        return None
+
+    # Scraping: en serie y con la consola (input(), Chrome...)
+    for s in [s for s in orden if s in relanzar and etapas[s][3]]:
+        print(f"\n🕷  {s}")
+        codigo, _, _ = lanzar(s, capturar=False)
+        if codigo != 0:
+            print(f"❌ {s} falló (código {codigo})")
+            return s
+        relanzar.discard(s)
+
+    pendientes = [s for s in orden if s in relanzar]
+    hechos = {s for s in orden if s not in relanzar}
+    en_marcha, fallo = {}, None
+
+    with ThreadPoolExecutor(max_workers=n_paralelo) as pool:
+        while pendientes or en_marcha:
+            if fallo is None:
+                for s in [s for s in pendientes if deps[s] <= hechos]:
+                    if len(en_marcha) >= n_paralelo:
+                        break
+                    # Dos etapas que escriben el mismo fichero nunca a la vez
+                    ocupados = {f for o in en_marcha.values() for f in etapas[o][2]}
+                    if ocupados & set(etapas[s][2]):
+                        continue
+                    pendientes.remove(s)
+                    en_marcha[pool.submit(lanzar, s)] = s
+                    print(f"▶ {s}")
+
+            if not en_marcha:
+                break
+            listos, _ = wait(en_marcha, return_when=FIRST_COMPLETED)
+            for fut in listos:
+                s = en_marcha.pop(fut)
+                codigo, salida, seg = fut.result()
+                if codigo != 0:
+                    print(f"❌ {s} falló (código {codigo}, {seg:.1f}s)\n{salida}")
+                    fallo = fallo or s
+                    continue
+                hechos.add(s)
+                estado[s] = huella(s, etapas[s][1])
+                guardar_estado(estado)
+                print(f"✔ {s} ({seg:.1f}s)")
+
+    if fallo:
+        print(f"\n⚠️  Pipeline detenido en {fallo}. Al relanzar se retoma desde ahí.")
+    return fallo
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Pipeline LaLiga con dependencias y salto por hash")
+    ap.add_argument("--scraping", action="store_true", help="incluye las etapas de scraping (Chrome)")
+    ap.add_argument("--forzar", action="store_true", help="ignora los hashes y lo relanza todo")
+    ap.add_argument("--lista", action="store_true", help="muestra qué se ejecutaría y sale")
+    ap.add_argument("--paralelo", type=int, default=N_PARALELO, help="etapas a la vez")
+    ap.add_argument("--en-memoria", action="store_true", help="etapas encadenadas en un proceso, sin CSV intermedios")
+    ap.add_argument("--intermedios", action="store_true", help="con --en-memoria: escribe también los intermedios")
+    ap.add_argument("--incremental", action="store_true", help="con --en-memoria: solo partidos nuevos/cambiados")
+    args = ap.parse_args()
+
+    if args.en_memoria:
+        import pipeline_memoria
+        if args.incremental:
+            pipeline_memoria.ejecutar_incremental(args.intermedios)
+        else:
+            pipeline_memoria.ejecutar(args.intermedios)
+        return
+
+    t0 = time.monotonic()
+    fallo = ejecutar(args.scraping, args.forzar, args.lista, max(1, args.paralelo))
+    print(f"⏱  {time.monotonic() - t0:.1f}s")
+    sys.exit(1 if fallo else 0)
+
+
+if __name__ == "__main__":
+    main()
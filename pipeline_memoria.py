@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+"""
+Pipeline en memoria (un solo proceso)
+Encadena las funciones de cada etapa pasando DataFrames ya tipados, sin
+escribir y volver a leer los CSV intermedios ni pagar el arranque de
+Python/pandas por script:
+
+  jugadores_raw/ → con_id → normalizar → player_stats_final → limpiar
+  team_raw.csv   → normalizar → stats_con_id → team_stats_final → limpiar
+                                                 → separar_por_lado
+  laliga_partidos.csv → partidos_con_id → partidos_final
+
+Solo se escriben los ficheros finales; con --intermedios también los de
+en medio (mismos nombres y formato que los scripts sueltos).
+
+Con --incremental cada cadena procesa solo los partidos nuevos o
+cambiados desde la última pasada (checkpoints en incremental.py) y los
+fusiona en los CSV existentes. Si cambia un catálogo (equipos,
+jugadores, fixtures) o falta una salida, esa cadena se rehace entera.
+El modo incremental solo existe aquí: los scripts sueltos y pipeline.py
+sin --en-memoria rehacen cada etapa entera (se la saltan por hash, pero
+no procesan por partido).
+
+    python pipeline_memoria.py [--intermedios] [--incremental]
+    python pipeline.py --en-memoria [--intermedios] [--incremental]
+"""
+
+import os
+import json
+import time
+import hashlib
+import argparse
+
+import pandas as pd
+
+import incremental
+import generar_jugadores_raw_with_id as jugadores_raw
+import normalizar_jugadores
+import normalizar_team_stats
+import generar_ids_equipos
+import generar_ids_jugadores
+import generar_ids_para_todos
+import Equipo_Estadisticas_Final
+import Jugador_Estadisticas_Final
+import Partidos_Final
+import Limpiar_Team_Stats_Final
+import Limpiar_Player_Stats_Final
+import SepararDatosEquipoPartido
+import almacen_raw
+from pipeline import hash_fichero
+from servicio_ids import ids_partidos
+
+
+def _guardar(df, path, **kwargs):
+    df.to_csv(path, index=False, **kwargs)
+    print(f"   💾 {path} ({len(df)} filas)")
+
+
+def ejecutar(intermedios=False):
+    """Devuelve {nombre_fichero: DataFrame} de las salidas finales."""
+    t0 = time.monotonic()
+    finales, medios = {}, {}
+
+    # ---------- catálogos ----------
+    equipos = generar_ids_equipos.equipos_con_id(pd.read_csv(generar_ids_equipos.INPUT))
+    jugadores = generar_ids_jugadores.jugadores_con_id(pd.read_csv(generar_ids_jugadores.INPUT))
+    finales[generar_ids_equipos.OUTPUT] = (equipos, {"encoding": "utf-8-sig"})
+    medios[generar_ids_jugadores.OUTPUT] = (jugadores, {"encoding": "utf-8-sig"})
+    finales[generar_ids_para_todos.OUT_JUGADORES] = (
+        generar_ids_para_todos.jugadores_con_team_id(jugadores), {}
+    )
+
+    # Partidos primero: sus equipos deciden el player_id (Jugador_Estadisticas_Final)
+    fixtures = generar_ids_para_todos.leer_fixtures()
+    partidos = generar_ids_para_todos.partidos_con_id(fixtures)
+
+    # ---------- jugadores ----------
+    print("🟢 Jugadores...")
+    raw = jugadores_raw.con_id(almacen_raw.abrir(jugadores_raw.RAW, jugadores_raw.RAW_CSV_ANTIGUO))
+    medios[jugadores_raw.OUT] = (raw, {"encoding": "utf-8-sig"})
+
+    normalizado = normalizar_jugadores.normalizar(raw)
+    medios[normalizar_jugadores.OUTPUT] = (normalizado, {"encoding": "utf-8"})
+
+    player_stats = Jugador_Estadisticas_Final.player_stats_final(normalizado, jugadores, partidos)
+    finales[Limpiar_Player_Stats_Final.FILE] = (Limpiar_Player_Stats_Final.limpiar(player_stats), {})
+
+    # ---------- equipos ----------
+    print("🔵 Equipos y partidos...")
+    normalizar_team_stats.anadir_equipos_de_fixtures(pd.read_csv(normalizar_team_stats.FIXTURES_FILE))
+    fbref = normalizar_team_stats.normalizar(normalizar_team_stats.leer_raw())
+    medios[normalizar_team_stats.OUTPUT] = (fbref, {})
+
+    stats = generar_ids_para_todos.stats_con_id(fbref)
+    medios[generar_ids_para_todos.OUT_STATS] = (stats, {})
+
+    team_stats = Limpiar_Team_Stats_Final.limpiar(Equipo_Estadisticas_Final.team_stats_final(stats, equipos))
+    finales[Limpiar_Team_Stats_Final.FILE] = (team_stats, {})
+
+    por_lado, _ = SepararDatosEquipoPartido.separar_por_lado(team_stats, stats=SepararDatosEquipoPartido.NOMBRES)
+    finales[SepararDatosEquipoPartido.OUTFILE] = (por_lado, {"encoding": "utf-8"})
+
+    # ---------- partidos ----------
+    medios[generar_ids_para_todos.OUT_PARTIDOS] = (partidos, {})
+    finales[Partidos_Final.OUT] = (Partidos_Final.partidos_final(partidos, equipos), {"encoding": "utf-8-sig"})
+
+    # ---------- escribir ----------
+    print("💾 Guardando...")
+    for path, (df, kwargs) in finales.items():
+        _guardar(df, path, **kwargs)
+    if intermedios:
+        for path, (df, kwargs) in medios.items():
+            _guardar(df, path, **kwargs)
+        normalizado.to_parquet(normalizar_jugadores.OUTPUT_PARQUET, index=False, compression="zstd")
+
+    print(f"✔ Pipeline en memoria completado ({time.monotonic() - t0:.1f}s)")
+    return {path: df for path, (df, _) in finales.items()}
+
+
+# ============================
+# INCREMENTAL
+# ============================
+
+def _ids_de(match_ids):
+    """match_ids de FBref → ids de salida en texto ("" si no es un hash)."""
+    ids = ids_partidos(pd.Series(list(match_ids), dtype="string"))
+    return set(ids.astype("string").fillna(""))
+
+
+def _fusionar(salidas, intermedios, completo):
+    """salidas = [(path, delta, col_id, quitar, kwargs, es_intermedio)]."""
+    for path, delta, col_id, quitar, kwargs, es_intermedio in salidas:
+        if es_intermedio and not intermedios:
+            continue
+        modo = incremental.fusionar_csv(path, delta, col_id, quitar, completo, **kwargs)
+        print(f"   💾 {path} (+{len(delta)} filas, {modo})")
+
+
+def _cadena_jugadores(jugadores, partidos, intermedios):
+    """
+    Además de la firma de cada partición se guarda su perfil (columnas con
+    datos y tipo de cada stat, normalizar_jugadores.perfilar): el lote se
+    normaliza con el perfil de TODO el almacén. Si ese perfil cambia, las
+    filas ya escritas saldrían con otro formato → la cadena se rehace entera.
+    """
+    etapa, etapa_perfil = "jugadores", "jugadores_perfil"
+    almacen = almacen_raw.abrir(jugadores_raw.RAW, jugadores_raw.RAW_CSV_ANTIGUO)
+    deps = {"_catalogo": hash_fichero(generar_ids_jugadores.INPUT), "_intermedios": intermedios}
+    rutas = [(jugadores_raw.OUT, True), (normalizar_jugadores.OUTPUT, True), (Limpiar_Player_Stats_Final.FILE, False)]
+    completo = incremental.preparar(etapa, deps, [p for p, medio in rutas if intermedios or not medio])
+    if completo:
+        incremental.olvidar_etapa(etapa_perfil)
+
+    actuales = almacen.firmas()
+    nuevos, cambiados, borrados = incremental.cambios(etapa, actuales)
+    print(f"🟢 Jugadores: {len(nuevos)} nuevos, {len(cambiados)} cambiados, {len(borrados)} borrados"
+          f"{' (completo)' if completo else ''}")
+    if not (nuevos or cambiados or borrados):
+        return
+
+    raw = pd.DataFrame()
+    perfiles = {m: json.loads(p) for m, p in incremental.firmas(etapa_perfil).items() if m in actuales}
+    if nuevos or cambiados:
+        raw = jugadores_raw.con_id(almacen, match_ids=nuevos + cambiados)
+        delta = normalizar_jugadores.perfilar(raw, raw["match_url"].map(almacen_raw.match_id_de_url))
+        # Partición sin ninguna fila con datos: perfil vacío
+        perfiles.update({m: delta.get(m, {"con_datos": [], "tipos": {}}) for m in nuevos + cambiados})
+    perfil = normalizar_jugadores.combinar(perfiles.values())
+    firma_perfil = json.dumps(perfil, sort_keys=True)
+
+    if not completo and incremental.firmas(etapa).get("_perfil") != firma_perfil:
+        print("   ↻ Cambian las columnas o los tipos del conjunto: se rehace entero")
+        incremental.olvidar_etapa(etapa)
+        return _cadena_jugadores(jugadores, partidos, intermedios)
+
+    if nuevos or cambiados:
+        normalizado = normalizar_jugadores.normalizar(raw, perfil)
+        final = Limpiar_Player_Stats_Final.limpiar(
+            Jugador_Estadisticas_Final.player_stats_final(normalizado, jugadores, partidos)
+        )
+    else:
+        # Solo borrados: nada que calcular, solo quitar filas
+        normalizado = final = pd.DataFrame()
+
+    quitar = _ids_de(cambiados + borrados)
+    _fusionar([
+        (jugadores_raw.OUT, raw, "id", quitar, {"encoding": "utf-8-sig"}, True),
+        (normalizar_jugadores.OUTPUT, normalizado, "id", quitar, {}, True),
+        (Limpiar_Player_Stats_Final.FILE, final, "id", quitar, {}, False),
+    ], intermedios, completo)
+
+    incremental.confirmar(etapa_perfil, {m: json.dumps(perfiles[m]) for m in nuevos + cambiados}, borrados)
+    incremental.confirmar(
+        etapa, {**{m: actuales[m] for m in nuevos + cambiados}, **deps, "_perfil": firma_perfil}, borrados
+    )
+
+
+def _cadena_equipos(equipos, intermedios):
+    """
+    team_raw.csv solo crece (append por partido): se procesa desde el byte
+    donde se quedó la pasada anterior ("_offset"). Si el fichero encogió o
+    cambió lo ya leído ("_cola"), se rehace entero.
+    """
+    etapa = "equipos"
+    raw_path = normalizar_team_stats.RAW_FILE
+    deps = {
+        "_equipos": hash_fichero(generar_ids_equipos.INPUT),
+        "_fixtures": hash_fichero(normalizar_team_stats.FIXTURES_FILE),
+        "_intermedios": intermedios,
+    }
+    rutas = [
+        (normalizar_team_stats.OUTPUT, True), (generar_ids_para_todos.OUT_STATS, True),
+        (Limpiar_Team_Stats_Final.FILE, False), (SepararDatosEquipoPartido.OUTFILE, False),
+    ]
+    completo = incremental.preparar(etapa, deps, [p for p, medio in rutas if intermedios or not medio])
+
+    previas = incremental.firmas(etapa)
+    offset = int(previas.get("_offset", 0))
+    tam = os.path.getsize(raw_path)
+    if offset and (tam < offset or previas.get("_cola") != _cola(raw_path, offset)):
+        incremental.olvidar_etapa(etapa)
+        completo, previas, offset = True, {}, 0
+
+    print(f"🔵 Equipos: {tam - offset} bytes nuevos en {raw_path}{' (completo)' if completo else ''}")
+    if tam == offset:
+        return
+
+    with open(raw_path, "rb") as f:
+        f.seek(offset)
+        tail = pd.read_csv(f, header=None, dtype=str, names=range(7))
+
+    normalizar_team_stats.anadir_equipos_de_fixtures(pd.read_csv(normalizar_team_stats.FIXTURES_FILE))
+    fbref = normalizar_team_stats.normalizar(tail)
+    stats = generar_ids_para_todos.stats_con_id(fbref)
+    team_stats = Limpiar_Team_Stats_Final.limpiar(Equipo_Estadisticas_Final.team_stats_final(stats, equipos))
+    por_lado, _ = SepararDatosEquipoPartido.separar_por_lado(team_stats, stats=SepararDatosEquipoPartido.NOMBRES)
+
+    # Partidos ya vistos que se han vuelto a scrapear: fuera las filas viejas
+    repetidos = [m for m in fbref["match_id"].dropna().unique() if m in previas]
+    quitar = _ids_de(repetidos)
+    _fusionar([
+        (normalizar_team_stats.OUTPUT, fbref, "match_id", set(repetidos), {}, True),
+        (generar_ids_para_todos.OUT_STATS, stats, "id", quitar, {}, True),
+        (Limpiar_Team_Stats_Final.FILE, team_stats, "id", quitar, {}, False),
+        (SepararDatosEquipoPartido.OUTFILE, por_lado, "match_id", quitar, {"encoding": "utf-8"}, False),
+    ], intermedios, completo)
+
+    vistos = {m: tam for m in fbref["match_id"].dropna().unique()}
+    incremental.confirmar(etapa, {**vistos, **deps, "_offset": tam, "_cola": _cola(raw_path, tam)})
+
+
+def _cola(path, offset, n=4096):
+    """Hash de los `n` bytes anteriores a `offset` (detecta reescrituras)."""
+    with open(path, "rb") as f:
+        f.seek(max(0, offset - n))
+        return hashlib.blake2b(f.read(offset - f.tell()), digest_size=16).hexdigest()
+
+
+def _cadena_partidos(equipos, intermedios):
+    etapa = "partidos"
+    deps = {"_equipos": hash_fichero(generar_ids_equipos.INPUT), "_intermedios": intermedios}
+    rutas = [(generar_ids_para_todos.OUT_PARTIDOS, True), (Partidos_Final.OUT, False)]
+    completo = incremental.preparar(etapa, deps, [p for p, medio in rutas if intermedios or not medio])
+
+    fixtures = generar_ids_para_todos.leer_fixtures()
+    actuales = incremental.hash_filas(fixtures, "match_id")
+    nuevos, cambiados, borrados = incremental.cambios(etapa, actuales)
+    print(f"🟠 Partidos: {len(nuevos)} nuevos, {len(cambiados)} cambiados, {len(borrados)} borrados"
+          f"{' (completo)' if completo else ''}")
+    if not (nuevos or cambiados or borrados):
+        return
+
+    claves = fixtures["match_id"].astype("string").fillna("")
+    partidos = generar_ids_para_todos.partidos_con_id(fixtures[claves.isin(nuevos + cambiados)])
+    final = Partidos_Final.partidos_final(partidos, equipos)
+
+    quitar = _ids_de(cambiados + borrados)
+    if "" in cambiados + borrados:
+        quitar.add("")  # filas sin match_id: van siempre juntas
+    _fusionar([
+        (generar_ids_para_todos.OUT_PARTIDOS, partidos, "id", quitar, {}, True),
+        (Partidos_Final.OUT, final, "id", quitar, {"encoding": "utf-8-sig"}, False),
+    ], intermedios, completo)
+
+    incremental.confirmar(etapa, {**{m: actuales[m] for m in nuevos + cambiados}, **deps}, borrados)
+
+
+def ejecutar_incremental(intermedios=False):
+    """Como ejecutar(), pero solo con los partidos nuevos o cambiados."""
+    t0 = time.monotonic()
+
+    # Catálogos: pequeños, siempre enteros
+    equipos = generar_ids_equipos.equipos_con_id(pd.read_csv(generar_ids_equipos.INPUT))
+    jugadores = generar_ids_jugadores.jugadores_con_id(pd.read_csv(generar_ids_jugadores.INPUT))
+    _guardar(equipos, generar_ids_equipos.OUTPUT, encoding="utf-8-sig")
+    _guardar(generar_ids_para_todos.jugadores_con_team_id(jugadores), generar_ids_para_todos.OUT_JUGADORES)
+    if intermedios:
+        _guardar(jugadores, generar_ids_jugadores.OUTPUT, encoding="utf-8-sig")
+
+    # Equipos de cada partido para el player_id (todos los fixtures, es barato)
+    partidos = generar_ids_para_todos.partidos_con_id(generar_ids_para_todos.leer_fixtures())
+    _cadena_jugadores(jugadores, partidos, intermedios)
+    _cadena_equipos(equipos, intermedios)
+    _cadena_partidos(equipos, intermedios)
+
+    print(f"✔ Pipeline incremental completado ({time.monotonic() - t0:.1f}s)")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Pipeline completo en un solo proceso")
+    ap.add_argument("--intermedios", action="store_true", help="escribe también los CSV intermedios")
+    ap.add_argument("--incremental", action="store_true", help="solo partidos nuevos/cambiados (checkpoints)")
+    args = ap.parse_args()
+    if args.incremental:
+        ejecutar_incremental(args.intermedios)
+    else:
+        ejecutar(args.intermedios)
+
+
+if __name__ == "__main__":
+    main()
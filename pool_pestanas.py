@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Pool de pestañas sobre el Chrome con depurador (127.0.0.1:9222)
+- N workers, cada uno con su propio chromedriver enganchado a la MISMA
+  sesión (cookies / CAPTCHA ya pasados) y su propia pestaña.
+- Cola compartida de URLs de partidos.
+- Ritmo GLOBAL con ritmo.LimitadorAdaptativo (token bucket compartido por
+  todas las pestañas, con backoff ante 429 / desafíos).
+- Cada pestaña espera a que estén las tablas pedidas (no sleeps fijos).
+Mientras una pestaña carga, el hilo principal ya está parseando otra.
+"""
+
+import queue
+import threading
+
+import ritmo
+from fbref_comun import conectar_chrome
+
+# ============================
+# CONFIG
+# ============================
+N_PESTANAS = 3
+
+WAIT_PARTIDO_SEC = 20
+MAX_BLOQUEOS_POR_PARTIDO = 3
+
+_FIN = None
+
+
+# ============================
+# WORKER (una pestaña)
+# ============================
+
+def _worker(n, urls, resultados, limitador, marcadores):
+    try:
+        driver = conectar_chrome()
+        driver.switch_to.new_window("tab")
+    except Exception as e:
+        print(f"   ❌ Pestaña {n}: no se pudo abrir ({e})")
+        resultados.put(_FIN)
+        return
+
+    try:
+        while True:
+            url = urls.get()
+            if url is _FIN:
+                break
+
+            html = ritmo.navegar(driver, url, limitador, marcadores(url),
+                                 WAIT_PARTIDO_SEC, MAX_BLOQUEOS_POR_PARTIDO)
+            resultados.put((url, html))
+    finally:
+        try:
+            driver.close()   # cierra SOLO esta pestaña
+        except Exception:
+            pass
+        resultados.put(_FIN)
+
+
+# ============================
+# API
+# ============================
+
+def descargar(urls, marcadores=lambda url: (), n_pestanas=N_PESTANAS, limitador=None):
+    """
+    Genera (url, html) en el orden en que terminan las pestañas.
+    html es None si la navegación falló. `marcadores(url)` da los regex
+    de las tablas que deben estar en la página antes de entregarla.
+    Si se caen todas las pestañas (p.ej. ninguna se pudo abrir) con URLs
+    aún en la cola, RuntimeError con esas URLs en .sin_descargar (siguen
+    pendientes para la próxima pasada).
+    """
+    urls = list(urls)
+    n_pestanas = max(1, min(n_pestanas, len(urls)))
+    if not urls:
+        return
+
+    cola = queue.Queue()
+    for u in urls:
+        cola.put(u)
+    for _ in range(n_pestanas):
+        cola.put(_FIN)
+
+    resultados = queue.Queue()
+    if limitador is None:
+        limitador = ritmo.LimitadorAdaptativo()
+
+    hilos = [
+        threading.Thread(target=_worker, args=(n, cola, resultados, limitador, marcadores), daemon=True)
+        for n in range(1, n_pestanas + 1)
+    ]
+    for h in hilos:
+        h.start()
+
+    vivos = len(hilos)
+    while vivos:
+        item = resultados.get()
+        if item is _FIN:
+            vivos -= 1
+            continue
+        yield item
+
+    # Sin pestañas vivas: lo que quede en la cola no lo va a descargar nadie
+    sin_descargar = []
+    while not cola.empty():
+        u = cola.get_nowait()
+        if u is not _FIN:
+            sin_descargar.append(u)
+    if sin_descargar:
+        error = RuntimeError(
+            f"Ninguna pestaña sigue abierta: {len(sin_descargar)} partidos sin descargar (siguen pendientes)"
+        )
+        error.sin_descargar = sin_descargar
+        raise error
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+Recuperación de escrituras a medias en los ficheros crudos
+Si el script (o Chrome) muere en mitad de un volcado, el CSV puede
+acabar con una fila cortada o con un partido a medias. En lugar de
+borrarlo todo y volver a scrapear:
+- Se lee SOLO la cola del fichero (TAIL_BYTES, ampliando si hace falta)
+  y se busca hacia atrás el último bloque de partido completo, usando
+  la columna match_url como frontera y el índice SQLite como referencia
+  (partido 'ok' con su nº de filas).
+- Se trunca lo que venga detrás y se quitan del índice SOLO esos
+  partidos, que así vuelven a la cola de pendientes.
+- En el almacén Parquet (jugadores_raw/) se borran .tmp y particiones
+  que no llegaron al manifiesto, y entradas cuyo fichero no existe.
+
+Los scrapers lo ejecutan al arrancar; también a mano:
+    python recuperar_raw.py
+"""
+
+import os
+import csv
+
+import pyarrow.parquet as pq
+
+import indice_partidos
+
+# ============================
+# CONFIG
+# ============================
+TAIL_BYTES = 1 << 20   # 1 MB (se multiplica por 4 si no basta)
+
+
+# ============================
+# CSV (append-only)
+# ============================
+
+def _indice_match_url(path, filas_cabecera):
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        for _, fila in zip(range(filas_cabecera), csv.reader(f)):
+            if "match_url" in fila:
+                return fila.index("match_url")
+    return None
+
+
+def _lineas(datos, base):
+    """[(offset, bytes_linea)] de un trozo que empieza en inicio de línea."""
+    out, pos = [], 0
+    while pos < len(datos):
+        fin = datos.find(b"\n", pos)
+        fin = len(datos) if fin < 0 else fin + 1
+        out.append((base + pos, datos[pos:fin]))
+        pos = fin
+    return out
+
+
+def _url(linea, col):
+    try:
+        fila = next(csv.reader([linea.decode("utf-8", "replace").rstrip("\r\n")]))
+        return fila[col] if col < len(fila) else None
+    except (csv.Error, StopIteration):
+        return None
+
+
+def _punto_de_corte(path, col, filas_cabecera, ok, en_curso):
+    """
+    (offset donde truncar, {urls afectadas}). Recorre la cola hacia atrás
+    hasta encontrar un bloque 'ok' completo. Con ok=None (índice aún sin
+    migrar) solo se quita la fila cortada.
+    """
+    size = os.path.getsize(path)
+    tam = TAIL_BYTES
+
+    while True:
+        inicio = max(0, size - tam)
+        with open(path, "rb") as f:
+            f.seek(inicio)
+            datos = f.read()
+
+        if inicio > 0:
+            salto = datos.find(b"\n") + 1      # primera línea incompleta
+            lineas = _lineas(datos[salto:], inicio + salto) if salto else []
+        else:
+            lineas = _lineas(datos, 0)[filas_cabecera:]
+
+        corte, afectados = size, set()
+
+        # Fila cortada al final (sin salto de línea)
+        if lineas and not lineas[-1][1].endswith(b"\n"):
+            off, linea = lineas.pop()
+            afectados.add(_url(linea, col))
+            corte = off
+
+        if ok is None:
+            return corte, afectados - {None}
+
+        # Filas de partidos no confirmados en el índice
+        while lineas:
+            url = _url(lineas[-1][1], col)
+            if url in ok and url not in en_curso:
+                break
+            afectados.add(url)
+            corte = lineas.pop()[0]
+
+        if lineas:
+            # Último bloque confirmado: ¿está entero?
+            url = _url(lineas[-1][1], col)
+            n = 0
+            while n < len(lineas) and _url(lineas[-1 - n][1], col) == url:
+                n += 1
+            bloque_visto = n < len(lineas) or inicio == 0
+            if bloque_visto:
+                if n < ok[url]:
+                    afectados.add(url)
+                    corte = lineas[-n][0]
+                return corte, afectados - {None}
+
+        if inicio == 0:
+            return corte, afectados - {None}
+        tam *= 4
+
+
+def recuperar_csv(path, scraper, filas_cabecera=1):
+    """Trunca la cola rota de un CSV crudo. Devuelve las URLs re-encoladas."""
+    tmp = path + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)   # reescritura que no llegó a renombrarse
+
+    if not (os.path.exists(path) and os.path.getsize(path) > 0):
+        return set()
+
+    col = _indice_match_url(path, filas_cabecera)
+    if col is None:
+        print(f"⚠️  {path}: sin columna match_url, no se puede revisar")
+        return set()
+
+    ok = None if indice_partidos.vacio(scraper) else indice_partidos.filas_procesadas(scraper)
+    en_curso = set(indice_partidos.en_curso(scraper))
+    corte, afectados = _punto_de_corte(path, col, filas_cabecera, ok, en_curso)
+
+    if corte < os.path.getsize(path):
+        print(f"🩹 {path}: cola incompleta, se truncan {os.path.getsize(path) - corte} bytes")
+        with open(path, "r+b") as f:
+            f.truncate(corte)
+
+    for url in afectados | en_curso:
+        indice_partidos.olvidar(scraper, url)
+    if afectados:
+        print(f"   ↩ Partidos que se volverán a descargar: {len(afectados)}")
+    return afectados
+
+
+# ============================
+# ALMACÉN PARQUET
+# ============================
+
+def recuperar_almacen(almacen, scraper):
+    """Limpia particiones sin manifiesto / manifiesto sin partición."""
+    if not os.path.isdir(almacen.directorio):
+        return set()
+
+    particiones = almacen.manifest["particiones"]
+    en_manifest = {info["fichero"] for info in particiones.values()}
+    afectados = set()
+
+    for nombre in os.listdir(almacen.directorio):
+        path = os.path.join(almacen.directorio, nombre)
+        if nombre.endswith(".tmp"):
+            os.remove(path)
+        elif nombre.endswith(".parquet") and nombre not in en_manifest:
+            # Lote escrito pero sin llegar al manifiesto
+            try:
+                urls = pq.read_table(path, columns=["match_url"]).column(0).unique().to_pylist()
+                afectados.update(urls)
+            except Exception:
+                pass
+            os.remove(path)
+
+    for match_id, info in list(particiones.items()):
+        if not os.path.exists(os.path.join(almacen.directorio, info["fichero"])):
+            afectados.add(info["match_url"])
+            del particiones[match_id]
+    if afectados:
+        almacen._guardar_manifest()
+
+    for url in afectados | set(indice_partidos.en_curso(scraper)):
+        indice_partidos.olvidar(scraper, url)
+    if afectados:
+        print(f"🩹 {almacen.directorio}/: {len(afectados)} partidos incompletos se volverán a descargar")
+    return afectados
+
+
+# ============================
+# A MANO
+# ============================
+
+def main():
+    import estadisticas_jugadores_partidos as jugadores
+    import laliga_estadisticas_partidos as equipos
+    import estadisticas_porteros_partidos as porteros
+    from almacen_raw import AlmacenParquet
+
+    print("🔎 Revisando ficheros crudos...")
+    almacen = AlmacenParquet(jugadores.RAW_DIR)
+    recuperar_almacen(almacen, jugadores.NOMBRE)
+    if almacen.vacio():
+        # CSV antiguo aún sin migrar
+        recuperar_csv(jugadores.RAW_CSV_ANTIGUO, jugadores.NOMBRE, filas_cabecera=2)
+    recuperar_csv(equipos.RAW_FILE, equipos.NOMBRE)
+    recuperar_csv(porteros.GK_FILE, porteros.NOMBRE)
+    print("✔ Revisión terminada")
+
+
+if __name__ == "__main__":
+    main()
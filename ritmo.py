@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+Control de ritmo para los scrapers FBref
+- LimitadorAdaptativo: token bucket compartido por todas las pestañas.
+  Si FBref devuelve 429 o una página de desafío, se para un tiempo
+  (backoff exponencial) y se reduce la tasa a la mitad; con cada página
+  buena la tasa vuelve a subir poco a poco hasta TASA_MAX.
+- esperar_marcadores: en lugar de time.sleep fijos, espera a que estén
+  en el DOM (o en sus comentarios) las tablas que vamos a extraer.
+"""
+
+import re
+import time
+import threading
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+# ============================
+# CONFIG
+# ============================
+TASA_MAX = 1 / 3          # peticiones por segundo (una cada 3 s)
+TASA_MIN = 1 / 30
+CAPACIDAD = 2             # ráfaga máxima
+INCREMENTO_TASA = 0.02    # recuperación por página correcta
+
+BACKOFF_BASE_SEC = 30
+BACKOFF_MAX_SEC = 15 * 60
+
+POLL_SEC = 0.25
+
+# Títulos / textos de FBref (429) y Cloudflare
+_RE_BLOQUEO = re.compile(
+    r"Rate Limited Request|429 error|Too Many Requests|Just a moment\.\.\.|"
+    r"Attention Required! \| Cloudflare|cf-challenge|challenge-platform",
+    re.IGNORECASE,
+)
+
+
+# ============================
+# TOKEN BUCKET ADAPTATIVO
+# ============================
+
+class LimitadorAdaptativo:
+    """Token bucket con backoff; seguro entre hilos."""
+
+    def __init__(self, tasa_max=TASA_MAX, capacidad=CAPACIDAD):
+        self.tasa_max = tasa_max
+        self.tasa = tasa_max
+        self.capacidad = capacidad
+        self._tokens = 1.0
+        self._ultimo = time.monotonic()
+        self._bloqueado_hasta = 0.0
+        self._penalizaciones = 0
+        self._lock = threading.Lock()
+
+    def _rellenar(self, ahora):
+        self._tokens = min(self.capacidad, self._tokens + (ahora - self._ultimo) * self.tasa)
+        self._ultimo = ahora
+
+    def esperar(self):
+        """Bloquea hasta que se pueda lanzar la siguiente petición."""
+        while True:
+            with self._lock:
+                ahora = time.monotonic()
+                self._rellenar(ahora)
+                if ahora < self._bloqueado_hasta:
+                    espera = self._bloqueado_hasta - ahora
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                else:
+                    espera = (1 - self._tokens) / self.tasa
+            time.sleep(espera)
+
+    def penalizar(self):
+        """429 / desafío: pausa global + tasa a la mitad. Devuelve la pausa."""
+        with self._lock:
+            self._penalizaciones += 1
+            pausa = min(BACKOFF_BASE_SEC * 2 ** (self._penalizaciones - 1), BACKOFF_MAX_SEC)
+            ahora = time.monotonic()
+            self._bloqueado_hasta = max(self._bloqueado_hasta, ahora + pausa)
+            self.tasa = max(TASA_MIN, self.tasa / 2)
+            self._tokens = 0.0
+            self._ultimo = ahora
+        print(f"   🛑 FBref frena (429/desafío): pausa {pausa:.0f}s, tasa {self.tasa * 60:.1f}/min")
+        return pausa
+
+    def exito(self):
+        with self._lock:
+            self._penalizaciones = 0
+            self.tasa = min(self.tasa_max, self.tasa + INCREMENTO_TASA)
+
+
+# ============================
+# DETECCIÓN DE BLOQUEO
+# ============================
+
+def es_bloqueo_html(html: str) -> bool:
+    """¿Es una página de 429 / desafío en vez de la página pedida?"""
+    return bool(_RE_BLOQUEO.search((html or "")[:20000]))
+
+
+def es_bloqueo(driver) -> bool:
+    try:
+        return bool(_RE_BLOQUEO.search(driver.title or ""))
+    except Exception:
+        return False
+
+
+# ============================
+# ESPERA POR TABLAS
+# ============================
+
+_JS_MARCADORES = """
+var h = document.documentElement.outerHTML;
+return arguments[0].every(function (p) { return new RegExp(p).test(h); });
+"""
+
+
+def esperar_marcadores(driver, patrones, timeout):
+    """
+    Espera (sondeando cada POLL_SEC) a que el HTML contenga todos los
+    `patrones` (regex, p.ej. 'id="keeper_stats_[0-9a-f]{8}"').
+    Devuelve False si se agota el tiempo.
+    """
+    patrones = list(patrones)
+    if not patrones:
+        return True
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=POLL_SEC).until(
+            lambda d: d.execute_script(_JS_MARCADORES, patrones)
+        )
+        return True
+    except TimeoutException:
+        return False
+
+
+# ============================
+# NAVEGACIÓN CON RITMO
+# ============================
+
+def navegar(driver, url, limitador, patrones, timeout, max_bloqueos=3):
+    """
+    Carga `url` respetando el limitador, reintenta tras 429/desafío y
+    espera a las tablas. Devuelve page_source o None si no se pudo.
+    """
+    for _ in range(max_bloqueos):
+        limitador.esperar()
+        try:
+            driver.get(url)
+        except Exception as e:
+            print(f"   ❌ Error cargando {url}: {e}")
+            return None
+
+        if es_bloqueo(driver):
+            limitador.penalizar()
+            continue
+
+        if not esperar_marcadores(driver, patrones, timeout):
+            print(f"   ⏱  Tablas incompletas tras {timeout}s")
+        limitador.exito()
+        return driver.page_source
+
+    return None
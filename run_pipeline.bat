@@ -25,80 +25,27 @@ echo ============================================
 echo.
 
 REM ---------- CONFIGURAR RUTAS ----------
-set "PYTHON=C:\Users\RubenVillarGonzalez\Desktop\TFG\Escrapeo de datos\.venv\Scripts\python.exe"
-set "DIR=C:\Users\RubenVillarGonzalez\Desktop\TFG\Escrapeo de datos"
+REM Carpeta del propio .bat; Python del .venv si existe
+set "DIR=%~dp0"
+set "PYTHON=%DIR%.venv\Scripts\python.exe"
+if not exist "%PYTHON%" set "PYTHON=python"
 
 echo Usando Python: %PYTHON%
 echo Carpeta: %DIR%
 echo.
 
-set "FAIL_STEP="
-
-goto :main
-
-:run_step
-echo [%~1] Ejecutando %~2 ...
-"%PYTHON%" "%DIR%\%~2"
-if errorlevel 1 (
-  echo Error en "%~2"
-  set "FAIL_STEP=%~1 - %~2"
-  goto :end
-) else (
-  echo OK: %~2
-)
-echo ----------------------------------------
-echo.
-goto :eof
-
-
-:main
-REM =====================================================
-REM                     SCRAPING
-REM =====================================================
-
-call :run_step "1/16" "laliga_partidos.py"
-call :run_step "2/16" "laliga_estadisticas_partidos.py"
-call :run_step "3/16" "estadisticas_jugadores_partidos.py"
-call :run_step "4/16" "create_jugadores.py"
-
-REM =====================================================
-REM              NORMALIZACION INICIAL
-REM =====================================================
-
-REM -- jugadores_raw.csv ya existe tras el paso 4 --
-call :run_step "5/16" "generar_jugadores_raw_with_id.py"
-
-call :run_step "6/16" "normalizar_team_stats.py"
-call :run_step "7/16" "normalizar_jugadores.py"
-
-REM =====================================================
-REM                   GENERACION DE IDs
-REM =====================================================
-
-call :run_step "8/16" "generar_ids_para_todos.py"
-call :run_step "9/16" "generar_ids_equipos.py"
-call :run_step "10/16" "generar_ids_jugadores.py"
-
-REM =====================================================
-REM                ARCHIVOS FINALES (MAYUSCULAS)
-REM =====================================================
-
-call :run_step "11/16" "Equipo_Estadisticas_Final.py"
-call :run_step "12/16" "Jugador_Estadisticas_Final.py"
-call :run_step "13/16" "Partidos_Final.py"
-
 REM =====================================================
-REM                LIMPIEZA FINAL
+REM   ETAPAS, DEPENDENCIAS Y SALTO POR HASH: pipeline.py
+REM   Con --scraping, como antes: scraping + normalizacion, IDs y
+REM   finales. Sin scraping: python pipeline.py (sin Chrome)
 REM =====================================================
 
-call :run_step "14/16" "Limpiar_Team_Stats_Final.py"
-call :run_step "15/16" "Limpiar_Player_Stats_Final.py"
-call :run_step "16/16" "SepararDatosEquipoPartido.py"
+"%PYTHON%" "%DIR%pipeline.py" --scraping %*
+set "RC=%errorlevel%"
 
-:end
 echo ============================================
-if defined FAIL_STEP (
-  echo    PIPELINE FINALIZADO CON ERRORES EN: %FAIL_STEP%
+if not "%RC%"=="0" (
+  echo    PIPELINE FINALIZADO CON ERRORES ^(al relanzar se retoma desde el fallo^)
 ) else (
   echo    PIPELINE COMPLETADO CON EXITO
 )
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+Scraper UNIFICADO de partidos (FBref - LaLiga)
+Carga cada Match Report UNA sola vez y entrega el mismo HTML a los
+tres extractores, cada uno con su propio CSV de salida:
+  - jugadores  → jugadores_raw/ (Parquet, estadisticas_jugadores_partidos.py)
+  - equipos    → team_raw.csv        (laliga_estadisticas_partidos.py)
+  - porteros   → goalkeeper_raw.csv  (estadisticas_porteros_partidos.py)
+Un partido solo se visita si a algún extractor le falta.
+
+Los partidos se reparten entre varias pestañas del mismo Chrome
+(pool_pestanas.py) a un ritmo global adaptativo (ritmo.py).
+
+Con --backend http las páginas se piden sin navegador (cookies_fbref.txt)
+y solo se recurre a Chrome cuando FBref responde con un desafío.
+
+Todas las páginas descargadas se guardan en archivo_html/ (zstd).
+Con --replay se ejecutan los extractores desde ese archivo, sin navegador:
+    python scraper_partidos.py --replay
+(borra antes la salida que quieras regenerar por completo)
+"""
+
+import argparse
+
+import estadisticas_jugadores_partidos as jugadores
+import laliga_estadisticas_partidos as equipos
+import estadisticas_porteros_partidos as porteros
+import archivo_html
+import obtener_paginas
+import pool_pestanas
+import ritmo
+from fbref_comun import fecha_arg, filtrar_desde
+
+# ============================
+# CONFIG
+# ============================
+EXTRACTORES = {
+    "jugadores": jugadores,
+    "equipos": equipos,
+    "porteros": porteros,
+}
+
+
+# ============================
+# EXTRACCIÓN (mismo HTML para todos)
+# ============================
+
+def procesar_html(html, url, pendientes, procesados, totales):
+    """Pasa el HTML a cada extractor pendiente; devuelve los que fallaron."""
+    fallidos = []
+    for nombre in pendientes:
+        n = EXTRACTORES[nombre].procesar_partido(html, url)
+        if n:
+            totales[nombre] += n
+            procesados[nombre].add(url)
+        else:
+            fallidos.append(nombre)
+    return fallidos
+
+
+def pendientes_de(urls, procesados):
+    """{url: [extractores a los que les falta]} solo para URLs con algo pendiente."""
+    pendientes_por_url = {
+        url: [n for n in EXTRACTORES if url not in procesados[n]]
+        for url in urls
+    }
+    return {u: p for u, p in pendientes_por_url.items() if p}
+
+
+# ============================
+# MODO REPLAY (sin navegador)
+# ============================
+
+def replay(procesados, totales, desde=None):
+    # Solo el índice: cada HTML se descomprime cuando le toca (uno en memoria)
+    partidos = archivo_html.partidos_archivados()
+    pendientes_por_url = pendientes_de(filtrar_desde(partidos, desde), procesados)
+
+    print(f"📦 Partidos en el archivo: {len(partidos)}")
+    print(f"🆕 Partidos con algún extractor pendiente: {len(pendientes_por_url)}")
+
+    for i, (url, pendientes) in enumerate(pendientes_por_url.items(), 1):
+        print(f"\n({i}/{len(pendientes_por_url)}) {url}  [{', '.join(pendientes)}]")
+        html = archivo_html.cargar_digest(partidos[url])
+        if html is None:
+            print("   ⚠️  Falta el HTML en el archivo (objeto borrado)")
+            continue
+        fallidos = procesar_html(html, url, pendientes, procesados, totales)
+        if fallidos:
+            print(f"   ❌ Sin datos para: {', '.join(fallidos)}")
+
+
+# ============================
+# MODO NAVEGADOR
+# ============================
+
+def marcadores_de(pendientes_por_url):
+    """Para el pool: regex de las tablas que necesita cada partido pendiente."""
+    def marcadores(url):
+        return [EXTRACTORES[n].MARCADOR for n in pendientes_por_url.get(url, ())]
+    return marcadores
+
+
+def descargar_http(obtenedor, pendientes_por_url):
+    """Backend HTTP: una página tras otra (con fallback a Selenium)."""
+    marcadores = marcadores_de(pendientes_por_url)
+    for url in pendientes_por_url:
+        yield url, obtenedor.pagina(url, marcadores(url), pool_pestanas.WAIT_PARTIDO_SEC)
+
+
+def scrapear(procesados, totales, n_pestanas=pool_pestanas.N_PESTANAS, desde=None,
+             backend="selenium"):
+    limitador = ritmo.LimitadorAdaptativo()
+    obtenedor = obtener_paginas.crear(backend, limitador)
+    match_urls = obtenedor.match_urls()
+
+    pendientes_por_url = pendientes_de(filtrar_desde(match_urls, desde), procesados)
+
+    print(f"➡️  Partidos con Match Report: {len(match_urls)}")
+    print(f"🆕 Partidos con algún extractor pendiente: {len(pendientes_por_url)}")
+    if backend == "http":
+        print("🌐 Backend HTTP (cookies_fbref.txt, fallback a Selenium)")
+    else:
+        print(f"🗂  Pestañas en paralelo: {n_pestanas}")
+    print("------------------------------------------------------------")
+
+    if backend == "http":
+        descargas = descargar_http(obtenedor, pendientes_por_url)
+    else:
+        # Un driver.get() por partido, repartidos entre las pestañas del pool
+        descargas = pool_pestanas.descargar(
+            pendientes_por_url,
+            marcadores=marcadores_de(pendientes_por_url),
+            n_pestanas=n_pestanas,
+            limitador=limitador,
+        )
+    for i, (url, html) in enumerate(descargas, 1):
+        pendientes = pendientes_por_url[url]
+        print(f"\n({i}/{len(pendientes_por_url)}) {url}  [{', '.join(pendientes)}]")
+
+        if html is None:
+            continue
+
+        archivo_html.guardar(url, html)
+
+        fallidos = procesar_html(html, url, pendientes, procesados, totales)
+        if fallidos:
+            print(f"   ❌ Sin datos para: {', '.join(fallidos)}")
+
+
+# ============================
+# PROCESO PRINCIPAL
+# ============================
+
+def main():
+    parser = argparse.ArgumentParser(description="Scraper unificado de partidos FBref")
+    parser.add_argument("--replay", action="store_true",
+                        help="procesar desde archivo_html/ sin abrir el navegador")
+    parser.add_argument("--pestanas", type=int, default=pool_pestanas.N_PESTANAS,
+                        help="pestañas de Chrome trabajando en paralelo")
+    parser.add_argument("--desde", "--since", type=fecha_arg, default=None,
+                        help="solo partidos con fecha >= YYYY-MM-DD")
+    parser.add_argument("--backend", choices=obtener_paginas.BACKENDS, default="selenium",
+                        help="selenium (pool de pestañas) o http (cookies_fbref.txt, con fallback a Selenium)")
+    args = parser.parse_args()
+
+    print("🚀 Scraper unificado de partidos iniciado...")
+
+    # URLs ya procesadas por cada extractor
+    procesados = {nombre: ext.cargar_procesados() for nombre, ext in EXTRACTORES.items()}
+    totales = {nombre: 0 for nombre in EXTRACTORES}
+
+    try:
+        if args.replay:
+            replay(procesados, totales, args.desde)
+        else:
+            scrapear(procesados, totales, args.pestanas, args.desde, args.backend)
+    finally:
+        # Los extractores escriben por lotes: volcar lo que quede en memoria
+        for ext in EXTRACTORES.values():
+            ext.volcar_pendientes()
+
+    print("\n🎉 Terminado. Filas añadidas:")
+    for nombre, total in totales.items():
+        print(f"   {nombre}: {total}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+Servicio de IDs (partidos, jugadores, equipos)
+Un solo sitio para los IDs que antes se calculaban fila a fila con
+.apply() en cada script:
+  partido → int(match_id, 16): el hash de 8 hex de la URL de FBref
+            (.../matches/12c8079e/...), entero de 32 bits
+  jugador → "PLY-"  + md5(nombre)[:10].upper()
+  equipo  → "TEAM-" + md5(nombre)[:8].upper()
+Jugadores y equipos usan el md5 de siempre: sus IDs no cambian. El de
+partido sale del propio FBref, sin normalizar nombres ni fechas.
+
+- Cada clave DISTINTA se calcula una vez (pd.factorize) y el resultado
+  se reparte a las filas con los códigos: coste lineal en filas + un md5
+  por clave única.
+- Tabla memo persistente (ids_memo.sqlite): una clave ya vista se
+  resuelve desde ahí y no se vuelve a calcular; además fija el ID de
+  esa clave aunque algún día cambie el algoritmo.
+"""
+
+import sqlite3
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+# ============================
+# CONFIG
+# ============================
+MEMO_FILE = "ids_memo.sqlite"
+# Varias etapas del pipeline escriben el memo a la vez (pipeline.py):
+# WAL + espera del bloqueo en vez de fallar con "database is locked"
+TIMEOUT_SEG = 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ids (
+    tipo  TEXT NOT NULL,
+    clave TEXT NOT NULL,
+    id    NOT NULL,
+    PRIMARY KEY (tipo, clave)
+)
+"""
+
+_MATCH_ID_RE = r"^[0-9a-f]{8}$"
+
+_conexiones = {}
+_memos = {}
+
+
+# ============================
+# ALGORITMOS (una clave)
+# ============================
+
+def _md5(clave: str) -> str:
+    return hashlib.md5(clave.encode("utf-8")).hexdigest()
+
+
+def id_de_partido(match_id: str) -> int:
+    """'12c8079e' → 315099038."""
+    return int(match_id, 16)
+
+
+def id_de_jugador(nombre: str) -> str:
+    return f"PLY-{_md5(nombre)[:10].upper()}"
+
+
+def id_de_equipo(nombre: str) -> str:
+    return f"TEAM-{_md5(nombre)[:8].upper()}"
+
+
+# ============================
+# MEMO (SQLite)
+# ============================
+
+def _conexion(path=MEMO_FILE):
+    con = _conexiones.get(path)
+    if con is None:
+        con = sqlite3.connect(path, timeout=TIMEOUT_SEG)
+        con.execute("PRAGMA journal_mode = WAL")
+        con.execute("PRAGMA synchronous = NORMAL")
+        con.execute(_SCHEMA)
+        con.commit()
+        _conexiones[path] = con
+    return con
+
+
+def _memo(tipo: str, path=MEMO_FILE) -> dict:
+    """{clave: id} de ese tipo (se lee de disco una vez por proceso)."""
+    memo = _memos.get((path, tipo))
+    if memo is None:
+        rows = _conexion(path).execute("SELECT clave, id FROM ids WHERE tipo = ?", (tipo,))
+        memo = _memos[(path, tipo)] = dict(rows)
+    return memo
+
+
+def _asignar(tipo: str, claves: pd.Series, calcular, path=MEMO_FILE) -> np.ndarray:
+    """
+    ID de cada fila de `claves` (NaN/None → None). Solo se calculan las
+    claves únicas que no estén ya en el memo; las nuevas se guardan.
+    """
+    codigos, unicos = pd.factorize(claves, use_na_sentinel=True)
+    memo = _memo(tipo, path)
+
+    nuevos = {k: calcular(k) for k in unicos if k not in memo}
+    if nuevos:
+        con = _conexion(path)
+        with con:
+            con.executemany(
+                "INSERT OR IGNORE INTO ids VALUES (?, ?, ?)",
+                [(tipo, k, v) for k, v in nuevos.items()],
+            )
+        memo.update(nuevos)
+
+    # posición extra para las claves nulas (código -1)
+    valores = np.empty(len(unicos) + 1, dtype=object)
+    valores[:-1] = [memo[k] for k in unicos]
+    valores[-1] = None
+    return valores[codigos]
+
+
+# ============================
+# VECTORIZADO
+# ============================
+
+def ids_partidos(match_ids, path=MEMO_FILE) -> pd.Series:
+    """
+    ID de partido por fila a partir del match_id de FBref (Int64; nulo si
+    no es un hash de 8 hex). Ver urls_partido.hashes_partido().
+    """
+    match_ids = pd.Series(match_ids).astype("string")
+    claves = match_ids.where(match_ids.str.match(_MATCH_ID_RE).fillna(False).astype(bool))
+    return pd.Series(_asignar("partido", claves, id_de_partido, path), index=match_ids.index, dtype="Int64")
+
+
+def ids_jugadores(nombres, path=MEMO_FILE) -> pd.Series:
+    nombres = pd.Series(nombres)
+    return pd.Series(_asignar("jugador", nombres, id_de_jugador, path), index=nombres.index)
+
+
+def ids_equipos(nombres, path=MEMO_FILE) -> pd.Series:
+    nombres = pd.Series(nombres)
+    return pd.Series(_asignar("equipo", nombres, id_de_equipo, path), index=nombres.index)
@@ -0,0 +1,97 @@
+"""Unittests for almacen_raw.AlmacenParquet."""
+
+import json
+
+import pandas as pd
+import pytest
+
+from almacen_raw import AlmacenParquet
+
+
+def _url(n):
+    return f"https://fbref.com/en/matches/{n:08x}/Girona-Sevilla-August-15-2025-La-Liga"
+
+
+@pytest.fixture
+def almacen(tmp_path):
+    return AlmacenParquet(str(tmp_path / "jugadores_raw"))
+
+
+def test_esquema_se_ensancha(almacen):
+    almacen.escribir_partido(_url(1), pd.DataFrame({"Player": ["A", "B"], "Gls": [1, 0]}))
+    assert dict(almacen.manifest["esquema"]) == {"Player": "string", "Gls": "int64"}
+
+    # int64 -> double, new column appended at the end, int64 -> string
+    almacen.escribir_partido(_url(2), pd.DataFrame({
+        "Player": ["C"], "Gls": [0.5], "xG": [0.3],
+    }))
+    almacen.escribir_partido(_url(3), pd.DataFrame({"Player": ["D"], "Min": [90]}))
+    almacen.escribir_partido(_url(4), pd.DataFrame({"Player": ["E"], "Min": ["90+"]}))
+
+    assert almacen.esquema().names == ["Player", "Gls", "xG", "Min"]
+    assert dict(almacen.manifest["esquema"]) == {
+        "Player": "string", "Gls": "double", "xG": "double", "Min": "string",
+    }
+
+    # Partitions written before the widening are read with the canonical types
+    df = almacen.leer()
+    assert list(df.columns) == ["Player", "Gls", "xG", "Min"]
+    assert df["Player"].tolist() == ["A", "B", "C", "D", "E"]
+    assert df["Gls"].tolist()[:3] == [1.0, 0.0, 0.5]
+    assert df["xG"].isna().tolist() == [True, True, False, True, True]
+    assert df["Min"].tolist()[3:] == ["90", "90+"]
+
+
+def test_manifiesto_persistido(almacen):
+    almacen.escribir_partido(_url(1), pd.DataFrame({"Player": ["A"], "Gls": [1.0]}))
+    otro = AlmacenParquet(almacen.directorio)
+    assert otro.manifest == almacen.manifest
+    assert otro.match_urls() == {_url(1): 1}
+
+
+def test_leer_por_lotes(almacen):
+    for n in range(1, 6):
+        df = pd.DataFrame({"Player": [f"P{n}"] * n, "Gls": list(range(n))})
+        if n == 5:
+            df["xG"] = 0.1
+        almacen.escribir_partido(_url(n), df)
+
+    lotes = list(almacen.leer_por_lotes(partidos=2))
+    assert [len(lote) for lote in lotes] == [1 + 2, 3 + 4, 5]
+    # Every batch comes with the canonical columns, even before xG existed
+    assert all(list(lote.columns) == ["Player", "Gls", "xG"] for lote in lotes)
+
+    # Column and partition selection (unknown ids are ignored)
+    ids = [f"{3:08x}", f"{1:08x}", "ffffffff"]
+    lotes = list(almacen.leer_por_lotes(["Gls"], partidos=1, match_ids=ids))
+    assert [lote.columns.tolist() for lote in lotes] == [["Gls"], ["Gls"]]
+    assert [lote["Gls"].tolist() for lote in lotes] == [[0, 1, 2], [0]]
+
+
+def test_leer_por_lotes_vacio(almacen):
+    assert list(almacen.leer_por_lotes()) == []
+    assert almacen.leer().empty
+
+
+def test_decimales(almacen):
+    almacen.escribir_partido(_url(1), pd.DataFrame({"Gls": [1.0, None], "xG": [1.0, 2.0]}))
+    almacen.escribir_partido(_url(2), pd.DataFrame({"Gls": [2.0], "xG": [0.4]}))
+    assert almacen.decimales() == {"xG"}
+
+    # Manifest from before "decimales" existed: filled in from the files once
+    for info in almacen.manifest["particiones"].values():
+        del info["decimales"]
+    almacen._guardar_manifest()
+    viejo = AlmacenParquet(almacen.directorio)
+    assert viejo.decimales() == {"xG"}
+    with open(viejo.path_manifest, encoding="utf-8") as f:
+        guardado = json.load(f)
+    assert all("decimales" in info for info in guardado["particiones"].values())
+
+
+def test_borrar_partido(almacen):
+    almacen.escribir_partido(_url(1), pd.DataFrame({"Gls": [1]}))
+    almacen.escribir_partido(_url(2), pd.DataFrame({"Gls": [2]}))
+    almacen.borrar_partido(_url(1))
+    assert list(almacen.firmas()) == [f"{2:08x}"]
+    assert almacen.leer()["Gls"].tolist() == [2]
@@ -0,0 +1,76 @@
+"""Unittests for incremental (checkpoints and fusionar_csv)."""
+
+import pandas as pd
+import pytest
+
+import incremental
+
+
+@pytest.fixture
+def salida(tmp_path):
+    path = tmp_path / "SALIDA.csv"
+    pd.DataFrame({"id": [1, 2], "Gls": [0, 1]}).to_csv(path, index=False)
+    return path
+
+
+def _leer(path):
+    return pd.read_csv(path, dtype=str, keep_default_na=False)
+
+
+def test_fusionar_csv_nuevo(tmp_path):
+    path = tmp_path / "NO_EXISTE.csv"
+    delta = pd.DataFrame({"id": [1], "Gls": [3]})
+    assert incremental.fusionar_csv(str(path), delta, "id") == "nuevo"
+    pd.testing.assert_frame_equal(pd.read_csv(path), delta)
+
+
+def test_fusionar_csv_append(salida):
+    antes = salida.read_bytes()
+    modo = incremental.fusionar_csv(str(salida), pd.DataFrame({"Gls": [5], "id": [3]}), "id")
+    assert modo == "append"
+    # Nothing already written is touched; columns follow the file header
+    assert salida.read_bytes().startswith(antes)
+    assert _leer(salida).to_dict("list") == {"id": ["1", "2", "3"], "Gls": ["0", "1", "5"]}
+
+
+def test_fusionar_csv_reescribe_cambiados(salida):
+    delta = pd.DataFrame({"id": [2, 3], "Gls": [7, 5]})
+    assert incremental.fusionar_csv(str(salida), delta, "id", quitar={2}) == "reescrito"
+    assert _leer(salida).to_dict("list") == {"id": ["1", "2", "3"], "Gls": ["0", "7", "5"]}
+    assert not (salida.parent / (salida.name + ".tmp")).exists()
+
+
+def test_fusionar_csv_ids_que_pasaron_por_float(tmp_path):
+    # "2.0" in the file matches the id 2 to remove
+    path = tmp_path / "SALIDA.csv"
+    path.write_text("id,Gls\n1.0,0\n2.0,1\n,9\n", encoding="utf-8")
+    delta = pd.DataFrame({"id": [2], "Gls": [4]})
+    assert incremental.fusionar_csv(str(path), delta, "id", quitar={"2", ""}) == "reescrito"
+    assert _leer(path).to_dict("list") == {"id": ["1.0", "2"], "Gls": ["0", "4"]}
+
+
+def test_fusionar_csv_columna_nueva(salida):
+    delta = pd.DataFrame({"id": [3], "Gls": [5], "xG": [0.4]})
+    assert incremental.fusionar_csv(str(salida), delta, "id") == "reescrito"
+    assert _leer(salida).to_dict("list") == {
+        "id": ["1", "2", "3"], "Gls": ["0", "1", "5"], "xG": ["", "", "0.4"],
+    }
+
+
+def test_fusionar_csv_completo(salida):
+    delta = pd.DataFrame({"id": [9], "Gls": [9]})
+    assert incremental.fusionar_csv(str(salida), delta, "id", quitar={1}, completo=True) == "nuevo"
+    assert _leer(salida).to_dict("list") == {"id": ["9"], "Gls": ["9"]}
+
+
+def test_checkpoints(tmp_path):
+    bd = str(tmp_path / "checkpoints.sqlite")
+    assert incremental.cambios("jugadores", {"a": "1", "b": "1"}, bd) == (["a", "b"], [], [])
+
+    incremental.confirmar("jugadores", {"a": "1", "b": "1", "_catalogo": "x"}, path=bd)
+    assert incremental.cambios("jugadores", {"a": "2", "c": "1"}, bd) == (["c"], ["a"], ["b"])
+
+    # Same global deps and outputs present: delta run; catalogue changed: full
+    assert incremental.preparar("jugadores", {"_catalogo": "x"}, [], bd) is False
+    assert incremental.preparar("jugadores", {"_catalogo": "y"}, [], bd) is True
+    assert incremental.firmas("jugadores", bd) == {}
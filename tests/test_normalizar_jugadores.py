@@ -0,0 +1,59 @@
+"""Unittests for normalizar_jugadores (profile used by the incremental mode)."""
+
+import pandas as pd
+
+import normalizar_jugadores
+
+# jugadores_raw_with_id as read by the standalone script (dtype=str)
+RAW = pd.DataFrame({
+    "Player": ["Ana", "Bea", None, "Carla", "Dani"],
+    "Age": ["21-269", "30-001", None, "25-100", "19-050"],
+    "Gls": ["1", "0", None, "2", "0"],
+    "xG": [None, None, None, "0.4", "0.1"],
+    "Min": ["90", "45", None, "90+", "12"],
+    "Extra": [None, None, None, None, None],
+    "match_url": ["u1", "u1", "u1", "u2", "u2"],
+    "id": ["1", "1", None, "2", "2"],
+}, dtype=object)
+
+
+def _normalizar(df, perfil=None):
+    return normalizar_jugadores.normalizar(df.reset_index(drop=True), perfil)
+
+
+def test_perfilar():
+    perfil = normalizar_jugadores.perfilar(RAW)
+    assert perfil["con_datos"] == sorted(["Player", "Age", "Gls", "xG", "Min", "id"])
+    assert perfil["tipos"] == {"Gls": "entero", "xG": "decimal", "Min": "texto", "Extra": "entero"}
+
+
+def test_perfilar_por_partido_combinado():
+    por = normalizar_jugadores.perfilar(RAW, RAW["match_url"])
+    assert set(por) == {"u1", "u2"}
+    assert "xG" not in por["u1"]["con_datos"]
+    assert por["u1"]["tipos"]["Min"] == "entero"
+    assert normalizar_jugadores.combinar(por.values()) == normalizar_jugadores.perfilar(RAW)
+    # The stored signature must not depend on the order of the partitions
+    assert normalizar_jugadores.combinar([por["u2"], por["u1"]]) == normalizar_jugadores.perfilar(RAW)
+
+
+def test_normalizar_sin_perfil():
+    out = _normalizar(RAW)
+    assert list(out.columns) == ["Player", "Age", "Age_dias", "Gls", "xG", "Min", "id"]
+    assert len(out) == 4   # the all-empty row is dropped
+    assert str(out["Gls"].dtype) == "Int16"
+    assert str(out["xG"].dtype) == "Float32"
+    assert out["Min"].tolist() == ["90", "45", "90+", "12"]
+
+
+def test_normalizar_lote_con_perfil_global():
+    # The first match alone has no xG and an integer-only Min: with the
+    # global profile it comes out exactly as in the full run
+    completo = _normalizar(RAW)
+    perfil = normalizar_jugadores.perfilar(RAW)
+    lote = _normalizar(RAW[RAW["match_url"] == "u1"], perfil)
+    pd.testing.assert_frame_equal(lote, completo[completo["id"] == 1].reset_index(drop=True))
+
+    solo_lote = _normalizar(RAW[RAW["match_url"] == "u1"])
+    assert "xG" not in solo_lote.columns
+    assert str(solo_lote["Min"].dtype) == "Int16"
@@ -0,0 +1,90 @@
+"""Unittests for normalizar_team_stats.normalizar (columnar block parser)."""
+
+import io
+
+import pandas as pd
+
+import normalizar_team_stats
+
+URL_1 = "https://fbref.com/en/matches/12c8079e/Girona-Rayo-Vallecano-August-15-2025-La-Liga"
+URL_2 = "https://fbref.com/en/matches/094ea75e/Villarreal-Oviedo-August-15-2025-La-Liga"
+
+# Two blocks as the scraper appends them to team_raw.csv (header included)
+TEAM_RAW = f"""Girona,Rayo Vallecano,match_url,home_team,away_team,score,date
+Possession,Possession,,,,,
+44%,56%,{URL_1},,,,
+Shots on Target,Shots on Target,{URL_1},,,,
+2 of 7 — 29%,31% — 5 of 16,{URL_1},,,,
+Saves,Saves,{URL_1},,,,
+2 of 5 — 40%,50% — 1 of 2,{URL_1},,,,
+Cards,Cards,{URL_1},,,,
+,,{URL_1},,,,
+68%,32%,{URL_2},,,,
+Shots on Target,Shots on Target,{URL_2},,,,
+10 of 25 — 40%,80% — 4 of 5,{URL_2},,,,
+Saves,Saves,{URL_2},,,,
+3 of 4 — 75%,80% — 8 of 10,{URL_2},,,,
+Cards,Cards,{URL_2},,,,
+,,{URL_2},,,,
+"""
+
+
+def _raw(texto=TEAM_RAW):
+    return pd.read_csv(io.StringIO(texto), header=None, dtype=str)
+
+
+def test_normalizar():
+    out = normalizar_team_stats.normalizar(_raw())
+    esperado = pd.DataFrame({
+        "match_id": ["12c8079e", "094ea75e"],
+        "poss_home": [44, 68],
+        "poss_away": [56, 32],
+        "home_team": ["Girona", "Villarreal"],
+        "away_team": ["Rayo Vallecano", "Oviedo"],
+        "shots_ot_home": pd.array([2, 10], dtype="Int64"),
+        "shots_total_home": pd.array([7, 25], dtype="Int64"),
+        "shots_ot_away": pd.array([5, 4], dtype="Int64"),
+        "shots_total_away": pd.array([16, 5], dtype="Int64"),
+        "saves_home": pd.array([2, 3], dtype="Int64"),
+        "saves_away": pd.array([1, 8], dtype="Int64"),
+        "cards_home": pd.array([0, 0], dtype="Int64"),
+        "cards_away": pd.array([0, 0], dtype="Int64"),
+    })
+    pd.testing.assert_frame_equal(out, esperado)
+
+
+def test_normalizar_bloque_sin_saves():
+    # A block cut before "Saves" keeps its row, with nulls for the missing stats
+    lineas = TEAM_RAW.splitlines(keepends=True)
+    out = normalizar_team_stats.normalizar(_raw("".join(lineas[:5] + lineas[9:])))
+    assert out["match_id"].tolist() == ["12c8079e", "094ea75e"]
+    assert out["shots_total_away"].tolist() == [16, 5]
+    assert out["saves_home"].isna().tolist() == [True, False]
+
+
+def test_normalizar_solo_cabecera():
+    out = normalizar_team_stats.normalizar(_raw(TEAM_RAW.splitlines(keepends=True)[0]))
+    assert out.empty
+
+
+def test_normalizar_etiqueta_repetida_gana_la_ultima():
+    # A block with "Shots on Target" twice keeps the second pair of values
+    lineas = TEAM_RAW.splitlines(keepends=True)
+    extra = [f"Shots on Target,Shots on Target,{URL_1},,,,\n", f"3 of 9 — 33%,30% — 6 of 20,{URL_1},,,,\n"]
+    out = normalizar_team_stats.normalizar(_raw("".join(lineas[:5] + extra + lineas[5:])))
+    assert out["shots_ot_home"].tolist() == [3, 10]
+    assert out["shots_total_away"].tolist() == [20, 5]
+
+
+def test_normalizar_bloque_sin_cards():
+    # Without the "Cards" label the block gets nulls, the others keep 0/0
+    lineas = TEAM_RAW.splitlines(keepends=True)
+    out = normalizar_team_stats.normalizar(_raw("".join(lineas[:7] + lineas[9:])))
+    assert out["cards_home"].isna().tolist() == [True, False]
+
+
+def test_normalizar_filas_antes_del_primer_bloque():
+    # Label rows before the first possession line belong to no match
+    lineas = TEAM_RAW.splitlines(keepends=True)
+    out = normalizar_team_stats.normalizar(_raw("".join(lineas[:1] + lineas[3:5] + lineas[1:])))
+    pd.testing.assert_frame_equal(out, normalizar_team_stats.normalizar(_raw()))
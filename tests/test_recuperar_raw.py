@@ -0,0 +1,79 @@
+"""Unittests for recuperar_raw._punto_de_corte."""
+
+import os
+
+import pytest
+
+import recuperar_raw
+
+URL_A = "https://fbref.com/en/matches/0000000a/Girona-Sevilla-August-15-2025-La-Liga"
+URL_B = "https://fbref.com/en/matches/0000000b/Getafe-Elche-August-16-2025-La-Liga"
+
+
+@pytest.fixture
+def csv_raw(tmp_path):
+    """Write a raw CSV (one header row, match_url in column 1) and return (path, offsets)."""
+
+    def _escribir(filas, cola=b""):
+        path = tmp_path / "raw.csv"
+        offsets = []
+        with open(path, "wb") as f:
+            f.write(b"Player,match_url\n")
+            for jugador, url in filas:
+                offsets.append(f.tell())
+                f.write(f"{jugador},{url}\n".encode())
+            if cola:
+                offsets.append(f.tell())
+                f.write(cola)
+        return str(path), offsets
+
+    return _escribir
+
+
+@pytest.fixture(params=[1 << 20, 40], ids=["tail_grande", "tail_pequeno"])
+def tail_bytes(request, monkeypatch):
+    # With a tiny tail the search has to widen the window several times
+    monkeypatch.setattr(recuperar_raw, "TAIL_BYTES", request.param)
+
+
+FILAS = [("p1", URL_A), ("p2", URL_A), ("p3", URL_A), ("p4", URL_B), ("p5", URL_B)]
+
+
+def test_punto_de_corte_fichero_sano(csv_raw, tail_bytes):
+    path, _ = csv_raw(FILAS)
+    corte, afectados = recuperar_raw._punto_de_corte(path, 1, 1, {URL_A: 3, URL_B: 2}, set())
+    assert corte == os.path.getsize(path)
+    assert afectados == set()
+
+
+def test_punto_de_corte_fila_cortada(csv_raw, tail_bytes):
+    # B was being written when the process died: half a row without newline
+    path, offsets = csv_raw(FILAS, cola=b"p6,https://fbref.com/en/matc")
+    corte, afectados = recuperar_raw._punto_de_corte(path, 1, 1, {URL_A: 3}, set())
+    # Everything from the first row of B (not confirmed in the index) goes
+    assert corte == offsets[3]
+    assert afectados == {URL_B, "https://fbref.com/en/matc"}
+
+
+def test_punto_de_corte_bloque_incompleto(csv_raw, tail_bytes):
+    # The index says B has 3 rows, only 2 made it to disk
+    path, offsets = csv_raw(FILAS)
+    corte, afectados = recuperar_raw._punto_de_corte(path, 1, 1, {URL_A: 3, URL_B: 3}, set())
+    assert corte == offsets[3]
+    assert afectados == {URL_B}
+
+
+def test_punto_de_corte_en_curso(csv_raw, tail_bytes):
+    # Confirmed but flagged as in progress: it is also rolled back
+    path, offsets = csv_raw(FILAS)
+    corte, afectados = recuperar_raw._punto_de_corte(path, 1, 1, {URL_A: 3, URL_B: 2}, {URL_B})
+    assert corte == offsets[3]
+    assert afectados == {URL_B}
+
+
+def test_punto_de_corte_sin_indice(csv_raw, tail_bytes):
+    # ok=None (index not migrated yet): only the torn row is removed
+    path, offsets = csv_raw(FILAS, cola=b"p6,https://fbref.com/en/matc")
+    corte, afectados = recuperar_raw._punto_de_corte(path, 1, 1, None, set())
+    assert corte == offsets[-1]
+    assert afectados == {"https://fbref.com/en/matc"}
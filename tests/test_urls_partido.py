@@ -0,0 +1,64 @@
+"""Unittests for urls_partido."""
+
+import pandas as pd
+import pytest
+
+import urls_partido
+
+BASE = "https://fbref.com/en/matches/12c8079e/"
+
+
+@pytest.mark.parametrize(
+    ("slug", "esperado"),
+    [
+        (
+            "Girona-Rayo-Vallecano-August-15-2025-La-Liga",
+            ("12c8079e", "girona", "rayo vallecano", "Girona", "Rayo Vallecano", "2025-08-15", "August"),
+        ),
+        # FBref prefix for featured matches is dropped before splitting teams
+        (
+            "El-Clasico-Real-Madrid-Barcelona-October-26-2025-La-Liga",
+            ("12c8079e", "real madrid", "barcelona", "Real Madrid", "Barcelona", "2025-10-26", "October"),
+        ),
+        # Slug without accents → FBref name with accents
+        (
+            "Atletico-Madrid-Elche-September-1-2025-La-Liga",
+            ("12c8079e", "atletico madrid", "elche", "Atlético Madrid", "Elche", "2025-09-01", "September"),
+        ),
+        # Only one team known: normalized names, no FBref names
+        (
+            "Foo-Bar-Elche-September-1-2025-La-Liga",
+            ("12c8079e", "foo bar", "elche", None, None, "2025-09-01", "September"),
+        ),
+        # No date in the slug: only the hash
+        ("Girona-Rayo-Vallecano", ("12c8079e", None, None, None, None, None, None)),
+    ],
+)
+def test_resolver_url(slug, esperado):
+    assert urls_partido.resolver_url(BASE + slug) == esperado
+
+
+@pytest.mark.parametrize("url", ["https://fbref.com/en/squads/206d90db/Barcelona-Stats", "", None])
+def test_resolver_url_no_es_partido(url):
+    assert urls_partido.resolver_url(url) == (None,) * len(urls_partido.COLUMNAS)
+
+
+def test_resolver_url_cache():
+    urls_partido.resolver_url.cache_clear()
+    for _ in range(3):
+        urls_partido.resolver_url(BASE + "Girona-Rayo-Vallecano-August-15-2025-La-Liga")
+    info = urls_partido.resolver_url.cache_info()
+    assert (info.misses, info.hits) == (1, 2)
+
+
+def test_resolver_vectorizado():
+    urls = pd.Series(
+        [BASE + "Girona-Rayo-Vallecano-August-15-2025-La-Liga", None,
+         BASE + "Girona-Rayo-Vallecano-August-15-2025-La-Liga"],
+        index=[10, 20, 30],
+    )
+    out = urls_partido.resolver(urls)
+    assert list(out.columns) == urls_partido.COLUMNAS
+    assert out.index.tolist() == [10, 20, 30]
+    assert out["home_team"].tolist()[::2] == ["Girona", "Girona"]
+    assert out.loc[20].isna().all()
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+Resolución de URLs de partido de FBref (compartida por todas las etapas)
+  .../matches/12c8079e/Girona-Rayo-Vallecano-August-15-2025-La-Liga
+    → match_id 12c8079e, Girona / Rayo Vallecano, 2025-08-15 (August)
+
+- Tabla de equipos precompilada: nombre normalizado ("rayo vallecano")
+  → nombre de FBref ("Rayo Vallecano"). Los prefijos de partidos
+  destacados (El-Clasico-, El-Derbi-Madrileno-...) se quitan antes.
+- Cada URL distinta se resuelve UNA vez (caché); resolver(serie) trabaja
+  sobre los valores únicos y los reparte con los códigos de factorize.
+- Sin dependencias de Selenium: lo pueden importar las etapas de
+  normalización e IDs.
+"""
+
+import re
+import unicodedata
+from datetime import date
+from functools import lru_cache
+
+import pandas as pd
+
+# ============================
+# CONFIG
+# ============================
+MONTHS = {
+    "January": 1, "February": 2, "March": 3, "April": 4,
+    "May": 5, "June": 6, "July": 7, "August": 8,
+    "September": 9, "October": 10, "November": 11, "December": 12,
+}
+
+# Equipos tal como los escribe FBref (fixtures / scorebox).
+# Amplia esta lista si hay equipos nuevos (ascensos, copas, etc.)
+# o añádelos en tiempo de ejecución con anadir_equipos().
+EQUIPOS = [
+    "Alavés", "Athletic Club", "Atlético Madrid", "Barcelona", "Celta Vigo",
+    "Elche", "Espanyol", "Getafe", "Girona", "Levante", "Mallorca", "Osasuna",
+    "Oviedo", "Rayo Vallecano", "Real Betis", "Real Madrid", "Real Sociedad",
+    "Sevilla", "Valencia", "Villarreal",
+]
+
+# Prefijos que FBref antepone a partidos destacados (rompen el local)
+PREFIJOS_FBREF = [
+    "El-Clasico-",
+    "El-Derbi-Madrileno-",
+    "El-Gran-Derbi-",
+    "El-Derbi-",
+]
+
+_MATCH_HASH_RE = re.compile(r"/matches/([a-f0-9]{8})(?:/|$)")
+_SLUG_RE = re.compile(r"/matches/[a-f0-9]+/([^/?#]+)")
+_FECHA_RE = re.compile(r"-(" + "|".join(MONTHS) + r")-(\d{1,2})-(\d{4})(?:-|$)")
+
+COLUMNAS = ["match_id", "home_norm", "away_norm", "home_team", "away_team", "date", "month_txt"]
+
+
+# ============================
+# NORMALIZACIÓN DE EQUIPOS
+# ============================
+
+def strip_accents(s: str) -> str:
+    return unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii")
+
+
+def norm_team(s: str) -> str:
+    """'Atlético-Madrid' / 'Atlético Madrid' → 'atletico madrid'."""
+    if not isinstance(s, str):
+        return ""
+    return re.sub(r"\s+", " ", strip_accents(s).lower().replace("-", " ")).strip()
+
+
+_equipos_norm = {norm_team(e): e for e in EQUIPOS}
+
+
+def anadir_equipos(nombres):
+    """Añade nombres de equipo (p.ej. de los fixtures) y vacía la caché."""
+    nuevos = {norm_team(n): n for n in nombres if isinstance(n, str) and n}
+    nuevos = {k: v for k, v in nuevos.items() if k not in _equipos_norm}
+    if nuevos:
+        _equipos_norm.update(nuevos)
+        resolver_url.cache_clear()
+
+
+def _partir_equipos(palabras):
+    """
+    (home_norm, away_norm, ambos_conocidos) probando los cortes del slug.
+    Las palabras llegan ya normalizadas (una vez por URL).
+    """
+    n = len(palabras)
+    cortes = [(" ".join(palabras[:i]), " ".join(palabras[i:])) for i in range(1, n)]
+
+    # Ambos equipos reconocidos → corte exacto
+    for h, a in cortes:
+        if h in _equipos_norm and a in _equipos_norm:
+            return h, a, True
+
+    # Al menos uno reconocido
+    for h, a in cortes:
+        if h in _equipos_norm or a in _equipos_norm:
+            return h, a, False
+
+    # Genérico
+    if palabras:
+        return palabras[0], " ".join(palabras[1:]), False
+    return None, None, False
+
+
+# ============================
+# UNA URL
+# ============================
+
+def hash_partido(url):
+    """Hash FBref de 8 hex, o None si la URL no es de un partido."""
+    m = _MATCH_HASH_RE.search(url or "") if isinstance(url, str) else None
+    return m.group(1) if m else None
+
+
+def match_id_de_url(url: str) -> str:
+    """Hash FBref de 8 hex; si la URL no lo trae se usa la URL entera."""
+    return hash_partido(url) or url
+
+
+def fecha_de_url(url):
+    """date del partido según el slug (...-August-15-2025-La-Liga) o None."""
+    m = _FECHA_RE.search(url or "") if isinstance(url, str) else None
+    if not m:
+        return None
+    return date(int(m.group(3)), MONTHS[m.group(1)], int(m.group(2)))
+
+
+@lru_cache(maxsize=None)
+def resolver_url(url):
+    """
+    Tupla en el orden de COLUMNAS:
+      match_id, home_norm, away_norm, home_team, away_team, date (ISO), month_txt
+    home_team/away_team (nombres FBref) solo si se reconocen AMBOS equipos.
+    """
+    vacio = (hash_partido(url), None, None, None, None, None, None)
+    m = _SLUG_RE.search(url) if isinstance(url, str) else None
+    if not m:
+        return vacio
+    slug = m.group(1)
+
+    for prefijo in PREFIJOS_FBREF:
+        if slug.startswith(prefijo):
+            slug = slug[len(prefijo):]
+            break
+
+    f = _FECHA_RE.search(slug)
+    if not f:
+        return vacio
+    fecha = date(int(f.group(3)), MONTHS[f.group(1)], int(f.group(2)))
+
+    palabras = [norm_team(p) for p in slug[:f.start()].split("-")]
+    home, away, conocidos = _partir_equipos([p for p in palabras if p])
+
+    return (
+        hash_partido(url),
+        home,
+        away,
+        _equipos_norm[home] if conocidos else None,
+        _equipos_norm[away] if conocidos else None,
+        fecha.isoformat(),
+        f.group(1),
+    )
+
+
+# ============================
+# VECTORIZADO
+# ============================
+
+def hashes_partido(urls) -> pd.Series:
+    """Hash FBref de cada URL (nulo si no es de un partido), sin tocar el slug."""
+    return pd.Series(urls).astype("string").str.extract(_MATCH_HASH_RE.pattern, expand=False)
+
+
+def resolver(urls) -> pd.DataFrame:
+    """
+    DataFrame (mismo índice que `urls`) con COLUMNAS, resolviendo cada
+    URL distinta una sola vez.
+    """
+    urls = pd.Series(urls)
+    codigos, unicos = pd.factorize(urls, use_na_sentinel=True)
+
+    tabla = pd.DataFrame([resolver_url(u) for u in unicos], columns=COLUMNAS)
+    # fila extra de nulos para las URLs vacías (código -1)
+    tabla.loc[len(tabla)] = [None] * len(COLUMNAS)
+
+    out = tabla.iloc[codigos].set_axis(urls.index)
+    return out